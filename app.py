@@ -1,11 +1,19 @@
 import streamlit as st
-from database.sqlite_manager import SQLiteManager
+from database.sqlite_manager import MERGE_POLICIES, SQLiteManager
 from database.kuzu_manager import KuzuManager
 from database.sync_manager import SyncManager
+from database.sync_metrics import snapshot_rows
+from database.import_manager import ImportManager
+from database.hot_folder import HotFolderIngestor
+from database.snapshot_manager import SnapshotManager
 from ui.crud_forms import render_crud_interface
 from ui.graph_viz import render_graph_explorer
 from ui.import_export import render_import_export
+from ui import downloads
 import os
+import shutil
+import tempfile
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -71,8 +79,20 @@ def init_databases():
     sync_mgr = SyncManager(sqlite_mgr, kuzu_mgr)
     return sqlite_mgr, kuzu_mgr, sync_mgr
 
+@st.cache_resource
+def start_hot_folder(_kuzu_mgr, _sync_mgr):
+    """Start one background ingestor for the raw data folder per server process"""
+    # Its own SQLite connection, so the worker's chunk transactions never mix with the UI's
+    ingest_sqlite = SQLiteManager()
+    ingest_sync = SyncManager(ingest_sqlite, _kuzu_mgr)
+    ingest_sync.metrics = _sync_mgr.metrics  # one set of sync metrics for the Settings page
+    ingestor = HotFolderIngestor(ImportManager(ingest_sqlite, ingest_sync))
+    ingestor.start()
+    return ingestor
+
 try:
     sqlite_mgr, kuzu_mgr, sync_mgr = init_databases()
+    hot_folder = start_hot_folder(kuzu_mgr, sync_mgr) if os.getenv("HOT_FOLDER_ENABLED") == "1" else None
 except Exception as e:
     st.error("❌ **Error initializing databases!**")
     st.error("The app cannot start. Please check database files and dependencies.")
@@ -226,4 +246,112 @@ elif page == "⚙️ Settings":
                     sync_mgr.full_sync()
                     st.success("✅ Full sync completed successfully!")
                 except Exception as e:
-                    st.error(f"❌ Full sync failed: {e}")
\ No newline at end of file
+                    st.error(f"❌ Full sync failed: {e}")
+
+        st.write("### Hot Folder")
+        if hot_folder:
+            st.caption(f"Watching `{hot_folder.watch_dir}`")
+            if hot_folder.history:
+                st.dataframe(list(reversed(hot_folder.history)), width='stretch', hide_index=True)
+            else:
+                st.info("No files ingested yet.")
+        else:
+            st.info("Hot-folder ingestion is off. Set HOT_FOLDER_ENABLED=1 to import files dropped into data/raw.")
+
+    with col2:
+        st.write("### Sync Metrics")
+
+        snapshot = sync_mgr.metrics.snapshot()
+        if snapshot:
+            st.dataframe(snapshot_rows(snapshot), width='stretch', hide_index=True)
+
+            with st.expander("Latency histograms"):
+                st.json(snapshot)
+        else:
+            st.info("No sync activity recorded yet.")
+
+        if st.button("🧹 Reset metrics", width='stretch'):
+            sync_mgr.metrics.reset()
+            st.rerun()
+
+    st.subheader("Merge Another Database")
+    st.caption("Adds the records of another team's stakeholder-map SQLite file to this one, then rebuilds the graph.")
+
+    merge_file = st.file_uploader("Upload database (.db)", type=["db", "sqlite", "sqlite3"], key="merge_db")
+    if merge_file is not None:
+        policy = st.radio(
+            "When a record already exists here",
+            MERGE_POLICIES,
+            format_func={
+                "skip": "Skip: keep ours",
+                "overwrite": "Overwrite: take theirs",
+                "rename": "Rename: keep both",
+            }.get,
+            horizontal=True,
+            help="Organisations match by name, pain points by description, stakeholders and commercials by organisation and name/method",
+        )
+
+        if st.button("🔀 Merge Database", type="primary"):
+            # ATTACH needs a file on disk
+            with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+                shutil.copyfileobj(merge_file, tmp)
+            try:
+                with st.spinner("Merging records..."):
+                    merge_stats = sqlite_mgr.merge_database(Path(tmp.name), policy, suffix=Path(merge_file.name).stem)
+                with st.spinner("Rebuilding graph database..."):
+                    sync_mgr.full_sync()
+                st.success(f"✅ Merged {sum(s['inserted'] for s in merge_stats.values())} new records from {merge_file.name}")
+                st.dataframe(
+                    [{"Table": table, **counts} for table, counts in merge_stats.items()],
+                    width='stretch',
+                    hide_index=True,
+                )
+            except Exception as e:
+                st.error(f"❌ Merge failed: {e}")
+            finally:
+                os.unlink(tmp.name)
+
+    st.markdown("---")
+    st.subheader("Snapshots")
+    st.caption("Point-in-time copies of the SQLite database, taken while the app keeps running. Older snapshots are rotated out.")
+
+    snapshot_mgr = SnapshotManager(sqlite_mgr, sync_mgr)
+    snap_col1, snap_col2 = st.columns([3, 1])
+    with snap_col1:
+        snapshot_label = st.text_input("Label (optional)", key="snapshot_label", placeholder="e.g. before-q3-import")
+    with snap_col2:
+        st.write("")
+        if st.button("📸 Take Snapshot"):
+            try:
+                with st.spinner("Writing snapshot..."):
+                    snapshot_path = snapshot_mgr.create(snapshot_label)
+                st.success(f"✅ Snapshot saved as {snapshot_path.name}")
+            except Exception as e:
+                st.error(f"❌ Snapshot failed: {e}")
+
+    snapshots = snapshot_mgr.list_snapshots()
+    if not snapshots:
+        st.info(f"No snapshots yet in {snapshot_mgr.snapshot_dir}")
+    else:
+        st.dataframe(
+            [{"Snapshot": s["name"], "Created": s["created"], "Size (MB)": s["size_mb"]} for s in snapshots],
+            width='stretch',
+            hide_index=True,
+        )
+        selected = st.selectbox("Snapshot", snapshots, format_func=lambda s: f"{s['name']} ({s['created']})", key="snapshot_selected")
+        # Published only on request; the file is then served from disk, not read into memory
+        if st.button("⬇️ Prepare Download"):
+            downloads.download_link(f"⬇️ Download {selected['name']}", selected["path"])
+
+        confirm_restore = st.checkbox(
+            "I understand this replaces all current data with the snapshot",
+            key="confirm_restore",
+            help="A pre-restore snapshot of the current data is taken first",
+        )
+        if st.button("♻️ Restore Snapshot", disabled=not confirm_restore):
+            try:
+                with st.spinner("Restoring snapshot and rebuilding graph database..."):
+                    safety_path = snapshot_mgr.restore(selected["path"])
+                st.success(f"✅ Restored {selected['name']}. The previous data was saved as {safety_path.name}")
+            except Exception as e:
+                st.error(f"❌ Restore failed: {e}")
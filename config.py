@@ -6,6 +6,10 @@ DATA_DIR = PROJECT_ROOT / "data"
 LOG_DIR = PROJECT_ROOT / "logs"
 RAW_DATA_DIR = DATA_DIR / "raw"
 EXPORT_DIR = DATA_DIR / "exports"
+# Browser assets served by Streamlit at /app/static (see .streamlit/config.toml)
+STATIC_DIR = PROJECT_ROOT / "static"
+# Exports and snapshots published for download (ui/downloads.py)
+DOWNLOAD_DIR = STATIC_DIR / "downloads"
 
 # Database paths
 SQLITE_DB = DATA_DIR / "govmap.db"
@@ -17,6 +21,32 @@ RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
+# Sync settings
+SYNC_CHUNK_SIZE = 5000  # rows per chunk streamed from SQLite during a full sync
+SYNC_QUEUE_SIZE = 4  # chunks buffered between the SQLite readers and the Kuzu writer
+
+# Import settings
+IMPORT_CHUNK_SIZE = 5000  # rows parsed, written and synced per chunk during a file import
+
+# Hot-folder ingestion of RAW_DATA_DIR (started by the app when HOT_FOLDER_ENABLED=1)
+HOT_FOLDER_ARCHIVE_DIR = RAW_DATA_DIR / "archive"
+HOT_FOLDER_ERROR_DIR = RAW_DATA_DIR / "error"
+HOT_FOLDER_SETTLE_SECONDS = 2.0  # a drop counts as complete once its size and mtime stop changing for this long
+
+# Downloads served from DOWNLOAD_DIR
+DOWNLOAD_TTL_SECONDS = 3600  # published files are deleted this long after publishing
+DOWNLOAD_MAX_BYTES = 200 * 1024 * 1024  # Streamlit will not serve larger static files
+
+# Snapshots taken with the SQLite online backup API (database/snapshot_manager.py)
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
+SNAPSHOT_KEEP = 10  # older snapshots are deleted after each new one
+SNAPSHOT_PAGES = 1024  # pages copied per backup step; writers only wait for one step
+
+# Graph Explorer
+GRAPH_NODE_BUDGET = 1500  # default node count above which the graph is collapsed (utils/graph_lod.py)
+GRAPH_LAYOUT_MAX_NODES = 3000  # above this the "precomputed" layout (all-pairs, O(n^2)) falls back to browser physics
+GRAPH_LAYOUT_MEMORY = 50000  # node positions kept to seed later layouts
+
 # Table definitions
 TABLES = {
     "Organisation": ["org_id", "org_name", "org_type", "org_function"],
@@ -0,0 +1,141 @@
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, Optional
+import pyarrow as pa
+from loguru import logger
+import config
+from database.sqlite_manager import TABLE_NAMES, SQLiteManager
+from utils import tabular_io
+
+DELTA_DIR = config.EXPORT_DIR / "delta"
+
+# Column added to every delta file: 'upsert' rows carry the current record, 'delete' rows are tombstones
+OP_COLUMN = "_op"
+
+
+class DeltaExporter:
+    """Exports the records inserted, updated or deleted since a stored checkpoint.
+
+    SQLite triggers append every write to ChangeLog; each export collapses the
+    changes after the consumer's checkpoint to the latest operation per row
+    and writes one file per changed table, with upserts holding the current
+    row and tombstones holding the deleted row's columns. The first export
+    for a consumer has no checkpoint and writes every current row instead.
+    Nothing is logged until some consumer has a checkpoint.
+    """
+
+    def __init__(self, sqlite_mgr: SQLiteManager):
+        self.sqlite = sqlite_mgr
+
+    def get_checkpoint(self, name: str = "default") -> Optional[int]:
+        conn = self.sqlite.get_connection()
+        row = conn.execute("SELECT change_id FROM ExportCheckpoint WHERE name = ?", (name,)).fetchone()
+        # -1 marks a baseline export that has not finished yet
+        return row["change_id"] if row and row["change_id"] >= 0 else None
+
+    def pending_changes(self, name: str = "default") -> int:
+        """Number of change log entries after the consumer's checkpoint."""
+        conn = self.sqlite.get_connection()
+        since = self.get_checkpoint(name) or 0
+        return conn.execute("SELECT COUNT(*) FROM ChangeLog WHERE change_id > ?", (since,)).fetchone()[0]
+
+    def _delta_query(self, table: str) -> str:
+        """Latest change per row in (since, until], joined to the current row or the tombstone data."""
+        columns = config.TABLES[table]
+        current = ", ".join(f"t.{c}" for c in columns)
+        deleted = ", ".join(f"json_extract(l.data, '$.{c}')" for c in columns)
+        latest = f"""
+            SELECT row_id, MAX(change_id) AS change_id
+            FROM ChangeLog
+            WHERE table_name = '{table}' AND change_id > ? AND change_id <= ?
+            GROUP BY row_id
+        """
+        return f"""
+            SELECT {current}, 'upsert'
+            FROM ({latest}) c
+            JOIN ChangeLog l ON l.change_id = c.change_id
+            JOIN {TABLE_NAMES[table]} t ON t.rowid = c.row_id
+            WHERE l.op != 'delete'
+            UNION ALL
+            SELECT {deleted}, 'delete'
+            FROM ({latest}) c
+            JOIN ChangeLog l ON l.change_id = c.change_id
+            WHERE l.op = 'delete'
+        """
+
+    def export(self, name: str = "default", file_format: str = "Parquet", chunk_size: int = config.SYNC_CHUNK_SIZE) -> Dict:
+        """Write the changes since the checkpoint under DELTA_DIR and advance the checkpoint.
+
+        Returns {"directory", "since", "until", "tables": {table: rows}}. Tables
+        without changes get no file. The checkpoint only moves once every file
+        has been written, so a failed export is simply retried from the same point.
+        """
+        conn = self.sqlite.get_connection()
+        since = self.get_checkpoint(name)
+        if since is None:
+            # The triggers only log changes while a checkpoint exists, so register this
+            # consumer before reading: writes made during the baseline then reach the log
+            with self.sqlite.transaction() as tx:
+                tx.execute("INSERT OR IGNORE INTO ExportCheckpoint (name, change_id) VALUES (?, -1)", (name,))
+        # AUTOINCREMENT keeps the high-water mark in sqlite_sequence even after ChangeLog is pruned
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'ChangeLog'").fetchone()
+        until = row["seq"] if row else 0
+
+        directory = DELTA_DIR / f"{name}_{time.strftime('%Y%m%dT%H%M%S')}_{since or 0}_{until}"
+        directory.mkdir(parents=True, exist_ok=True)
+
+        tables = {}
+        for table in config.TABLES:
+            if since is None:
+                # First export for this consumer: a full baseline of current rows
+                columns = ", ".join(config.TABLES[table])
+                query, params = f"SELECT {columns}, 'upsert' FROM {TABLE_NAMES[table]}", ()
+            else:
+                query, params = self._delta_query(table), (since, until, since, until)
+
+            chunks = self.sqlite.iter_rows(query, params, chunk_size, as_dicts=False)
+            first = next(chunks, None)
+            if first is None:
+                continue
+
+            schema = tabular_io.arrow_schema(table).append(pa.field(OP_COLUMN, pa.string()))
+            path = directory / tabular_io.export_filename(f"{table.lower()}_delta", file_format)
+            with open(path, "wb") as sink:
+                tables[table] = tabular_io.write_chunks(_prepend(first, chunks), sink, file_format, schema)
+            logger.info(f"Delta export {name}: {tables[table]} {table} changes to {path}")
+
+        with self.sqlite.transaction() as tx:
+            tx.execute("""
+                INSERT INTO ExportCheckpoint (name, change_id, exported_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(name) DO UPDATE SET change_id = excluded.change_id, exported_at = excluded.exported_at
+            """, (name, until))
+            # Entries every consumer has already exported are no longer needed
+            tx.execute("DELETE FROM ChangeLog WHERE change_id <= (SELECT MIN(change_id) FROM ExportCheckpoint)")
+
+        if not tables:
+            directory.rmdir()
+        return {"directory": directory if tables else None, "since": since, "until": until, "tables": tables}
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export records changed since the last checkpoint.")
+    parser.add_argument("--name", default="default", help="Checkpoint name; one per downstream consumer")
+    parser.add_argument("--format", default="Parquet", choices=["Parquet", "CSV"], help="Output file format")
+    parser.add_argument("--db", type=Path, default=config.SQLITE_DB, help="SQLite database path")
+    args = parser.parse_args()
+
+    result = DeltaExporter(SQLiteManager(args.db)).export(args.name, args.format)
+    if result["tables"]:
+        logger.info(f"✅ Wrote {sum(result['tables'].values())} changes to {result['directory']}")
+    else:
+        logger.info("No changes since the last checkpoint.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import IO, Tuple
+from loguru import logger
+import config
+from database.sqlite_manager import SQLiteManager
+from utils import tabular_io
+
+# File name stems for single-table exports
+EXPORT_STEMS = {
+    "Organisation": "organisations_export",
+    "Stakeholder": "stakeholders_export",
+    "PainPoint": "painpoints_export",
+    "Commercial": "commercials_export",
+    "OrgRelationship": "org_relationships_export",
+    "OrganisationPainPoint": "organisation_painpoints_export",
+}
+
+
+class ExportManager:
+    """Streams SQLite tables to CSV, Parquet or Arrow IPC without materialising them."""
+
+    def __init__(self, sqlite_mgr: SQLiteManager):
+        self.sqlite = sqlite_mgr
+
+    def export_table(self, table: str, sink: IO[bytes], file_format: str = "CSV", chunk_size: int = config.SYNC_CHUNK_SIZE) -> int:
+        """Write the config.TABLES columns of one table to a binary sink. Returns the row count."""
+        return tabular_io.write_chunks(
+            self.sqlite.iter_table(table, chunk_size, as_dicts=False),
+            sink,
+            file_format,
+            tabular_io.arrow_schema(table),
+        )
+
+    def export_file(self, table: str, file_format: str = "CSV", chunk_size: int = config.SYNC_CHUNK_SIZE) -> Tuple[Path, int]:
+        """Write one table to config.EXPORT_DIR and return (path, row count).
+
+        Rows are fetched from a cursor with fetchmany and written as they
+        arrive, so cost is linear in rows and memory stays constant. The file
+        is written under a temporary name and renamed into place, so readers
+        never see a partial export.
+        """
+        path = config.EXPORT_DIR / tabular_io.export_filename(EXPORT_STEMS[table], file_format)
+        with tempfile.NamedTemporaryFile(dir=config.EXPORT_DIR, prefix=".tmp_", delete=False) as spool:
+            try:
+                rows = self.export_table(table, spool, file_format, chunk_size)
+            except Exception:
+                spool.close()
+                Path(spool.name).unlink(missing_ok=True)
+                raise
+        os.replace(spool.name, path)
+        logger.info(f"Exported {rows} {table} rows to {path}")
+        return path, rows
+
+    def export_zip(self, file_format: str = "CSV", chunk_size: int = config.SYNC_CHUNK_SIZE) -> Path:
+        """Write every table into a ZIP under config.EXPORT_DIR and return its path.
+
+        Rows are streamed from SQLite cursors straight into the archive
+        members, so memory stays flat regardless of table size. The caller
+        owns the returned file; the app moves it under static/downloads,
+        which deletes it when the download link expires.
+        """
+        # Parquet and Arrow IPC are already compressed, so only CSV is deflated again
+        compression = zipfile.ZIP_DEFLATED if file_format == "CSV" else zipfile.ZIP_STORED
+
+        with tempfile.NamedTemporaryFile(dir=config.EXPORT_DIR, prefix="export_", suffix=".zip", delete=False) as spool:
+            path = Path(spool.name)
+            try:
+                with zipfile.ZipFile(spool, "w", compression) as zip_file:
+                    for table in config.TABLES:
+                        member = tabular_io.export_filename(f"{table.lower()}_export", file_format)
+                        with zip_file.open(member, "w", force_zip64=True) as sink:
+                            rows = self.export_table(table, sink, file_format, chunk_size)
+                        logger.info(f"Exported {rows} {table} rows to {member}")
+            except Exception:
+                spool.close()
+                path.unlink(missing_ok=True)
+                raise
+        return path
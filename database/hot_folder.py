@@ -0,0 +1,188 @@
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+import pandas as pd
+from loguru import logger
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+import config
+from database.import_jobs import file_hash
+from database.import_manager import ImportManager
+from utils import tabular_io, validators
+
+# Extensions picked up from the hot folder; anything else (including .part/.tmp staging files) is ignored
+INGEST_EXTENSIONS = set(tabular_io.EXTENSIONS) | {"zip"}
+
+
+class _DropHandler(FileSystemEventHandler):
+    """Queue files created in, or renamed into, the watched folder."""
+
+    def __init__(self, ingestor: "HotFolderIngestor"):
+        self.ingestor = ingestor
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.ingestor.enqueue(Path(event.src_path))
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.ingestor.enqueue(Path(event.dest_path))
+
+
+class HotFolderIngestor:
+    """Watches a drop folder and imports completed files on a background thread.
+
+    Files are matched to a table by name (see ImportManager.table_for_filename);
+    ZIP files are imported as bundles. Each drop is dry-run checked first and
+    then imported through the chunked pipeline with graph sync. It is moved to
+    the archive folder on success, or to the error folder together with an
+    error report otherwise.
+    """
+
+    def __init__(
+        self,
+        import_mgr: ImportManager,
+        watch_dir: Path = config.RAW_DATA_DIR,
+        archive_dir: Path = config.HOT_FOLDER_ARCHIVE_DIR,
+        error_dir: Path = config.HOT_FOLDER_ERROR_DIR,
+        settle_seconds: float = config.HOT_FOLDER_SETTLE_SECONDS,
+    ):
+        self.import_mgr = import_mgr
+        self.watch_dir = Path(watch_dir)
+        self.archive_dir = Path(archive_dir)
+        self.error_dir = Path(error_dir)
+        self.settle_seconds = settle_seconds
+
+        self._queue: queue.Queue = queue.Queue()
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._observer: Optional[Observer] = None
+        self._worker: Optional[threading.Thread] = None
+        self.history: List[Dict] = []  # most recent last
+
+    def start(self):
+        """Start watching; files already waiting in the folder are queued too."""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.error_dir.mkdir(parents=True, exist_ok=True)
+
+        self._worker = threading.Thread(target=self._run, name="hot-folder-ingest", daemon=True)
+        self._worker.start()
+
+        self._observer = Observer()
+        self._observer.schedule(_DropHandler(self), str(self.watch_dir), recursive=False)
+        self._observer.start()
+
+        for path in sorted(self.watch_dir.iterdir()):
+            if path.is_file():
+                self.enqueue(path)
+        logger.info(f"Watching {self.watch_dir} for data drops.")
+
+    def stop(self):
+        self._stop.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+        if self._worker:
+            self._worker.join()
+
+    def enqueue(self, path: Path):
+        if path.parent != self.watch_dir or path.name.startswith(".") or path.suffix.lstrip(".").lower() not in INGEST_EXTENSIONS:
+            return
+        with self._pending_lock:
+            # Created and modified events often arrive in bursts for one file
+            if path in self._pending:
+                return
+            self._pending.add(path)
+        self._queue.put(path)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                path = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                if self._wait_until_complete(path):
+                    self.process(path)
+            except Exception as e:
+                logger.error(f"Hot folder: unexpected error handling {path.name}: {e}")
+            finally:
+                with self._pending_lock:
+                    self._pending.discard(path)
+
+    def _wait_until_complete(self, path: Path) -> bool:
+        """Block until the file's size and mtime have not changed for settle_seconds."""
+        last = None
+        stable_since = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return False  # Renamed or removed by the producer before it settled
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != last:
+                last = current
+                stable_since = time.monotonic()
+            elif time.monotonic() - stable_since >= self.settle_seconds:
+                return True
+            time.sleep(min(0.5, self.settle_seconds / 2))
+        return False
+
+    def process(self, path: Path) -> Dict:
+        """Check, import and file away one completed drop."""
+        result = {"file": path.name, "started_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+        try:
+            if path.suffix.lower() == ".zip":
+                report = validators.report_errors(self.import_mgr.precheck_bundle(path))
+                if report.empty:
+                    tables = self.import_mgr.import_bundle(path)
+                    result["imported"] = sum(t["imported"] for t in tables.values())
+                    result["failed"] = sum(t["failed"] for t in tables.values())
+            else:
+                table = self.import_mgr.table_for_filename(path.name)
+                if table is None:
+                    raise ValueError(f"Cannot tell which table {path.name} holds; name it after one of {', '.join(config.TABLES)}")
+                content_hash = file_hash(path)
+                job = self.import_mgr.jobs.find_resumable(content_hash, table)
+                if job:
+                    # Left by an interrupted import; the rows it already committed would fail the pre-check
+                    logger.info(f"Hot folder: resuming import job {job['job_id']} for {path.name}")
+                    report = pd.DataFrame(columns=validators.REPORT_COLUMNS)
+                else:
+                    report = validators.report_errors(self.import_mgr.precheck_file(path, table))
+                    job = self.import_mgr.start_job(path, table, content_hash=content_hash) if report.empty else None
+                if report.empty:
+                    stats = self.import_mgr.import_file(path, table, job_id=job["job_id"])
+                    result["imported"] = stats["imported"]
+                    result["failed"] = stats["failed"]
+
+            if not report.empty:
+                result["status"] = "rejected"
+                result["error"] = f"{len(report)} problems found by the pre-check"
+                destination = self._move(path, self.error_dir)
+                report.to_csv(destination.with_name(destination.name + ".errors.csv"), index=False)
+            else:
+                result["status"] = "imported"
+                destination = self._move(path, self.archive_dir)
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = str(e)
+            destination = self._move(path, self.error_dir)
+            destination.with_name(destination.name + ".error.txt").write_text(str(e))
+
+        result["moved_to"] = str(destination)
+        self.history.append(result)
+        log = logger.info if result["status"] == "imported" else logger.error
+        log(f"Hot folder: {path.name} {result['status']} -> {destination}")
+        return result
+
+    @staticmethod
+    def _move(path: Path, folder: Path) -> Path:
+        # Timestamp prefix so repeated drops of the same name never overwrite each other
+        destination = folder / f"{time.strftime('%Y%m%dT%H%M%S')}_{path.name}"
+        shutil.move(str(path), destination)
+        return destination
@@ -0,0 +1,96 @@
+import hashlib
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Union
+from database.sqlite_manager import SQLiteManager
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Failed-row messages kept in a job's error log per chunk; the rest are only counted
+MAX_ERRORS_PER_CHUNK = 20
+
+# Jobs in these states are never resumed
+CLOSED_STATUSES = ("completed", "abandoned")
+
+
+def file_hash(source: Union[str, Path, IO[bytes]]) -> str:
+    """SHA-256 of a file's contents, read in blocks. File objects are rewound afterwards."""
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            return file_hash(f)
+
+    digest = hashlib.sha256()
+    source.seek(0)
+    for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b""):
+        digest.update(block)
+    source.seek(0)
+    return digest.hexdigest()
+
+
+class ImportJobStore:
+    """Persists file import jobs so an interrupted import can resume where it stopped.
+
+    A job records the file's content hash and how many of its rows have been
+    committed. advance() must be called inside the transaction that writes
+    the chunk, so the offset can never run ahead of, or lag behind, the data;
+    rows_synced trails it until the chunk has been synced to the graph.
+    """
+
+    def __init__(self, sqlite_mgr: SQLiteManager):
+        self.sqlite = sqlite_mgr
+
+    def create(self, file_hash: str, file_name: str, table_type: str, file_format: str, replace_existing: bool = False) -> Dict:
+        with self.sqlite.transaction() as conn:
+            row = conn.execute("""
+                INSERT INTO ImportJob (file_hash, file_name, table_type, file_format, replace_existing)
+                VALUES (?, ?, ?, ?, ?)
+                RETURNING *
+            """, (file_hash, file_name, table_type, file_format, int(replace_existing))).fetchone()
+        return dict(row)
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        row = self.sqlite.get_connection().execute("SELECT * FROM ImportJob WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def find_resumable(self, file_hash: str, table_type: str) -> Optional[Dict]:
+        """The latest job for this file and table, if it was neither completed nor abandoned."""
+        row = self.sqlite.get_connection().execute("""
+            SELECT * FROM ImportJob
+            WHERE file_hash = ? AND table_type = ?
+            ORDER BY job_id DESC LIMIT 1
+        """, (file_hash, table_type)).fetchone()
+        return dict(row) if row and row["status"] not in CLOSED_STATUSES else None
+
+    def list_jobs(self, limit: int = 20) -> List[Dict]:
+        rows = self.sqlite.get_connection().execute(
+            "SELECT * FROM ImportJob ORDER BY job_id DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def advance(self, conn, job_id: int, rows: int, imported: int, failed: int, errors: List[str]):
+        """Move the committed offset past one chunk; call inside the chunk's transaction."""
+        log = "\n".join(errors[:MAX_ERRORS_PER_CHUNK])
+        if len(errors) > MAX_ERRORS_PER_CHUNK:
+            log += f"\n... and {len(errors) - MAX_ERRORS_PER_CHUNK} more"
+        conn.execute("""
+            UPDATE ImportJob
+            SET rows_committed = rows_committed + ?,
+                imported = imported + ?,
+                failed = failed + ?,
+                status = 'running',
+                error_log = error_log || ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ?
+        """, (rows, imported, failed, log + "\n" if log else "", job_id))
+
+    def mark_synced(self, job_id: int):
+        """Record that every committed row has also reached the graph."""
+        with self.sqlite.transaction() as conn:
+            conn.execute("UPDATE ImportJob SET rows_synced = rows_committed WHERE job_id = ?", (job_id,))
+
+    def finish(self, job_id: int, status: str = "completed", error: Optional[str] = None):
+        with self.sqlite.transaction() as conn:
+            conn.execute("""
+                UPDATE ImportJob
+                SET status = ?, error_log = error_log || ?, updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = ?
+            """, (status, f"{error}\n" if error else "", job_id))
@@ -0,0 +1,426 @@
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Callable, Dict, List, Optional, Tuple, Union
+import pandas as pd
+from loguru import logger
+import config
+from database.sqlite_manager import SQLiteManager
+from database.sync_manager import SYNC_PHASES, SyncManager
+from database.export_manager import EXPORT_STEMS
+from database.import_jobs import ImportJobStore, file_hash
+from database.import_precheck import PRIMARY_KEYS, ImportPrecheck
+from database.name_resolver import NameResolver
+from utils import tabular_io, validators
+
+# Columns that must hold an integer for a row to be written
+ID_COLUMNS = {table: [c for c in columns if c.endswith("_id")] for table, columns in config.TABLES.items()}
+
+# Foreign-key order: every table is loaded after the tables it references
+LOAD_ORDER = [table for phase in SYNC_PHASES for table in phase]
+
+
+def row_hashes(table_type: str, df: pd.DataFrame) -> pd.Series:
+    """64-bit content hash of each row's config.TABLES columns.
+
+    Columns are cast to the types validators.validate_frame produces first, so
+    a validated import chunk and rows read back from SQLite hash alike.
+    """
+    canonical = pd.DataFrame(index=df.index)
+    for column in config.TABLES[table_type]:
+        if column.endswith("_id"):
+            canonical[column] = pd.to_numeric(df[column]).astype("Int64")
+        elif column == "budget":
+            canonical[column] = pd.to_numeric(df[column]).astype("Float64")
+        else:
+            canonical[column] = df[column].astype("string")
+    return pd.util.hash_pandas_object(canonical, index=False)
+
+
+class ImportManager:
+    """Validates, writes and syncs tabular imports in bounded-size chunks."""
+
+    def __init__(self, sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
+        self.sqlite = sqlite_mgr
+        self.sync = sync_mgr
+        self.jobs = ImportJobStore(sqlite_mgr)
+
+    @staticmethod
+    def preview(source: IO[bytes], file_format: str = "CSV", nrows: int = 5) -> pd.DataFrame:
+        """Read only the first rows of an upload and rewind it."""
+        return tabular_io.preview(source, file_format, nrows)
+
+    @staticmethod
+    def missing_columns(table_type: str, columns) -> List[str]:
+        """Required columns absent from a file; a foreign key may be given by name instead (see NameResolver)."""
+        resolvable = NameResolver.name_columns(table_type, columns)
+        return [c for c in config.TABLES[table_type] if c not in set(columns) and c not in resolvable]
+
+    def start_job(
+        self,
+        source: Union[str, Path, IO[bytes]],
+        table_type: str,
+        file_format: Optional[str] = None,
+        replace_existing: bool = False,
+        content_hash: Optional[str] = None,
+    ) -> Dict:
+        """Record a new resumable import job for a file; pass its job_id to import_file."""
+        name = str(source) if isinstance(source, (str, Path)) else getattr(source, "name", "")
+        file_format = file_format or tabular_io.detect_format(name)
+        content_hash = content_hash or file_hash(source)
+        return self.jobs.create(content_hash, Path(name).name, table_type, file_format, replace_existing)
+
+    def import_file(
+        self,
+        source: Union[str, Path, IO[bytes]],
+        table_type: str,
+        file_format: Optional[str] = None,
+        chunk_size: int = config.IMPORT_CHUNK_SIZE,
+        replace_existing: bool = False,
+        sync_to_kuzu: bool = True,
+        progress: Optional[Callable[[Dict], None]] = None,
+        job_id: Optional[int] = None,
+    ) -> Dict:
+        """Stream a CSV, Parquet or Arrow IPC file into SQLite (and Kuzu) one chunk at a time.
+
+        Only one chunk of rows is held in memory. Each chunk is validated,
+        written in a single transaction and synced as one batch; `progress`
+        is called after every chunk with the running totals and the fraction
+        of the file consumed. The format is detected from the filename when
+        not given.
+
+        With a job_id (see start_job), the job's row offset is advanced in the
+        same transaction as each chunk, and rows committed by an earlier run
+        of the job are skipped, so an interrupted import picks up where it
+        stopped. The job's format and replace mode take precedence.
+
+        Foreign keys may be given by name instead (org_name, from_org_name,
+        to_org_name, painpoint_description); see NameResolver.
+        """
+        if isinstance(source, (str, Path)):
+            file_format = file_format or tabular_io.detect_format(str(source))
+            with open(source, "rb") as f:
+                return self.import_file(f, table_type, file_format, chunk_size, replace_existing, sync_to_kuzu, progress, job_id)
+
+        job = self.jobs.get(job_id) if job_id else None
+        if job:
+            file_format = job["file_format"]
+            replace_existing = bool(job["replace_existing"])
+            if sync_to_kuzu and job["rows_synced"] < job["rows_committed"]:
+                # The last run stopped between committing a chunk and syncing it
+                logger.warning(f"Import job {job_id} has unsynced rows; running a full sync before resuming.")
+                self.sync.full_sync()
+        file_format = file_format or tabular_io.detect_format(getattr(source, "name", ""))
+
+        offset = job["rows_committed"] if job else 0
+        stats = {
+            "imported": job["imported"] if job else 0,
+            "failed": job["failed"] if job else 0,
+            "unchanged": 0,
+            "skipped": offset,
+            "chunks": 0,
+            "fraction": 0.0,
+        }
+        resolver = None
+        try:
+            for chunk, fraction in tabular_io.iter_chunks(source, file_format, chunk_size, skip_rows=offset):
+                # Number rows across the whole file so job error logs point at file rows
+                chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+                offset += len(chunk)
+                # Names are looked up against one load of each referenced table for the whole file
+                resolver = resolver or NameResolver(self.sqlite, table_type, chunk.columns)
+                with self.sqlite.transaction() as conn:
+                    records, failed, unchanged, errors = self._write_rows(table_type, chunk, replace_existing, resolver)
+                    if job:
+                        self.jobs.advance(conn, job_id, len(chunk), len(records), failed, errors)
+                if sync_to_kuzu and records:
+                    self.sync.sync_records(table_type, records)
+                if job and sync_to_kuzu:
+                    self.jobs.mark_synced(job_id)
+
+                stats["imported"] += len(records)
+                stats["failed"] += failed
+                stats["unchanged"] += unchanged
+                stats["chunks"] += 1
+                stats["fraction"] = fraction
+                if progress:
+                    progress(stats)
+        except Exception as e:
+            if job:
+                self.jobs.finish(job_id, "failed", str(e))
+            raise
+
+        if job:
+            self.jobs.finish(job_id)
+        stats["fraction"] = 1.0
+        logger.info(
+            f"Imported {stats['imported']} {table_type} rows from {file_format} in {stats['chunks']} chunks "
+            f"({stats['failed']} failed, {stats['unchanged']} unchanged, {stats['skipped']} already committed)."
+        )
+        return stats
+
+    @staticmethod
+    def table_for_filename(name: str) -> Optional[str]:
+        """Work out the table a file holds from its name, e.g. "Stakeholder.csv",
+        "stakeholder_export.parquet" or "stakeholder_2024-06-01.csv"."""
+        stem = Path(name).stem.lower()
+        for table, export_stem in EXPORT_STEMS.items():
+            if stem == export_stem:
+                return table
+        # Longest name first so "organisationpainpoint" is not read as "organisation"
+        for table in sorted(config.TABLES, key=len, reverse=True):
+            prefix = table.lower()
+            if stem == prefix or (stem.startswith(prefix) and stem[len(prefix)] in "_-. "):
+                return table
+        return None
+
+    @classmethod
+    def bundle_members(cls, zip_file: zipfile.ZipFile) -> Dict[str, str]:
+        """Map table names to ZIP members, accepting the "All Tables" export naming."""
+        members = {}
+        for name in zip_file.namelist():
+            table = cls.table_for_filename(name)
+            if table and not name.endswith("/"):
+                members[table] = name
+        return members
+
+    def _parse_bundle(self, source: Union[str, Path, IO[bytes]]) -> Dict[str, pd.DataFrame]:
+        """Parse every table file in a ZIP bundle in parallel."""
+        with zipfile.ZipFile(source) as zip_file:
+            members = self.bundle_members(zip_file)
+            if not members:
+                raise ValueError("No table files found in the bundle")
+
+            def parse(table: str) -> pd.DataFrame:
+                name = members[table]
+                df = tabular_io.read_frame(io.BytesIO(zip_file.read(name)), tabular_io.detect_format(name))
+                missing = self.missing_columns(table, df.columns)
+                if missing:
+                    raise ValueError(f"{name} is missing required columns: {', '.join(missing)}")
+                return df
+
+            with ThreadPoolExecutor(max_workers=len(members)) as pool:
+                return dict(zip(members, pool.map(parse, members)))
+
+    def precheck_file(
+        self,
+        source: Union[str, Path, IO[bytes]],
+        table_type: str,
+        file_format: Optional[str] = None,
+        replace_existing: bool = False,
+        chunk_size: int = config.IMPORT_CHUNK_SIZE,
+    ) -> pd.DataFrame:
+        """Dry-run an import and return a per-row error report without writing anything."""
+        if isinstance(source, (str, Path)):
+            file_format = file_format or tabular_io.detect_format(str(source))
+            with open(source, "rb") as f:
+                return self.precheck_file(f, table_type, file_format, replace_existing, chunk_size)
+
+        file_format = file_format or tabular_io.detect_format(getattr(source, "name", ""))
+        checker = ImportPrecheck(self.sqlite, table_type, replace_existing)
+        resolver = None
+        reports = []
+        offset = 0
+        for chunk, _ in tabular_io.iter_chunks(source, file_format, chunk_size):
+            # Number rows across the whole file, whatever the reader does with the index
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            resolver = resolver or NameResolver(self.sqlite, table_type, chunk.columns)
+            chunk, unresolved = resolver.resolve(chunk)
+            reports.append(unresolved)
+            reports.append(checker.check(chunk))
+        source.seek(0)
+
+        if not reports:
+            return pd.DataFrame(columns=validators.REPORT_COLUMNS)
+        return pd.concat(reports, ignore_index=True).sort_values("Row", kind="stable").reset_index(drop=True)
+
+    def precheck_bundle(self, source: Union[str, Path, IO[bytes]], replace_existing: bool = False) -> pd.DataFrame:
+        """Dry-run a bundle import; foreign keys may point at rows elsewhere in the bundle."""
+        frames = self._parse_bundle(source)
+        if hasattr(source, "seek"):
+            source.seek(0)
+
+        reports = []
+        pending_keys = {}
+        for table in [table for table in LOAD_ORDER if table in frames]:
+            df = frames[table]
+            report = ImportPrecheck(self.sqlite, table, replace_existing, pending_keys).check(df)
+            report.insert(0, "Table", table)
+            reports.append(report)
+            key = PRIMARY_KEYS[table][0]
+            pending_keys[table] = pd.Index(pd.to_numeric(df[key], errors="coerce").dropna())
+        return pd.concat(reports, ignore_index=True)
+
+    def import_bundle(
+        self,
+        source: Union[str, Path, IO[bytes]],
+        replace_existing: bool = False,
+        sync_to_kuzu: bool = True,
+        progress: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict[str, Dict]:
+        """Import a ZIP bundle of table files, such as the "All Tables" export.
+
+        Members are parsed in parallel, then loaded in foreign-key order inside
+        a single transaction, and the graph is rebuilt with one full sync at
+        the end. Returns per-table {"imported", "failed"} counts.
+        """
+        frames = self._parse_bundle(source)
+
+        results = {}
+        tables = [table for table in LOAD_ORDER if table in frames]
+        with self.sqlite.transaction():
+            for i, table in enumerate(tables):
+                imported, failed = self.import_rows(table, frames.pop(table), replace_existing, sync_to_kuzu=False)
+                results[table] = {"imported": imported, "failed": failed}
+                logger.info(f"Loaded {imported} {table} rows from bundle ({failed} failed).")
+                if progress:
+                    progress({"table": table, "fraction": (i + 1) / len(tables), **results[table]})
+
+        if sync_to_kuzu:
+            self.sync.full_sync()
+
+        return results
+
+    def import_rows(
+        self,
+        table_type: str,
+        df: pd.DataFrame,
+        replace_existing: bool = False,
+        sync_to_kuzu: bool = True,
+    ) -> Tuple[int, int]:
+        """Validate, write and sync one chunk of rows. Returns (imported, failed)."""
+        # One transaction per chunk so the fsync cost is paid once per chunk
+        with self.sqlite.transaction():
+            records, failed, _, _ = self._write_rows(table_type, df, replace_existing)
+
+        if sync_to_kuzu and records:
+            self.sync.sync_records(table_type, records)
+
+        return len(records), failed
+
+    def _write_rows(
+        self,
+        table_type: str,
+        df: pd.DataFrame,
+        replace_existing: bool,
+        resolver: Optional[NameResolver] = None,
+    ) -> Tuple[List[Dict], int, int, List[str]]:
+        """Resolve names, validate and write a chunk; call inside a transaction.
+
+        Returns (records, failed, unchanged, error messages). In replace mode,
+        rows identical to the stored record are skipped rather than rewritten.
+        """
+        unresolved = pd.DataFrame(columns=validators.REPORT_COLUMNS)
+        if resolver:
+            df, unresolved = resolver.resolve(df)
+            if not unresolved.empty:
+                first = unresolved.iloc[0]
+                logger.error(
+                    f"Skipped {unresolved['Row'].nunique()} {table_type} rows with unresolved names "
+                    f"(first: row {first['Row']} {first['Column']} {first['Value']!r}: {first['Error']})"
+                )
+
+        df, report = self._validate_chunk(table_type, df)
+        report = pd.concat([unresolved, report], ignore_index=True) if not unresolved.empty else report
+        errors = [f"Row {r.Row} {r.Column} {r.Value!r}: {r.Error}" for r in report.itertuples()]
+
+        unchanged = 0
+        if replace_existing and not df.empty:
+            before = len(df)
+            df = self._drop_unchanged(table_type, df)
+            unchanged = before - len(df)
+
+        # Blank cells become NULL rather than NaN
+        df = df.astype(object).where(df.notna(), None)
+
+        records = []
+        failed = validators.report_errors(report)["Row"].nunique()
+        for row in df.to_dict("records"):
+            record = self._write_row(table_type, row, replace_existing)
+            if record:
+                records.append(record)
+            else:
+                failed += 1
+                key = self._row_key(table_type, row)
+                errors.append(f"Failed to import {table_type}: {key}")
+                logger.error(f"Failed to import {table_type}: {key}")
+
+        return records, failed, unchanged, errors
+
+    def _drop_unchanged(self, table_type: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Remove rows whose content hash matches a stored row.
+
+        The stored rows for the chunk's keys are read in one query and hashed
+        the same way, so an unchanged row costs no write and no graph sync.
+        The hash covers the key columns, so a match means same key and content.
+        """
+        key = PRIMARY_KEYS[table_type][0]
+        stored = self.sqlite.get_rows_by_key(table_type, key, [int(k) for k in df[key].unique()])
+        if stored.empty:
+            return df
+        return df[~row_hashes(table_type, df).isin(row_hashes(table_type, stored)).values]
+
+    def _validate_chunk(self, table_type: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Normalize and validate a chunk in one vectorized pass. Returns (valid rows, error and warning report)."""
+        df, report = validators.validate_frame(table_type, df[config.TABLES[table_type]])
+
+        errors = validators.report_errors(report)
+        if not errors.empty:
+            first = errors.iloc[0]
+            logger.error(
+                f"Skipped {errors['Row'].nunique()} invalid {table_type} rows "
+                f"(first: row {first['Row']} {first['Column']}: {first['Error']})"
+            )
+        warnings = validators.report_warnings(report)
+        if not warnings.empty:
+            first = warnings.iloc[0]
+            logger.warning(
+                f"Kept {warnings['Row'].nunique()} {table_type} rows with unrecognised values "
+                f"(first: row {first['Row']} {first['Column']} {first['Value']!r})"
+            )
+
+        return df, report
+
+    def _write_row(self, table_type: str, row: Dict, replace_existing: bool) -> Optional[Dict]:
+        """Write one validated row; replace mode updates the record with the same ID."""
+        if table_type == "Organisation":
+            write = self.sqlite.update_organisation if replace_existing else self.sqlite.insert_organisation
+            return write(org_id=row['org_id'], org_name=row['org_name'], org_type=row['org_type'], org_function=row['org_function'])
+
+        elif table_type == "Stakeholder":
+            write = self.sqlite.update_stakeholder if replace_existing else self.sqlite.insert_stakeholder
+            return write(
+                stakeholder_id=row['stakeholder_id'],
+                org_id=row['org_id'],
+                name=row['name'],
+                job_title=row['job_title'],
+                role=row['role'],
+            )
+
+        elif table_type == "PainPoint":
+            write = self.sqlite.update_painpoint if replace_existing else self.sqlite.insert_painpoint
+            return write(painpoint_id=row['painpoint_id'], description=row['description'], severity=row['severity'], urgency=row['urgency'])
+
+        elif table_type == "Commercial":
+            write = self.sqlite.update_commercial if replace_existing else self.sqlite.insert_commercial
+            return write(commercial_id=row['commercial_id'], org_id=row['org_id'], method=row['method'], budget=row['budget'])
+
+        elif table_type == "OrgRelationship":
+            return self.sqlite.insert_org_relationship(
+                from_org_id=row['from_org_id'],
+                to_org_id=row['to_org_id'],
+                relationship_type=row['relationship_type'],
+            )
+
+        elif table_type == "OrganisationPainPoint":
+            return self.sqlite.insert_painpoint_assignment(org_id=row['org_id'], painpoint_id=row['painpoint_id'])
+
+        raise ValueError(f"Unknown table type: {table_type}")
+
+    @staticmethod
+    def _row_key(table_type: str, row: Dict) -> str:
+        if table_type == "OrgRelationship":
+            return f"{row['from_org_id']} -> {row['to_org_id']}"
+        return " - ".join(str(row[c]) for c in ID_COLUMNS[table_type])
@@ -0,0 +1,128 @@
+from typing import Dict, List, Optional
+import pandas as pd
+from database.sqlite_manager import SQLiteManager
+from utils import validators
+
+# Columns identifying a record of each table (what a duplicate means)
+PRIMARY_KEYS = {
+    "Organisation": ["org_id"],
+    "Stakeholder": ["stakeholder_id"],
+    "PainPoint": ["painpoint_id"],
+    "Commercial": ["commercial_id"],
+    "OrgRelationship": ["from_org_id", "to_org_id", "relationship_type"],
+    "OrganisationPainPoint": ["org_id", "painpoint_id"],
+}
+
+# Foreign key column -> referenced table
+FOREIGN_KEYS = {
+    "Stakeholder": {"org_id": "Organisation"},
+    "Commercial": {"org_id": "Organisation"},
+    "OrgRelationship": {"from_org_id": "Organisation", "to_org_id": "Organisation"},
+    "OrganisationPainPoint": {"org_id": "Organisation", "painpoint_id": "PainPoint"},
+}
+
+# Tables whose rows are plain links; replace mode inserts new links and skips stored ones
+LINK_TABLES = {"OrgRelationship", "OrganisationPainPoint"}
+
+
+def _append_keys(keys: pd.Index, more: pd.Index) -> pd.Index:
+    """keys.append(more), skipping empty sides: pandas deprecates concatenating empty indexes."""
+    if not len(more):
+        return keys
+    if not len(keys):
+        return more
+    return keys.append(more)
+
+
+class ImportPrecheck:
+    """Dry-run referential-integrity check for an import, run before any write.
+
+    Existing keys are loaded once; every chunk passed to check() is run
+    through validators.validate_frame and then checked with vectorized set
+    membership for duplicate keys (within the file and against the database),
+    missing foreign keys and organisation name clashes. Keys seen in earlier
+    chunks are remembered, so a file can be checked chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        sqlite_mgr: SQLiteManager,
+        table_type: str,
+        replace_existing: bool = False,
+        pending_keys: Optional[Dict[str, pd.Index]] = None,
+    ):
+        self.table_type = table_type
+        self.replace_existing = replace_existing and table_type not in LINK_TABLES
+        self.skip_existing = replace_existing and table_type in LINK_TABLES
+        self.key_columns = PRIMARY_KEYS[table_type]
+
+        self.existing = self._key_index(sqlite_mgr.get_keys(table_type, self.key_columns))
+        self.seen = self.existing[:0]
+
+        # Keys a foreign key may point at: rows already stored plus rows pending in the same bundle
+        pending_keys = pending_keys or {}
+        self.references = {}
+        for column, target in FOREIGN_KEYS.get(table_type, {}).items():
+            target_ids = pd.Index(sqlite_mgr.get_keys(target, PRIMARY_KEYS[target])[PRIMARY_KEYS[target][0]])
+            if target in pending_keys:
+                target_ids = _append_keys(target_ids, pending_keys[target])
+            self.references[column] = target_ids
+
+        if table_type == "Organisation":
+            names = sqlite_mgr.get_keys("Organisation", ["org_name", "org_id"])
+            self.existing_names = pd.Series(names["org_id"].values, index=names["org_name"])
+            self.seen_names = pd.Index([], dtype=object)
+
+    def _key_index(self, df: pd.DataFrame) -> pd.Index:
+        if len(self.key_columns) == 1:
+            return pd.Index(df[self.key_columns[0]])
+        return pd.MultiIndex.from_frame(df[self.key_columns])
+
+    def check(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return one report row per problem found in this chunk (empty if clean)."""
+        clean, report = validators.validate_frame(self.table_type, df)
+        problems: List[pd.DataFrame] = [report]
+
+        def flag(mask: pd.Series, column: str, message: str):
+            if mask.any():
+                problems.append(pd.DataFrame({
+                    "Row": df.index[mask.values] + 1,
+                    "Column": column,
+                    "Value": df.loc[mask.values, column].astype(str).values,
+                    "Error": message,
+                }))
+
+        key_label = ", ".join(self.key_columns)
+        key_index = self._key_index(clean)
+
+        def flag_keys(mask, message):
+            flag(pd.Series(mask, index=clean.index).reindex(df.index, fill_value=False), self.key_columns[0], message)
+
+        # Duplicate keys within the file (this chunk and earlier ones)
+        flag_keys(key_index.duplicated(keep=False) | key_index.isin(self.seen), f"Duplicate {key_label} in file")
+
+        # Keys against the database
+        in_db = key_index.isin(self.existing)
+        if self.replace_existing:
+            flag_keys(~in_db, f"No existing record with this {key_label} to replace")
+        elif not self.skip_existing:
+            flag_keys(in_db, f"{key_label} already exists")
+
+        # Foreign keys
+        for column, target in FOREIGN_KEYS.get(self.table_type, {}).items():
+            missing = ~clean[column].isin(self.references[column])
+            flag(missing.reindex(df.index, fill_value=False), column, f"Referenced {target} does not exist")
+
+        # Unique organisation names
+        if self.table_type == "Organisation":
+            names = clean["org_name"]
+            duplicate = names.duplicated(keep=False) | names.isin(self.seen_names)
+            flag(duplicate.reindex(df.index, fill_value=False), "org_name", "Duplicate org_name in file")
+            owner = names.map(self.existing_names)
+            clash = owner.notna() & (owner != clean["org_id"])
+            flag(clash.reindex(df.index, fill_value=False), "org_name", "org_name is already used by another organisation")
+            self.seen_names = _append_keys(self.seen_names, pd.Index(names.astype(object)))
+
+        self.seen = _append_keys(self.seen, key_index)
+
+        return pd.concat(problems, ignore_index=True).sort_values("Row", kind="stable").reset_index(drop=True)
@@ -1,6 +1,10 @@
 import kuzu
+import pyarrow as pa
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Set, Tuple
 import config
 from utils import validators
 
@@ -9,8 +13,46 @@ class KuzuManager:
         self.db_path = db_path
         self.db = kuzu.Database(str(db_path))
         self.conn = kuzu.Connection(self.db)
+        # Graph queries use their own connection so they only ever see committed batches
+        self.read_conn = kuzu.Connection(self.db)
+        self._batch_lock = threading.RLock()
+        self._batch_depth = 0
+        # Bumped on every committed write batch; callers cache derived views under it.
+        # Seeded from the clock so a new manager never reuses an earlier one's versions.
+        self.graph_version = time.time_ns()
         self.init_schema()
 
+    @contextmanager
+    def batch(self) -> Iterator[kuzu.Connection]:
+        """Run the enclosed write statements in a single Kuzu transaction.
+
+        Commits on exit and rolls back if anything raises. Nested calls join
+        the outer transaction; graph_version is bumped when it commits. Kuzu
+        aborts the whole transaction when a statement fails, so errors should
+        not be swallowed inside a batch.
+        """
+        with self._batch_lock:
+            depth = self._batch_depth
+            if depth == 0:
+                self.conn.execute("BEGIN TRANSACTION")
+            self._batch_depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                self._batch_depth -= 1
+                if depth == 0:
+                    try:
+                        self.conn.execute("ROLLBACK")
+                    except RuntimeError:
+                        # Kuzu already rolled back when the failing statement errored
+                        pass
+                raise
+            else:
+                self._batch_depth -= 1
+                if depth == 0:
+                    self.conn.execute("COMMIT")
+                    self.graph_version += 1
+
     def init_schema(self):
         """Create Kuzu schema if not exists."""
         try:
@@ -91,188 +133,342 @@ class KuzuManager:
 
     def upsert_organisations(self, org_id: int, org_name: str, org_type: str, org_function: str):
         """Insert or update an organisation using MERGE."""
-        # MERGE finds the node by its primary key (org_id) or creates it.
-        # ON CREATE SET properties only if the node is new.
-        # ON MATCH SET properties to update the node if it already exists.
-        self.conn.execute("""
-            MERGE (o:Organisation {org_id: $org_id})
-            ON CREATE SET
-                o.org_name = $org_name,
-                o.org_type = $org_type,
-                o.org_function = $org_function
-            ON MATCH SET
-                o.org_name = $org_name,
-                o.org_type = $org_type,
-                o.org_function = $org_function
-        """, {
-            'org_id': org_id,
-            'org_name': org_name,
-            'org_type': org_type,
-            'org_function': org_function
-        })
+        with self.batch():
+            # MERGE finds the node by its primary key (org_id) or creates it.
+            # ON CREATE SET properties only if the node is new.
+            # ON MATCH SET properties to update the node if it already exists.
+            self.conn.execute("""
+                MERGE (o:Organisation {org_id: $org_id})
+                ON CREATE SET
+                    o.org_name = $org_name,
+                    o.org_type = $org_type,
+                    o.org_function = $org_function
+                ON MATCH SET
+                    o.org_name = $org_name,
+                    o.org_type = $org_type,
+                    o.org_function = $org_function
+            """, {
+                'org_id': org_id,
+                'org_name': org_name,
+                'org_type': org_type,
+                'org_function': org_function
+            })
 
     def upsert_stakeholder(self, stakeholder_id: int, org_id: int, name: str, job_title: str, role: str):
         """Insert or update a stakeholder using MERGE."""
-        # Upsert the Stakeholder node.
-        self.conn.execute("""
-            MERGE (s:Stakeholder {stakeholder_id: $stakeholder_id})
-            ON CREATE SET
-                s.org_id = $org_id,
-                s.name = $name,
-                s.job_title = $job_title,
-                s.role = $role
-            ON MATCH SET
-                s.org_id = $org_id,
-                s.name = $name,
-                s.job_title = $job_title,
-                s.role = $role
-        """, {
-            'stakeholder_id': stakeholder_id,
-            'org_id': org_id,
-            'name': name,
-            'job_title': job_title,
-            'role': role
-        })
-
-        # Remove any *existing* HasStakeholder relationships from this stakeholder.
-        # This handles cases where the stakeholder might have been moved to a new org.
-        self.conn.execute("""
-            MATCH (s:Stakeholder {stakeholder_id: $stakeholder_id})<-[r:HasStakeholder]-(o:Organisation)
-            DELETE r
-        """, {'stakeholder_id': stakeholder_id})
-
-        # Create the new/correct relationship.
-        self.conn.execute("""
-            MATCH (o:Organisation {org_id: $org_id}), (s:Stakeholder {stakeholder_id: $stakeholder_id})
-            MERGE (o)-[:HasStakeholder]->(s)
-        """, {
-            'org_id': org_id,
-            'stakeholder_id': stakeholder_id
-        })
+        with self.batch():
+            # Upsert the Stakeholder node.
+            self.conn.execute("""
+                MERGE (s:Stakeholder {stakeholder_id: $stakeholder_id})
+                ON CREATE SET
+                    s.org_id = $org_id,
+                    s.name = $name,
+                    s.job_title = $job_title,
+                    s.role = $role
+                ON MATCH SET
+                    s.org_id = $org_id,
+                    s.name = $name,
+                    s.job_title = $job_title,
+                    s.role = $role
+            """, {
+                'stakeholder_id': stakeholder_id,
+                'org_id': org_id,
+                'name': name,
+                'job_title': job_title,
+                'role': role
+            })
+
+            # Remove any *existing* HasStakeholder relationships from this stakeholder.
+            # This handles cases where the stakeholder might have been moved to a new org.
+            self.conn.execute("""
+                MATCH (s:Stakeholder {stakeholder_id: $stakeholder_id})<-[r:HasStakeholder]-(o:Organisation)
+                DELETE r
+            """, {'stakeholder_id': stakeholder_id})
+
+            # Create the new/correct relationship.
+            self.conn.execute("""
+                MATCH (o:Organisation {org_id: $org_id}), (s:Stakeholder {stakeholder_id: $stakeholder_id})
+                MERGE (o)-[:HasStakeholder]->(s)
+            """, {
+                'org_id': org_id,
+                'stakeholder_id': stakeholder_id
+            })
 
     def upsert_painpoint(self, painpoint_id: int, description: str, severity: str, urgency: str):
         """Insert or update a pain point using MERGE."""
-        # Merge the node
-        self.conn.execute("""
-            MERGE (p:PainPoint {painpoint_id: $painpoint_id})
-            ON CREATE SET
-                p.description = $description,
-                p.severity = $severity,
-                p.urgency = $urgency
-            ON MATCH SET
-                p.description = $description,
-                p.severity = $severity,
-                p.urgency = $urgency
-        """, {
-            'painpoint_id': painpoint_id,
-            'description': description,
-            'severity': severity,
-            'urgency': urgency
-        })
+        with self.batch():
+            # Merge the node
+            self.conn.execute("""
+                MERGE (p:PainPoint {painpoint_id: $painpoint_id})
+                ON CREATE SET
+                    p.description = $description,
+                    p.severity = $severity,
+                    p.urgency = $urgency
+                ON MATCH SET
+                    p.description = $description,
+                    p.severity = $severity,
+                    p.urgency = $urgency
+            """, {
+                'painpoint_id': painpoint_id,
+                'description': description,
+                'severity': severity,
+                'urgency': urgency
+            })
 
     def upsert_commercial(self, commercial_id: int, org_id: int, method: str, budget: float):
         """Insert or update a commercial using MERGE."""
-        # Upsert the Commercial node.
-        self.conn.execute("""
-            MERGE (c:Commercial {commercial_id: $commercial_id})
-            ON CREATE SET
-                c.org_id = $org_id,
-                c.method = $method,
-                c.budget = $budget
-            ON MATCH SET
-                c.org_id = $org_id,
-                c.method = $method,
-                c.budget = $budget
-        """, {
-            'commercial_id': commercial_id,
-            'org_id': org_id,
-            'method': method,
-            'budget': budget
-        })
-
-        # Remove any *existing* ProcuresThrough relationships for this commercial node.
-        self.conn.execute("""
-            MATCH (c:Commercial {commercial_id: $commercial_id})<-[r:ProcuresThrough]-(o:Organisation)
-            DELETE r
-        """, {'commercial_id': commercial_id})
-
-        # Create the new/correct relationship.
-        self.conn.execute("""
-            MATCH (o:Organisation {org_id: $org_id}), (c:Commercial {commercial_id: $commercial_id})
-            MERGE (o)-[:ProcuresThrough]->(c)
-        """, {
-            'org_id': org_id,
-            'commercial_id': commercial_id
-        })
+        with self.batch():
+            # Upsert the Commercial node.
+            self.conn.execute("""
+                MERGE (c:Commercial {commercial_id: $commercial_id})
+                ON CREATE SET
+                    c.org_id = $org_id,
+                    c.method = $method,
+                    c.budget = $budget
+                ON MATCH SET
+                    c.org_id = $org_id,
+                    c.method = $method,
+                    c.budget = $budget
+            """, {
+                'commercial_id': commercial_id,
+                'org_id': org_id,
+                'method': method,
+                'budget': budget
+            })
+
+            # Remove any *existing* ProcuresThrough relationships for this commercial node.
+            self.conn.execute("""
+                MATCH (c:Commercial {commercial_id: $commercial_id})<-[r:ProcuresThrough]-(o:Organisation)
+                DELETE r
+            """, {'commercial_id': commercial_id})
+
+            # Create the new/correct relationship.
+            self.conn.execute("""
+                MATCH (o:Organisation {org_id: $org_id}), (c:Commercial {commercial_id: $commercial_id})
+                MERGE (o)-[:ProcuresThrough]->(c)
+            """, {
+                'org_id': org_id,
+                'commercial_id': commercial_id
+            })
 
     def upsert_relationship(self, from_org_id: int, to_org_id: int, relationship_type: str):
         """Insert or update an organisation relationship."""
-        # Use MERGE to create the relationship if it doesn't already exist.
-        # This is idempotent and more efficient than deleting and then creating.
-        self.conn.execute("""
-            MATCH (a:Organisation {org_id: $from_org_id}), (b:Organisation {org_id: $to_org_id})
-            MERGE (a)-[r:OrgRelation {relationship_type: $relationship_type}]->(b)
-        """, {
-            'from_org_id': from_org_id,
-            'to_org_id': to_org_id,
-            'relationship_type': relationship_type
-        })
+        with self.batch():
+            # Use MERGE to create the relationship if it doesn't already exist.
+            # This is idempotent and more efficient than deleting and then creating.
+            self.conn.execute("""
+                MATCH (a:Organisation {org_id: $from_org_id}), (b:Organisation {org_id: $to_org_id})
+                MERGE (a)-[r:OrgRelation {relationship_type: $relationship_type}]->(b)
+            """, {
+                'from_org_id': from_org_id,
+                'to_org_id': to_org_id,
+                'relationship_type': relationship_type
+            })
 
     def sync_painpoint_assignment(self, org_id: int, painpoint_id: int):
         """Create HasPainPoint relationship between organisation and pain point."""
-        self.conn.execute("""
-            MATCH (o:Organisation {org_id: $org_id}), (p:PainPoint {painpoint_id: $painpoint_id})
-            MERGE (o)-[:HasPainPoint]->(p)
-        """, {
-            'org_id': org_id,
-            'painpoint_id': painpoint_id
-        })
+        with self.batch():
+            self.conn.execute("""
+                MATCH (o:Organisation {org_id: $org_id}), (p:PainPoint {painpoint_id: $painpoint_id})
+                MERGE (o)-[:HasPainPoint]->(p)
+            """, {
+                'org_id': org_id,
+                'painpoint_id': painpoint_id
+            })
 
     def clear_painpoint_assignments(self, painpoint_id: int):
         """Remove all HasPainPoint relationships for a given pain point."""
-        self.conn.execute("""
-            MATCH (o:Organisation)-[r:HasPainPoint]->(p:PainPoint {painpoint_id: $painpoint_id})
-            DELETE r
-        """, {'painpoint_id': painpoint_id})
+        with self.batch():
+            self.conn.execute("""
+                MATCH (o:Organisation)-[r:HasPainPoint]->(p:PainPoint {painpoint_id: $painpoint_id})
+                DELETE r
+            """, {'painpoint_id': painpoint_id})
+
+    # ======= Bulk Sync Operations (one statement per chunk of rows) =======
+
+    def bulk_upsert_organisations(self, rows: List[Dict[str, Any]]):
+        """Insert or update a chunk of organisations in one statement."""
+        with self.batch():
+            self.conn.execute("""
+                UNWIND $rows AS r
+                MERGE (o:Organisation {org_id: r.org_id})
+                ON CREATE SET
+                    o.org_name = r.org_name,
+                    o.org_type = r.org_type,
+                    o.org_function = r.org_function
+                ON MATCH SET
+                    o.org_name = r.org_name,
+                    o.org_type = r.org_type,
+                    o.org_function = r.org_function
+            """, {'rows': rows})
+
+    def bulk_upsert_stakeholders(self, rows: List[Dict[str, Any]]):
+        """Insert or update a chunk of stakeholders and re-point their HasStakeholder edges."""
+        with self.batch():
+            self.conn.execute("""
+                UNWIND $rows AS r
+                MERGE (s:Stakeholder {stakeholder_id: r.stakeholder_id})
+                ON CREATE SET
+                    s.org_id = r.org_id,
+                    s.name = r.name,
+                    s.job_title = r.job_title,
+                    s.role = r.role
+                ON MATCH SET
+                    s.org_id = r.org_id,
+                    s.name = r.name,
+                    s.job_title = r.job_title,
+                    s.role = r.role
+            """, {'rows': rows})
+
+            self.conn.execute("""
+                UNWIND $rows AS r
+                MATCH (s:Stakeholder {stakeholder_id: r.stakeholder_id})<-[e:HasStakeholder]-(:Organisation)
+                DELETE e
+            """, {'rows': rows})
+
+            # Join on the node's own org_id; matching both ends from the row is far slower in Kuzu
+            self.conn.execute("""
+                UNWIND $rows AS r
+                MATCH (s:Stakeholder {stakeholder_id: r.stakeholder_id}), (o:Organisation {org_id: s.org_id})
+                MERGE (o)-[:HasStakeholder]->(s)
+            """, {'rows': rows})
+
+    def bulk_upsert_painpoints(self, rows: List[Dict[str, Any]]):
+        """Insert or update a chunk of pain points in one statement."""
+        with self.batch():
+            self.conn.execute("""
+                UNWIND $rows AS r
+                MERGE (p:PainPoint {painpoint_id: r.painpoint_id})
+                ON CREATE SET
+                    p.description = r.description,
+                    p.severity = r.severity,
+                    p.urgency = r.urgency
+                ON MATCH SET
+                    p.description = r.description,
+                    p.severity = r.severity,
+                    p.urgency = r.urgency
+            """, {'rows': rows})
+
+    def bulk_upsert_commercials(self, rows: List[Dict[str, Any]]):
+        """Insert or update a chunk of commercials and re-point their ProcuresThrough edges."""
+        with self.batch():
+            self.conn.execute("""
+                UNWIND $rows AS r
+                MERGE (c:Commercial {commercial_id: r.commercial_id})
+                ON CREATE SET
+                    c.org_id = r.org_id,
+                    c.method = r.method,
+                    c.budget = r.budget
+                ON MATCH SET
+                    c.org_id = r.org_id,
+                    c.method = r.method,
+                    c.budget = r.budget
+            """, {'rows': rows})
+
+            self.conn.execute("""
+                UNWIND $rows AS r
+                MATCH (c:Commercial {commercial_id: r.commercial_id})<-[e:ProcuresThrough]-(:Organisation)
+                DELETE e
+            """, {'rows': rows})
+
+            self.conn.execute("""
+                UNWIND $rows AS r
+                MATCH (c:Commercial {commercial_id: r.commercial_id}), (o:Organisation {org_id: c.org_id})
+                MERGE (o)-[:ProcuresThrough]->(c)
+            """, {'rows': rows})
+
+    def bulk_clear_painpoint_assignments(self, painpoint_ids: List[int]):
+        """Remove all HasPainPoint relationships for the given pain points."""
+        with self.batch():
+            self.conn.execute("""
+                UNWIND $painpoint_ids AS painpoint_id
+                MATCH (:Organisation)-[r:HasPainPoint]->(p:PainPoint {painpoint_id: painpoint_id})
+                DELETE r
+            """, {'painpoint_ids': painpoint_ids})
+
+    def get_relationship_keys(self) -> Set[Tuple[int, int, str]]:
+        """Return (from_org_id, to_org_id, relationship_type) for every OrgRelation edge."""
+        result = self.conn.execute("""
+            MATCH (a:Organisation)-[r:OrgRelation]->(b:Organisation)
+            RETURN a.org_id, b.org_id, r.relationship_type
+        """)
+        keys = set()
+        while result.has_next():
+            keys.add(tuple(result.get_next()))
+        return keys
+
+    def bulk_insert_relationships(self, rows: List[Dict[str, Any]]):
+        """Append OrgRelation edges with COPY. Callers must skip edges that already exist."""
+        if not rows:
+            return
+        # COPY is orders of magnitude faster than per-row MERGE but does not deduplicate
+        edges = pa.Table.from_pylist(rows, schema=pa.schema([
+            ('from_org_id', pa.int64()),
+            ('to_org_id', pa.int64()),
+            ('relationship_type', pa.string()),
+        ]))
+        with self.batch():
+            self.conn.execute("COPY OrgRelation FROM edges")
+
+    def bulk_insert_painpoint_assignments(self, rows: List[Dict[str, Any]]):
+        """Append HasPainPoint edges with COPY. Callers must skip edges that already exist."""
+        if not rows:
+            return
+        edges = pa.Table.from_pylist(rows, schema=pa.schema([
+            ('org_id', pa.int64()),
+            ('painpoint_id', pa.int64()),
+        ]))
+        with self.batch():
+            self.conn.execute("COPY HasPainPoint FROM edges")
 
     def delete_organisation(self, org_id: int):
         """Delete an organisation and its related nodes."""
-        self.conn.execute("""
-            MATCH (o:Organisation {org_id: $org_id})
-            DETACH DELETE o
-        """, {'org_id': org_id})
+        with self.batch():
+            self.conn.execute("""
+                MATCH (o:Organisation {org_id: $org_id})
+                DETACH DELETE o
+            """, {'org_id': org_id})
 
     def delete_stakeholder(self, stakeholder_id: int):
         """Delete a stakeholder."""
-        self.conn.execute("""
-            MATCH (s:Stakeholder {stakeholder_id: $stakeholder_id})
-            DETACH DELETE s
-        """, {'stakeholder_id': stakeholder_id})
+        with self.batch():
+            self.conn.execute("""
+                MATCH (s:Stakeholder {stakeholder_id: $stakeholder_id})
+                DETACH DELETE s
+            """, {'stakeholder_id': stakeholder_id})
 
     def delete_painpoint(self, painpoint_id: int):
         """Delete a pain point."""
-        self.conn.execute("""
-            MATCH (p:PainPoint {painpoint_id: $painpoint_id})
-            DETACH DELETE p
-        """, {'painpoint_id': painpoint_id})
+        with self.batch():
+            self.conn.execute("""
+                MATCH (p:PainPoint {painpoint_id: $painpoint_id})
+                DETACH DELETE p
+            """, {'painpoint_id': painpoint_id})
 
     def delete_commercial(self, commercial_id: int):
         """Delete a commercial."""
-        self.conn.execute("""
-            MATCH (c:Commercial {commercial_id: $commercial_id})
-            DETACH DELETE c
-        """, {'commercial_id': commercial_id})
+        with self.batch():
+            self.conn.execute("""
+                MATCH (c:Commercial {commercial_id: $commercial_id})
+                DETACH DELETE c
+            """, {'commercial_id': commercial_id})
+
+    def clear_graph(self):
+        """Delete every node and relationship, keeping the schema."""
+        with self.batch():
+            self.conn.execute("MATCH (n) DETACH DELETE n")
 
     def delete_relationship(self, from_org_id: int, to_org_id: int, relationship_type: str):
         """Delete specific organisation relationship."""
-        self.conn.execute("""
-            MATCH (a:Organisation {org_id: $from_org_id})-[r:OrgRelation {relationship_type: $relationship_type}]->(b:Organisation {org_id: $to_org_id})
-            DELETE r
-        """, {
-            'from_org_id': from_org_id,
-            'to_org_id': to_org_id,
-            'relationship_type': relationship_type
-        })
+        with self.batch():
+            self.conn.execute("""
+                MATCH (a:Organisation {org_id: $from_org_id})-[r:OrgRelation {relationship_type: $relationship_type}]->(b:Organisation {org_id: $to_org_id})
+                DELETE r
+            """, {
+                'from_org_id': from_org_id,
+                'to_org_id': to_org_id,
+                'relationship_type': relationship_type
+            })
 
     # ======= Graph Query Operations (called by graph_manager) =======
 
@@ -290,7 +486,7 @@ class KuzuManager:
         edges = []
 
         # Get organisations
-        orgs = self.conn.execute("""
+        orgs = self.read_conn.execute("""
             MATCH (o:Organisation)
             RETURN o.org_id, o.org_name, o.org_type, o.org_function
         """).get_as_df()
@@ -307,7 +503,7 @@ class KuzuManager:
 
         # Get org relationships (filtered)
         rel_filter_str = ", ".join([f"'{r}'" for r in relationship_filters])
-        org_rels = self.conn.execute(f"""
+        org_rels = self.read_conn.execute(f"""
             MATCH (a:Organisation)-[r:OrgRelation]->(b:Organisation)
             WHERE r.relationship_type IN [{rel_filter_str}]
             RETURN a.org_id, b.org_id, r.relationship_type
@@ -322,7 +518,7 @@ class KuzuManager:
             })
 
         # Get stakeholders
-        stakeholders = self.conn.execute("""
+        stakeholders = self.read_conn.execute("""
             MATCH (o:Organisation)-[:HasStakeholder]->(s:Stakeholder)
             RETURN s.stakeholder_id, o.org_id, s.name, s.job_title, s.role
         """).get_as_df()
@@ -343,7 +539,7 @@ class KuzuManager:
             })
 
         # Get pain points
-        painpoints = self.conn.execute("""
+        painpoints = self.read_conn.execute("""
             MATCH (o:Organisation)-[:HasPainPoint]->(p:PainPoint)
             RETURN p.painpoint_id, o.org_id, p.description, p.severity, p.urgency
         """).get_as_df()
@@ -364,7 +560,7 @@ class KuzuManager:
             })
         
         # Get commercials
-        commercials = self.conn.execute("""
+        commercials = self.read_conn.execute("""
             MATCH (o:Organisation)-[:ProcuresThrough]->(c:Commercial)
             RETURN c.commercial_id, o.org_id, c.method, c.budget
         """).get_as_df()
@@ -408,7 +604,7 @@ class KuzuManager:
                     WHERE a.org_id IN [{frontier_list}] OR b.org_id IN [{frontier_list}]
                     RETURN a.org_id, b.org_id, r.relationship_type
                 """
-                df_rels = self.conn.execute(query).get_as_df()
+                df_rels = self.read_conn.execute(query).get_as_df()
                 new_frontier = set()
                 for _, row in df_rels.iterrows():
                     a_id = int(row["a.org_id"])
@@ -433,7 +629,7 @@ class KuzuManager:
                 WHERE o.org_id IN [{org_ids_str}]
                 RETURN o.org_id, o.org_name, o.org_type, o.org_function
             """
-            orgs_df = self.conn.execute(orgs_q).get_as_df()
+            orgs_df = self.read_conn.execute(orgs_q).get_as_df()
             for _, row in orgs_df.iterrows():
                 nodes.append({
                     "id": f"org{row['o.org_id']}",
@@ -449,7 +645,7 @@ class KuzuManager:
                 WHERE a.org_id IN [{org_ids_str}] AND b.org_id IN [{org_ids_str}]
                 RETURN a.org_id, b.org_id, r.relationship_type
             """
-            rels_df = self.conn.execute(rels_q).get_as_df()
+            rels_df = self.read_conn.execute(rels_q).get_as_df()
             for _, row in rels_df.iterrows():
                 edges.append({
                     "from": f"org{row['a.org_id']}",
@@ -464,7 +660,7 @@ class KuzuManager:
                 WHERE o.org_id IN [{org_ids_str}]
                 RETURN s.stakeholder_id, o.org_id, s.name, s.job_title, s.role
             """
-            st_df = self.conn.execute(st_q).get_as_df()
+            st_df = self.read_conn.execute(st_q).get_as_df()
             for _, row in st_df.iterrows():
                 nodes.append({
                     "id": f"st{row['s.stakeholder_id']}",
@@ -486,7 +682,7 @@ class KuzuManager:
                 WHERE o.org_id IN [{org_ids_str}]
                 RETURN p.painpoint_id, o.org_id, p.description, p.severity, p.urgency
             """
-            pp_df = self.conn.execute(pp_q).get_as_df()
+            pp_df = self.read_conn.execute(pp_q).get_as_df()
             for _, row in pp_df.iterrows():
                 desc = row.get("p.description") or ""
                 label = desc[:50] + "..." if len(desc) > 50 else desc
@@ -510,7 +706,7 @@ class KuzuManager:
                 WHERE o.org_id IN [{org_ids_str}]
                 RETURN c.commercial_id, o.org_id, c.method, c.budget
             """
-            com_df = self.conn.execute(com_q).get_as_df()
+            com_df = self.read_conn.execute(com_q).get_as_df()
             for _, row in com_df.iterrows():
                 method = row.get("c.method") or ""
                 budget = validators.parse_budget(row.get("c.budget"))
@@ -547,7 +743,7 @@ class KuzuManager:
                     MATCH (o:Organisation {{org_id: $org_id}})
                     RETURN o.org_id, o.org_name, o.org_type, o.org_function
                 """
-                df = self.conn.execute(q, {"org_id": from_org_id}).get_as_df()
+                df = self.read_conn.execute(q, {"org_id": from_org_id}).get_as_df()
                 nodes = []
                 for _, row in df.iterrows():
                     nodes.append({
@@ -573,7 +769,7 @@ class KuzuManager:
                     WHERE a.org_id IN [{frontier_list}] OR b.org_id IN [{frontier_list}]
                     RETURN a.org_id, b.org_id, r.relationship_type
                 """
-                df = self.conn.execute(query).get_as_df()
+                df = self.read_conn.execute(query).get_as_df()
                 next_frontier = set()
 
                 for _, row in df.iterrows():
@@ -625,7 +821,7 @@ class KuzuManager:
                 WHERE o.org_id IN [{org_ids_str}]
                 RETURN o.org_id, o.org_name, o.org_type, o.org_function
             """
-            orgs_df = self.conn.execute(orgs_q).get_as_df()
+            orgs_df = self.read_conn.execute(orgs_q).get_as_df()
             nodes = []
             org_meta = {}
             for _, row in orgs_df.iterrows():
@@ -651,7 +847,7 @@ class KuzuManager:
                     WHERE a.org_id = {a} AND b.org_id = {b}
                     RETURN r.relationship_type
                 """
-                rel_df = self.conn.execute(rel_q).get_as_df()
+                rel_df = self.read_conn.execute(rel_q).get_as_df()
                 if rel_df.empty:
                     # try reverse direction
                     rel_q = f"""
@@ -659,7 +855,7 @@ class KuzuManager:
                         WHERE a.org_id = {b} AND b.org_id = {a}
                         RETURN r.relationship_type
                     """
-                    rel_df = self.conn.execute(rel_q).get_as_df()
+                    rel_df = self.read_conn.execute(rel_q).get_as_df()
 
                 rel_type = rel_df.iloc[0]["r.relationship_type"] if not rel_df.empty else "org_relation"
                 edges.append({
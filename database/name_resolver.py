@@ -0,0 +1,100 @@
+from typing import Dict, Iterable, List, Tuple
+import pandas as pd
+from database.import_precheck import FOREIGN_KEYS, PRIMARY_KEYS
+from database.sqlite_manager import SQLiteManager
+from utils import validators
+
+# Name column accepted in place of each foreign key column
+NAME_COLUMNS = {
+    "org_id": "org_name",
+    "from_org_id": "from_org_name",
+    "to_org_id": "to_org_name",
+    "painpoint_id": "painpoint_description",
+}
+
+# Column of each referenced table that names are matched against
+LOOKUP_COLUMNS = {
+    "Organisation": "org_name",
+    "PainPoint": "description",
+}
+
+
+def _name_key(names: pd.Series) -> pd.Series:
+    """Match names ignoring surrounding whitespace and case."""
+    return names.astype("string").str.strip().str.casefold()
+
+
+class NameResolver:
+    """Resolves foreign keys given by name (org_name, painpoint_description, ...) to IDs.
+
+    Each referenced table's names are loaded once; every chunk is then
+    resolved with one vectorized hash join per name column. Names that match
+    no row, or more than one, are reported together and their rows dropped.
+    """
+
+    def __init__(self, sqlite_mgr: SQLiteManager, table_type: str, columns: Iterable[str]):
+        self.table_type = table_type
+        self.columns = self.name_columns(table_type, columns)
+
+        self.lookups: Dict[str, pd.Series] = {}
+        self.ambiguous: Dict[str, pd.Index] = {}
+        for fk in self.columns:
+            target = FOREIGN_KEYS[table_type][fk]
+            if target in self.lookups:
+                continue
+            name_column, id_column = LOOKUP_COLUMNS[target], PRIMARY_KEYS[target][0]
+            rows = sqlite_mgr.get_keys(target, [name_column, id_column])
+            ids = pd.Series(rows[id_column].values, index=_name_key(rows[name_column]).values)
+            duplicated = ids.index.duplicated(keep=False)
+            self.ambiguous[target] = ids.index[duplicated].unique()
+            self.lookups[target] = ids[~duplicated]
+
+    @staticmethod
+    def name_columns(table_type: str, columns: Iterable[str]) -> Dict[str, str]:
+        """Foreign key columns that are missing but can be resolved from a name column."""
+        columns = set(columns)
+        return {
+            fk: NAME_COLUMNS[fk]
+            for fk in FOREIGN_KEYS.get(table_type, {})
+            if fk not in columns and NAME_COLUMNS[fk] in columns
+        }
+
+    def resolve(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Fill the foreign key columns from names. Returns (resolved rows, report of unresolved names)."""
+        if not self.columns:
+            return df, pd.DataFrame(columns=validators.REPORT_COLUMNS)
+
+        df = df.copy()
+        problems: List[pd.DataFrame] = []
+        unresolved = pd.Series(False, index=df.index)
+        for fk, name_column in self.columns.items():
+            target = FOREIGN_KEYS[self.table_type][fk]
+            keys = _name_key(df[name_column])
+            ids = keys.map(self.lookups[target])
+            ambiguous = keys.isin(self.ambiguous[target])
+            missing = ids.isna() & ~ambiguous
+
+            for mask, message in (
+                (missing, f"No {target} with this name"),
+                (ambiguous, f"Name matches more than one {target}"),
+            ):
+                if mask.any():
+                    problems.append(pd.DataFrame({
+                        "Row": df.index[mask.values] + 1,
+                        "Column": name_column,
+                        "Value": df.loc[mask.values, name_column].astype(str).values,
+                        "Error": message,
+                    }))
+            unresolved |= missing | ambiguous
+            df[fk] = ids.astype("Int64")
+
+        report = pd.concat(problems, ignore_index=True) if problems else pd.DataFrame(columns=validators.REPORT_COLUMNS)
+        return df[~unresolved.values], report.sort_values("Row", kind="stable").reset_index(drop=True)
+
+    @staticmethod
+    def summarize(report: pd.DataFrame) -> pd.DataFrame:
+        """One line per distinct unresolved name with the number of rows using it."""
+        return (
+            report.groupby(["Column", "Value", "Error"], sort=False).size()
+            .rename("Rows").reset_index()
+        )
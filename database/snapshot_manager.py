@@ -0,0 +1,129 @@
+import argparse
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+import config
+from database.kuzu_manager import KuzuManager
+from database.sqlite_manager import SQLiteManager
+from database.sync_manager import SyncManager
+
+
+class SnapshotManager:
+    """Takes, rotates and restores point-in-time copies of the SQLite database.
+
+    Snapshots are plain SQLite files written with the online backup API (see
+    SQLiteManager.backup), so they can be opened, copied to another machine
+    or merged like any other database. Restoring one replaces the database in
+    a single step and rebuilds the graph from it; a "pre-restore" snapshot is
+    taken first so a restore can itself be undone.
+    """
+
+    def __init__(
+        self,
+        sqlite_mgr: SQLiteManager,
+        sync_mgr: Optional[SyncManager] = None,
+        snapshot_dir: Path = config.SNAPSHOT_DIR,
+        keep: int = config.SNAPSHOT_KEEP,
+    ):
+        self.sqlite = sqlite_mgr
+        self.sync = sync_mgr
+        self.snapshot_dir = Path(snapshot_dir)
+        self.keep = keep
+
+    def create(self, label: str = "", rotate: bool = True) -> Path:
+        """Write a new snapshot and delete the oldest beyond `keep`. Returns its path."""
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        label = re.sub(r"[^A-Za-z0-9_-]+", "-", label).strip("-")
+        stem = f"{Path(self.sqlite.db_path).stem}_{time.strftime('%Y%m%dT%H%M%S')}" + (f"_{label}" if label else "")
+        path = self.snapshot_dir / f"{stem}.db"
+        counter = 2
+        while path.exists():
+            path = self.snapshot_dir / f"{stem}_{counter}.db"
+            counter += 1
+
+        # Written under a temporary name so a half-written file is never listed
+        partial = path.with_name(path.name + ".partial")
+        started = time.perf_counter()
+        try:
+            self.sqlite.backup(partial)
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+        logger.info(f"Snapshot {path.name} written in {time.perf_counter() - started:.1f}s.")
+
+        if rotate:
+            self.rotate()
+        return path
+
+    def list_snapshots(self) -> List[Dict]:
+        """Snapshots on disk, newest first."""
+        if not self.snapshot_dir.exists():
+            return []
+        snapshots = []
+        for path in self.snapshot_dir.glob("*.db"):
+            stat = path.stat()
+            snapshots.append({
+                "name": path.name,
+                "path": path,
+                "size_mb": round(stat.st_size / 1_000_000, 1),
+                "created": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stat.st_mtime)),
+                "mtime": stat.st_mtime,
+            })
+        return sorted(snapshots, key=lambda s: s["mtime"], reverse=True)
+
+    def rotate(self) -> List[Path]:
+        """Delete all but the newest `keep` snapshots. Returns the deleted paths."""
+        removed = [s["path"] for s in self.list_snapshots()[self.keep:]]
+        for path in removed:
+            path.unlink()
+            logger.info(f"Rotated out snapshot {path.name}.")
+        return removed
+
+    def restore(self, path: Path) -> Path:
+        """Replace the database with a snapshot and rebuild the graph. Returns the pre-restore snapshot."""
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Snapshot not found: {path}")
+
+        # Rotation waits until after the restore so it cannot delete the snapshot being restored
+        safety = self.create("pre-restore", rotate=False)
+        started = time.perf_counter()
+        self.sqlite.restore(path)
+        logger.info(f"Restored {path.name} in {time.perf_counter() - started:.1f}s.")
+        self.rotate()
+
+        if self.sync:
+            self.sync.rebuild_graph()
+        return safety
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Take, list or restore SQLite snapshots.")
+    parser.add_argument("--db", type=Path, default=config.SQLITE_DB, help="SQLite database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="Take a snapshot")
+    create.add_argument("--label", default="", help="Added to the snapshot file name")
+    commands.add_parser("list", help="List snapshots, newest first")
+    restore = commands.add_parser("restore", help="Restore a snapshot and rebuild the graph (stop the app first)")
+    restore.add_argument("snapshot", type=Path, help="Snapshot file, or its name in the snapshot folder")
+    args = parser.parse_args()
+
+    sqlite_mgr = SQLiteManager(args.db)
+    if args.command == "create":
+        path = SnapshotManager(sqlite_mgr).create(args.label)
+        logger.info(f"✅ Snapshot written to {path}")
+    elif args.command == "list":
+        for snapshot in SnapshotManager(sqlite_mgr).list_snapshots():
+            print(f"{snapshot['created']}  {snapshot['size_mb']:>8} MB  {snapshot['name']}")
+    else:
+        sync_mgr = SyncManager(sqlite_mgr, KuzuManager())
+        snapshot = args.snapshot if args.snapshot.exists() else config.SNAPSHOT_DIR / args.snapshot
+        safety = SnapshotManager(sqlite_mgr, sync_mgr).restore(snapshot)
+        logger.info(f"✅ Restored {snapshot.name}; the previous state was saved as {safety.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,46 @@
 from hmac import new
+import json
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from click import Option
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 import config
 from utils import validators
 
+
+# config.TABLES name -> SQLite table name
+TABLE_NAMES = {
+    "Organisation": "Organisation",
+    "Stakeholder": "Stakeholder",
+    "PainPoint": "PainPoint",
+    "Commercial": "Commercial",
+    "OrgRelationship": "OrgRelationships",
+    "OrganisationPainPoint": "OrganisationPainPoint",
+}
+
+
+# Conflict policies for merge_database
+MERGE_POLICIES = ("skip", "overwrite", "rename")
+
+# Key added to records returned by writes: time.time() when their transaction committed
+COMMITTED_AT = "_committed_at"
+
+
+class Rollback(Exception):
+    """Raise inside SQLiteManager.transaction() to discard its writes quietly."""
+
+
 class SQLiteManager:
     def __init__(self, db_path: Path = config.SQLITE_DB):
         self.db_path = db_path
         self.conn = None
+        self._tx_lock = threading.RLock()
+        self._tx_depth = 0
+        self._tx_records: List[Dict] = []  # records returned by writes in the open transaction
         self.init_database()
 
     def get_connection(self):
@@ -20,6 +50,55 @@ class SQLiteManager:
             self.conn.row_factory = sqlite3.Row # Return rows as dictionaries
             self.conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints to allow ON DELETE CASCADE to work
         return self.conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Group writes into a single transaction that commits once on exit.
+
+        Write methods called inside the block skip their own commit. Nested
+        blocks use savepoints, so a failing inner block only rolls back its
+        own writes. Raise Rollback to discard the block without an error.
+        """
+        with self._tx_lock:
+            conn = self.get_connection()
+            depth = self._tx_depth
+            savepoint = f"sp_{depth}"
+            if depth == 0:
+                conn.execute("BEGIN")
+            else:
+                conn.execute(f"SAVEPOINT {savepoint}")
+            self._tx_depth += 1
+            returned = len(self._tx_records)
+            try:
+                yield conn
+            except BaseException as e:
+                self._tx_depth -= 1
+                del self._tx_records[returned:]
+                if depth == 0:
+                    conn.rollback()
+                else:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+                if not isinstance(e, Rollback):
+                    raise
+            else:
+                self._tx_depth -= 1
+                if depth == 0:
+                    conn.commit()
+                    committed_at = time.time()
+                    for record in self._tx_records:
+                        record[COMMITTED_AT] = committed_at
+                    self._tx_records.clear()
+                else:
+                    conn.execute(f"RELEASE {savepoint}")
+
+    def _returned(self, row: Optional[sqlite3.Row]) -> Optional[Dict]:
+        """Record from a RETURNING write, stamped with COMMITTED_AT when its transaction commits."""
+        if row is None:
+            return None
+        record = dict(row)
+        self._tx_records.append(record)
+        return record
     
     def init_database(self):
         """Create tables if they do not exist."""
@@ -94,152 +173,229 @@ class SQLiteManager:
             )
         """)
 
+        # Foreign key indexes so per-record lookups and cascades stay indexed
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_stakeholder_org_id ON Stakeholder(org_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_commercial_org_id ON Commercial(org_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_orgrelationships_to_org_id ON OrgRelationships(to_org_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_orgpainpoint_painpoint_id ON OrganisationPainPoint(painpoint_id)")
+
+        # Change log fed by triggers, read by delta exports (database/delta_export.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ChangeLog (
+                change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                op TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                data TEXT,
+                changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_changelog_table_change ON ChangeLog(table_name, change_id)")
+
+        # Last change_id exported by each delta export consumer; -1 while its first (baseline) export runs
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ExportCheckpoint (
+                name TEXT PRIMARY KEY,
+                change_id INTEGER NOT NULL,
+                exported_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # File imports; rows_committed advances in the same transaction as each chunk's writes
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ImportJob (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                file_hash TEXT NOT NULL,
+                file_name TEXT,
+                table_type TEXT NOT NULL,
+                file_format TEXT NOT NULL,
+                replace_existing INTEGER NOT NULL DEFAULT 0,
+                rows_committed INTEGER NOT NULL DEFAULT 0,
+                rows_synced INTEGER NOT NULL DEFAULT 0,
+                imported INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'running',
+                error_log TEXT NOT NULL DEFAULT '',
+                started_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_importjob_hash ON ImportJob(file_hash, table_type)")
+
+        # Changes are only logged while some delta export consumer has a checkpoint, so
+        # the log does not grow in deployments that never export deltas. Triggers are
+        # recreated so databases made before this condition existed pick it up too.
+        cursor.execute("DELETE FROM ChangeLog WHERE NOT EXISTS (SELECT 1 FROM ExportCheckpoint)")
+        for table, sqlite_table in TABLE_NAMES.items():
+            # Deletes keep the old row so the delta can carry a tombstone with its keys
+            old_row = ", ".join(f"'{c}', OLD.{c}" for c in config.TABLES[table])
+            for op in ("insert", "update", "delete"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS trg_{sqlite_table.lower()}_{op}")
+            cursor.execute(f"""
+                CREATE TRIGGER trg_{sqlite_table.lower()}_insert AFTER INSERT ON {sqlite_table}
+                WHEN EXISTS (SELECT 1 FROM ExportCheckpoint)
+                BEGIN
+                    INSERT INTO ChangeLog (table_name, op, row_id) VALUES ('{table}', 'insert', NEW.rowid);
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER trg_{sqlite_table.lower()}_update AFTER UPDATE ON {sqlite_table}
+                WHEN EXISTS (SELECT 1 FROM ExportCheckpoint)
+                BEGIN
+                    INSERT INTO ChangeLog (table_name, op, row_id) VALUES ('{table}', 'update', NEW.rowid);
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER trg_{sqlite_table.lower()}_delete AFTER DELETE ON {sqlite_table}
+                WHEN EXISTS (SELECT 1 FROM ExportCheckpoint)
+                BEGIN
+                    INSERT INTO ChangeLog (table_name, op, row_id, data)
+                    VALUES ('{table}', 'delete', OLD.rowid, json_object({old_row}));
+                END
+            """)
+
         conn.commit()
 
 # CRUD Operations
 
     # CREATE
-    def insert_organisation(self, org_name: str, org_type: str, org_function: str, org_id: Optional[int] = None) -> Optional[int]:
-        """Insert a new organisation. Returns the new org_id if successful"""
+    def insert_organisation(self, org_name: str, org_type: str, org_function: str, org_id: Optional[int] = None) -> Optional[Dict]:
+        """Insert a new organisation. Returns the stored record if successful"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            org_type_norm = validators.normalize_org_type(org_type)
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                org_type_norm = validators.normalize_org_type(org_type)
             
-            if org_id is None:
-                # ID is None, let AUTOINCREMENT handle it
-                cursor.execute("""
-                    INSERT INTO Organisation (org_name, org_type, org_function)
-                    VALUES (?, ?, ?)
-                """, (org_name, org_type_norm, org_function))
-                new_id = cursor.lastrowid
-            else:
-                # ID is provided, use it
-                cursor.execute("""
-                    INSERT INTO Organisation (org_id, org_name, org_type, org_function)
-                    VALUES (?, ?, ?, ?)
-                """, (org_id, org_name, org_type_norm, org_function))
-                new_id = org_id
+                if org_id is None:
+                    # ID is None, let AUTOINCREMENT handle it
+                    cursor.execute("""
+                        INSERT INTO Organisation (org_name, org_type, org_function)
+                        VALUES (?, ?, ?)
+                        RETURNING *
+                    """, (org_name, org_type_norm, org_function))
+                else:
+                    # ID is provided, use it
+                    cursor.execute("""
+                        INSERT INTO Organisation (org_id, org_name, org_type, org_function)
+                        VALUES (?, ?, ?, ?)
+                        RETURNING *
+                    """, (org_id, org_name, org_type_norm, org_function))
+                record = self._returned(cursor.fetchone())
 
-            conn.commit()
-            return new_id
+                return record
         except sqlite3.IntegrityError as e:
             print(f"Error inserting organisation: {e}")
-            conn.rollback()
             return None
         
-    def insert_stakeholder(self, org_id: int, name: str, job_title: str, role: str, stakeholder_id: Optional[int] = None) -> Optional[int]:
-        """Insert a new stakeholder. Returns the new stakeholder_id if successful"""
+    def insert_stakeholder(self, org_id: int, name: str, job_title: str, role: str, stakeholder_id: Optional[int] = None) -> Optional[Dict]:
+        """Insert a new stakeholder. Returns the stored record if successful"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            if stakeholder_id is None:
-                # ID is None, let AUTOINCREMENT handle it
-                cursor.execute("""
-                    INSERT INTO Stakeholder (org_id, name, job_title, role)
-                    VALUES (?, ?, ?, ?)
-                """, (org_id, name, job_title, role))
-                new_id = cursor.lastrowid
-            else:
-                # ID is provided, use it
-                cursor.execute("""
-                    INSERT INTO Stakeholder (stakeholder_id, org_id, name, job_title, role)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (stakeholder_id, org_id, name, job_title, role))
-                new_id = stakeholder_id
-            conn.commit()
-            return new_id
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                if stakeholder_id is None:
+                    # ID is None, let AUTOINCREMENT handle it
+                    cursor.execute("""
+                        INSERT INTO Stakeholder (org_id, name, job_title, role)
+                        VALUES (?, ?, ?, ?)
+                        RETURNING *
+                    """, (org_id, name, job_title, role))
+                else:
+                    # ID is provided, use it
+                    cursor.execute("""
+                        INSERT INTO Stakeholder (stakeholder_id, org_id, name, job_title, role)
+                        VALUES (?, ?, ?, ?, ?)
+                        RETURNING *
+                    """, (stakeholder_id, org_id, name, job_title, role))
+                record = self._returned(cursor.fetchone())
+                return record
         except sqlite3.IntegrityError as e:
             print(f"Error inserting stakeholder: {e}")
-            conn.rollback()
             return None
         
-    def insert_painpoint(self, description: str, severity: str, urgency: str, painpoint_id: Optional[int] = None) -> Optional[int]:
-        """Insert a new pain point. Returns the new painpoint_id if successful"""
+    def insert_painpoint(self, description: str, severity: str, urgency: str, painpoint_id: Optional[int] = None) -> Optional[Dict]:
+        """Insert a new pain point. Returns the stored record if successful"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            if painpoint_id is None:
-                # ID is None, let AUTOINCREMENT handle it
-                cursor.execute("""
-                    INSERT INTO PainPoint (description, severity, urgency)
-                    VALUES (?, ?, ?)
-                """, (description, severity, urgency))
-                new_id = cursor.lastrowid
-            else:
-                # ID is provided, use it
-                cursor.execute("""
-                    INSERT INTO PainPoint (painpoint_id, description, severity, urgency)
-                    VALUES (?, ?, ?, ?)
-                """, (painpoint_id, description, severity, urgency))
-                new_id = painpoint_id
-            conn.commit()
-            return new_id
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                if painpoint_id is None:
+                    # ID is None, let AUTOINCREMENT handle it
+                    cursor.execute("""
+                        INSERT INTO PainPoint (description, severity, urgency)
+                        VALUES (?, ?, ?)
+                        RETURNING *
+                    """, (description, severity, urgency))
+                else:
+                    # ID is provided, use it
+                    cursor.execute("""
+                        INSERT INTO PainPoint (painpoint_id, description, severity, urgency)
+                        VALUES (?, ?, ?, ?)
+                        RETURNING *
+                    """, (painpoint_id, description, severity, urgency))
+                record = self._returned(cursor.fetchone())
+                return record
         except sqlite3.IntegrityError as e:
             print(f"Error inserting pain point: {e}")
-            conn.rollback()
             return None
 
-    def insert_commercial(self, org_id: int, method: str, budget: float, commercial_id: Optional[int] = None) -> Optional[int]:
-        """Insert a new commercial entry. Returns the new commercial_id if successful"""
+    def insert_commercial(self, org_id: int, method: str, budget: float, commercial_id: Optional[int] = None) -> Optional[Dict]:
+        """Insert a new commercial entry. Returns the stored record if successful"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            budget_norm = validators.parse_budget(budget)
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                budget_norm = validators.parse_budget(budget)
 
-            if commercial_id is None:
-                # ID is None, let AUTOINCREMENT handle it
-                cursor.execute("""
-                    INSERT INTO Commercial (org_id, method, budget)
-                    VALUES (?, ?, ?)
-                """, (org_id, method, budget_norm))
-                new_id = cursor.lastrowid
-            else:
-                # ID is provided, use it
-                cursor.execute("""
-                    INSERT INTO Commercial (commercial_id, org_id, method, budget)
-                    VALUES (?, ?, ?, ?)
-                """, (commercial_id, org_id, method, budget_norm))
-                new_id = commercial_id
-            conn.commit()
-            return new_id
+                if commercial_id is None:
+                    # ID is None, let AUTOINCREMENT handle it
+                    cursor.execute("""
+                        INSERT INTO Commercial (org_id, method, budget)
+                        VALUES (?, ?, ?)
+                        RETURNING *
+                    """, (org_id, method, budget_norm))
+                else:
+                    # ID is provided, use it
+                    cursor.execute("""
+                        INSERT INTO Commercial (commercial_id, org_id, method, budget)
+                        VALUES (?, ?, ?, ?)
+                        RETURNING *
+                    """, (commercial_id, org_id, method, budget_norm))
+                record = self._returned(cursor.fetchone())
+                return record
         except sqlite3.IntegrityError as e:
             print(f"Error inserting commercial entry: {e}")
-            conn.rollback()
             return None
         
-    def insert_org_relationship(self, from_org_id: int, to_org_id: int, relationship_type: str) -> bool:
-        """Insert a new organization relationship."""
+    def insert_org_relationship(self, from_org_id: int, to_org_id: int, relationship_type: str) -> Optional[Dict]:
+        """Insert a new organization relationship. Returns the stored record if successful"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            relationship_type_norm = validators.normalize_relationship_type(relationship_type)
-            cursor.execute("""
-                INSERT INTO OrgRelationships (from_org_id, to_org_id, relationship_type)
-                VALUES (?, ?, ?)
-            """, (from_org_id, to_org_id, relationship_type_norm))
-            conn.commit()
-            return True
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                relationship_type_norm = validators.normalize_relationship_type(relationship_type)
+                cursor.execute("""
+                    INSERT INTO OrgRelationships (from_org_id, to_org_id, relationship_type)
+                    VALUES (?, ?, ?)
+                    RETURNING *
+                """, (from_org_id, to_org_id, relationship_type_norm))
+                record = self._returned(cursor.fetchone())
+                return record
         except sqlite3.IntegrityError as e:
             print(f"Error inserting organization relationship: {e}")
-            conn.rollback()
-            return False
+            return None
         
-    def insert_painpoint_assignment(self, org_id: int, painpoint_id: int) -> bool:
-        """Insert a new organisation ↔ painpoint relationship"""
+    def insert_painpoint_assignment(self, org_id: int, painpoint_id: int) -> Optional[Dict]:
+        """Insert a new organisation ↔ painpoint relationship. Returns the stored record if successful"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO OrganisationPainPoint (org_id, painpoint_id)
-                VALUES (?, ?)
-            """, (org_id, painpoint_id))
-            conn.commit()
-            return True
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO OrganisationPainPoint (org_id, painpoint_id)
+                    VALUES (?, ?)
+                    RETURNING *
+                """, (org_id, painpoint_id))
+                record = self._returned(cursor.fetchone())
+                return record
         except sqlite3.IntegrityError as e:
             print(f"Error inserting organisation ↔ painpoint assignment: {e}")
-            conn.rollback()
-            return False
+            return None
         
     # READ
     def get_all_organisations(self) -> pd.DataFrame:
@@ -325,6 +481,46 @@ class SQLiteManager:
         """, conn)
         return df
     
+    def iter_rows(self, query: str, params: tuple = (), chunk_size: int = config.SYNC_CHUNK_SIZE, as_dicts: bool = True) -> Iterator[List]:
+        """Stream query results as lists of dicts (or plain tuples), chunk_size rows at a time.
+
+        Uses its own short-lived connection so it can run on a worker thread
+        alongside the shared one; memory is bounded by chunk_size.
+        """
+        conn = sqlite3.connect(self.db_path)
+        if as_dicts:
+            conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows] if as_dicts else rows
+        finally:
+            conn.close()
+
+    def iter_table(self, table: str, chunk_size: int = config.SYNC_CHUNK_SIZE, as_dicts: bool = True) -> Iterator[List]:
+        """Stream the config.TABLES columns of a table in chunks."""
+        columns = ", ".join(config.TABLES[table])
+        yield from self.iter_rows(f"SELECT {columns} FROM {TABLE_NAMES[table]}", chunk_size=chunk_size, as_dicts=as_dicts)
+
+    def get_keys(self, table: str, columns: List[str]) -> pd.DataFrame:
+        """Get the given key columns of every row in one of config.TABLES."""
+        conn = self.get_connection()
+        return pd.read_sql_query(f"SELECT {', '.join(columns)} FROM {TABLE_NAMES[table]}", conn)
+
+    def get_rows_by_key(self, table: str, key_column: str, keys: List[int]) -> pd.DataFrame:
+        """Get the config.TABLES columns of the rows whose key_column is in keys, in one query."""
+        conn = self.get_connection()
+        # json_each avoids SQLite's bound-parameter limit for large key lists
+        return pd.read_sql_query(
+            f"SELECT {', '.join(config.TABLES[table])} FROM {TABLE_NAMES[table]} "
+            f"WHERE {key_column} IN (SELECT value FROM json_each(?))",
+            conn,
+            params=(json.dumps(keys),),
+        )
+
     def get_organisation_by_id(self, org_id: int) -> Optional[Dict]:
         """Get an organisation by its ID."""
         conn = self.get_connection()
@@ -332,100 +528,136 @@ class SQLiteManager:
         cursor.execute("SELECT * FROM Organisation WHERE org_id = ?", (org_id,))
         row = cursor.fetchone()
         return dict(row) if row else None
+
+    def get_stakeholder_by_id(self, stakeholder_id: int) -> Optional[Dict]:
+        """Get a stakeholder by its ID."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM Stakeholder WHERE stakeholder_id = ?", (stakeholder_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def get_painpoint_by_id(self, painpoint_id: int) -> Optional[Dict]:
+        """Get a pain point by its ID."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM PainPoint WHERE painpoint_id = ?", (painpoint_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def get_commercial_by_id(self, commercial_id: int) -> Optional[Dict]:
+        """Get a commercial entry by its ID."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM Commercial WHERE commercial_id = ?", (commercial_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def get_org_relationship_by_id(self, relationship_id: int) -> Optional[Dict]:
+        """Get an organisation relationship by its ID."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM OrgRelationships WHERE id = ?", (relationship_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
     
     # UPDATE
-    def update_organisation(self, org_id: int, org_name: str, org_type: str, org_function: str) -> bool:
-        """Update an existing organisation."""
+    def update_organisation(self, org_id: int, org_name: str, org_type: str, org_function: str) -> Optional[Dict]:
+        """Update an existing organisation. Returns the stored record if it exists."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE Organisation
-                SET org_name = ?, org_type = ?, org_function = ?
-                WHERE org_id = ?
-            """, (org_name, org_type, org_function, org_id))
-            conn.commit()
-            return cursor.rowcount > 0
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                org_type_norm = validators.normalize_org_type(org_type)
+                cursor.execute("""
+                    UPDATE Organisation
+                    SET org_name = ?, org_type = ?, org_function = ?
+                    WHERE org_id = ?
+                    RETURNING *
+                """, (org_name, org_type_norm, org_function, org_id))
+                row = cursor.fetchone()
+                return self._returned(row)
         except sqlite3.IntegrityError as e:
             print(f"Error updating organisation: {e}")
-            return False
+            return None
         
-    def update_stakeholder(self, stakeholder_id: int, org_id: int, name: str, job_title: str, role: str) -> bool:
-        """Update an existing stakeholder."""
+    def update_stakeholder(self, stakeholder_id: int, org_id: int, name: str, job_title: str, role: str) -> Optional[Dict]:
+        """Update an existing stakeholder. Returns the stored record if it exists."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE Stakeholder
-                SET org_id = ?, name = ?, job_title = ?, role = ?
-                WHERE stakeholder_id = ?
-            """, (org_id, name, job_title, role, stakeholder_id))
-            conn.commit()
-            return cursor.rowcount > 0
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE Stakeholder
+                    SET org_id = ?, name = ?, job_title = ?, role = ?
+                    WHERE stakeholder_id = ?
+                    RETURNING *
+                """, (org_id, name, job_title, role, stakeholder_id))
+                row = cursor.fetchone()
+                return self._returned(row)
         except sqlite3.IntegrityError as e:
             print(f"Error updating stakeholder: {e}")
-            return False
+            return None
         
-    def update_painpoint(self, painpoint_id: int, description: str, severity: str, urgency: str) -> bool:
-        """Update an existing pain point."""
+    def update_painpoint(self, painpoint_id: int, description: str, severity: str, urgency: str) -> Optional[Dict]:
+        """Update an existing pain point. Returns the stored record if it exists."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE PainPoint
-                SET description = ?, severity = ?, urgency = ?
-                WHERE painpoint_id = ?
-            """, (description, severity, urgency, painpoint_id))
-            conn.commit()
-            return cursor.rowcount > 0
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE PainPoint
+                    SET description = ?, severity = ?, urgency = ?
+                    WHERE painpoint_id = ?
+                    RETURNING *
+                """, (description, severity, urgency, painpoint_id))
+                row = cursor.fetchone()
+                return self._returned(row)
         except sqlite3.IntegrityError as e:
             print(f"Error updating pain point: {e}")
-            return False
+            return None
         
     def update_painpoint_assignments(self, painpoint_id: int, org_ids: List[int]) -> bool:
         """Update the assignments of a pain point to organisations."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            # Delete existing assignments
-            cursor.execute("DELETE FROM OrganisationPainPoint WHERE painpoint_id = ?", (painpoint_id,))
-            # Insert new assignments
-            for org_id in org_ids:
-                cursor.execute("""
-                    INSERT INTO OrganisationPainPoint (org_id, painpoint_id)
-                    VALUES (?, ?)
-                """, (org_id, painpoint_id))
-            conn.commit()
-            return True
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                # Delete existing assignments
+                cursor.execute("DELETE FROM OrganisationPainPoint WHERE painpoint_id = ?", (painpoint_id,))
+                # Insert new assignments
+                for org_id in org_ids:
+                    cursor.execute("""
+                        INSERT INTO OrganisationPainPoint (org_id, painpoint_id)
+                        VALUES (?, ?)
+                    """, (org_id, painpoint_id))
+                return True
         except sqlite3.IntegrityError as e:
             print(f"Error updating pain point assignments: {e}")
             return False
         
-    def update_commercial(self, commercial_id: int, org_id: int, method: str, budget: float) -> bool:   
-        """Update an existing commercial entry."""
+    def update_commercial(self, commercial_id: int, org_id: int, method: str, budget: float) -> Optional[Dict]:   
+        """Update an existing commercial entry. Returns the stored record if it exists."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE Commercial
-                SET org_id = ?, method = ?, budget = ?
-                WHERE commercial_id = ?
-            """, (org_id, method, budget, commercial_id))
-            conn.commit()
-            return cursor.rowcount > 0
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                budget_norm = validators.parse_budget(budget)
+                cursor.execute("""
+                    UPDATE Commercial
+                    SET org_id = ?, method = ?, budget = ?
+                    WHERE commercial_id = ?
+                    RETURNING *
+                """, (org_id, method, budget_norm, commercial_id))
+                row = cursor.fetchone()
+                return self._returned(row)
         except sqlite3.IntegrityError as e:
             print(f"Error updating commercial entry: {e}")
-            return False
+            return None
     
     # DELETE
     def delete_organisation(self, org_id: int) -> bool:
         """Delete an organisation by its ID."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM Organisation WHERE org_id = ?", (org_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM Organisation WHERE org_id = ?", (org_id,))
+                return cursor.rowcount > 0
         except Exception as e:
             print(f"Error deleting organisation: {e}")
             return False
@@ -433,11 +665,10 @@ class SQLiteManager:
     def delete_stakeholder(self, stakeholder_id: int) -> bool:
         """Delete a stakeholder by its ID."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM Stakeholder WHERE stakeholder_id = ?", (stakeholder_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM Stakeholder WHERE stakeholder_id = ?", (stakeholder_id,))
+                return cursor.rowcount > 0
         except Exception as e:
             print(f"Error deleting stakeholder: {e}")
             return False
@@ -445,11 +676,10 @@ class SQLiteManager:
     def delete_painpoint(self, painpoint_id: int) -> bool:
         """Delete a pain point by its ID."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM PainPoint WHERE painpoint_id = ?", (painpoint_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM PainPoint WHERE painpoint_id = ?", (painpoint_id,))
+                return cursor.rowcount > 0
         except Exception as e:
             print(f"Error deleting pain point: {e}")
             return False
@@ -457,11 +687,10 @@ class SQLiteManager:
     def delete_commercial(self, commercial_id: int) -> bool:
         """Delete a commercial entry by its ID."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM Commercial WHERE commercial_id = ?", (commercial_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM Commercial WHERE commercial_id = ?", (commercial_id,))
+                return cursor.rowcount > 0
         except Exception as e:
             print(f"Error deleting commercial entry: {e}")
             return False
@@ -469,15 +698,220 @@ class SQLiteManager:
     def delete_org_relationship(self, relationship_id: int) -> bool:
         """Delete an organization relationship by its ID."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM OrgRelationships WHERE id = ?", (relationship_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM OrgRelationships WHERE id = ?", (relationship_id,))
+                return cursor.rowcount > 0
         except Exception as e:
             print(f"Error deleting organization relationship: {e}")
             return False
         
+    # MERGE
+    def merge_database(self, other_path: Path, policy: str = "skip", suffix: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Merge another stakeholder-map database into this one with set-based INSERT ... SELECT.
+
+        Incoming records get new IDs. Temp map tables translate the other
+        database's organisation and pain point IDs, so its links and child
+        records point at the right rows. A record that already exists here is
+        a conflict. Organisations match by name and pain points by description;
+        stakeholders match by organisation and name, commercials by
+        organisation and method. `policy` decides what happens to conflicts:
+          skip       keep the record here and link to it
+          overwrite  update the record here with the incoming values
+          rename     add the incoming record alongside; organisation names and
+                     pain point descriptions get " (suffix)" appended, or
+                     " (suffix 2)", " (suffix 3)" ... if that is taken too
+        Links that already exist are skipped. Everything is written in one
+        transaction. Returns {table: {"inserted", "updated", "conflicts"}}.
+        The graph must be rebuilt afterwards.
+        """
+        if policy not in MERGE_POLICIES:
+            raise ValueError(f"Unknown merge policy: {policy}")
+        other_path = Path(other_path)
+        if other_path.resolve() == Path(self.db_path).resolve():
+            raise ValueError("Cannot merge a database into itself")
+        suffix = suffix or other_path.stem
+
+        with self._tx_lock:
+            conn = self.get_connection()
+            # ATTACH and DETACH are not allowed inside a transaction
+            conn.execute("ATTACH DATABASE ? AS src", (str(other_path),))
+            try:
+                found = {row[0] for row in conn.execute("SELECT name FROM src.sqlite_master WHERE type = 'table'")}
+                missing = [t for t in TABLE_NAMES.values() if t not in found]
+                if missing:
+                    raise ValueError(f"{other_path.name} is not a stakeholder-map database (missing {', '.join(missing)})")
+
+                with self.transaction():
+                    stats = {
+                        "Organisation": self._merge_named(conn, "Organisation", "org_id", "org_name", ["org_type", "org_function"], policy, suffix),
+                        "PainPoint": self._merge_named(conn, "PainPoint", "painpoint_id", "description", ["severity", "urgency"], policy, suffix),
+                        "Stakeholder": self._merge_children(conn, "Stakeholder", ["name"], ["job_title", "role"], policy),
+                        "Commercial": self._merge_children(conn, "Commercial", ["method"], ["budget"], policy),
+                    }
+                    inserted = conn.execute("""
+                        INSERT OR IGNORE INTO OrgRelationships (from_org_id, to_org_id, relationship_type)
+                        SELECT f.dst_id, t.dst_id, s.relationship_type
+                        FROM src.OrgRelationships s
+                        JOIN temp.merge_organisation_map f ON f.src_id = s.from_org_id
+                        JOIN temp.merge_organisation_map t ON t.src_id = s.to_org_id
+                    """).rowcount
+                    stats["OrgRelationship"] = {"inserted": inserted, "updated": 0, "conflicts": 0}
+                    inserted = conn.execute("""
+                        INSERT OR IGNORE INTO OrganisationPainPoint (org_id, painpoint_id)
+                        SELECT o.dst_id, p.dst_id
+                        FROM src.OrganisationPainPoint s
+                        JOIN temp.merge_organisation_map o ON o.src_id = s.org_id
+                        JOIN temp.merge_painpoint_map p ON p.src_id = s.painpoint_id
+                    """).rowcount
+                    stats["OrganisationPainPoint"] = {"inserted": inserted, "updated": 0, "conflicts": 0}
+            finally:
+                for table in ("organisation", "painpoint"):
+                    conn.execute(f"DROP TABLE IF EXISTS temp.merge_{table}_map")
+                    conn.execute(f"DROP TABLE IF EXISTS temp.merge_{table}_names")
+                conn.execute("DETACH DATABASE src")
+        return stats
+
+    @staticmethod
+    def _merge_named(conn, table: str, id_column: str, name_column: str, value_columns: List[str], policy: str, suffix: str) -> Dict[str, int]:
+        """Map, update and insert the rows of a table whose records are identified by a name."""
+        map_table = f"temp.merge_{table.lower()}_map"
+        values = ", ".join(value_columns)
+        conn.execute(f"CREATE TEMP TABLE merge_{table.lower()}_map (src_id INTEGER PRIMARY KEY, dst_id INTEGER NOT NULL)")
+        # Updates and child-record conflicts look the map up from the destination side
+        conn.execute(f"CREATE INDEX temp.merge_{table.lower()}_map_dst ON merge_{table.lower()}_map(dst_id)")
+
+        updated = 0
+        if policy == "rename":
+            conflicts = conn.execute(f"""
+                SELECT COUNT(*) FROM src.{table} s
+                WHERE EXISTS (SELECT 1 FROM main.{table} d WHERE d.{name_column} = s.{name_column})
+            """).fetchone()[0]
+        else:
+            # Conflicts resolve to the existing record
+            conflicts = conn.execute(f"""
+                INSERT INTO {map_table} (src_id, dst_id)
+                SELECT s.{id_column}, MIN(d.{id_column})
+                FROM src.{table} s JOIN main.{table} d ON d.{name_column} = s.{name_column}
+                GROUP BY s.{id_column}
+            """).rowcount
+            if policy == "overwrite":
+                updated = conn.execute(f"""
+                    UPDATE main.{table} SET ({values}) = (
+                        SELECT {", ".join(f"s.{c}" for c in value_columns)}
+                        FROM {map_table} m JOIN src.{table} s ON s.{id_column} = m.src_id
+                        WHERE m.dst_id = main.{table}.{id_column}
+                        ORDER BY m.src_id LIMIT 1
+                    )
+                    WHERE {id_column} IN (SELECT dst_id FROM {map_table})
+                """).rowcount
+
+        # New IDs are handed out above the current high-water mark, in source ID order
+        base = conn.execute(f"""
+            SELECT MAX(
+                COALESCE((SELECT seq FROM sqlite_sequence WHERE name = '{table}'), 0),
+                COALESCE((SELECT MAX({id_column}) FROM main.{table}), 0)
+            )
+        """).fetchone()[0]
+        conn.execute(f"""
+            INSERT INTO {map_table} (src_id, dst_id)
+            SELECT s.{id_column}, ? + ROW_NUMBER() OVER (ORDER BY s.{id_column})
+            FROM src.{table} s
+            WHERE s.{id_column} NOT IN (SELECT src_id FROM {map_table})
+        """, (base,))
+
+        # Names of the new rows. Renamed ones get " (suffix)", then " (suffix 2)" and so on
+        # while that clashes with a stored name, an incoming one, or an earlier rename
+        names_table = f"temp.merge_{table.lower()}_names"
+        conn.execute(f"CREATE TEMP TABLE merge_{table.lower()}_names (src_id INTEGER PRIMARY KEY, base TEXT NOT NULL, name TEXT NOT NULL, renamed INTEGER NOT NULL)")
+        conn.execute(f"CREATE INDEX temp.merge_{table.lower()}_names_name ON merge_{table.lower()}_names(name)")
+        conn.execute(f"""
+            INSERT INTO {names_table} (src_id, base, name, renamed)
+            SELECT s.{id_column}, s.{name_column}, s.{name_column},
+                   EXISTS (SELECT 1 FROM main.{table} d WHERE d.{name_column} = s.{name_column})
+            FROM src.{table} s JOIN {map_table} m ON m.src_id = s.{id_column}
+            WHERE m.dst_id > ?
+        """, (base,))
+        counter = 1
+        while True:
+            label = suffix if counter == 1 else f"{suffix} {counter}"
+            clashing = conn.execute(f"""
+                UPDATE {names_table} AS n SET name = n.base || ' (' || ? || ')'
+                WHERE n.renamed AND (
+                    n.name = n.base
+                    OR EXISTS (SELECT 1 FROM main.{table} d WHERE d.{name_column} = n.name)
+                    OR EXISTS (
+                        SELECT 1 FROM {names_table} o
+                        WHERE o.name = n.name AND o.src_id != n.src_id AND (NOT o.renamed OR o.src_id < n.src_id)
+                    )
+                )
+            """, (label,)).rowcount
+            if not clashing:
+                break
+            counter += 1
+
+        inserted = conn.execute(f"""
+            INSERT INTO main.{table} ({id_column}, {name_column}, {values})
+            SELECT m.dst_id, n.name, {", ".join(f"s.{c}" for c in value_columns)}
+            FROM src.{table} s
+            JOIN {map_table} m ON m.src_id = s.{id_column}
+            JOIN {names_table} n ON n.src_id = s.{id_column}
+            ORDER BY m.dst_id
+        """).rowcount
+        return {"inserted": inserted, "updated": updated, "conflicts": conflicts}
+
+    @staticmethod
+    def _merge_children(conn, table: str, match_columns: List[str], value_columns: List[str], policy: str) -> Dict[str, int]:
+        """Insert (and on overwrite, update) records owned by an organisation, remapping org_id."""
+        same = " AND ".join(["d.org_id = m.dst_id"] + [f"d.{c} = s.{c}" for c in match_columns])
+        source = f"src.{table} s JOIN temp.merge_organisation_map m ON m.src_id = s.org_id"
+        conflicts = conn.execute(f"SELECT COUNT(*) FROM {source} WHERE EXISTS (SELECT 1 FROM main.{table} d WHERE {same})").fetchone()[0]
+
+        updated = 0
+        if policy == "overwrite":
+            updated = conn.execute(f"""
+                UPDATE main.{table} AS d SET ({", ".join(value_columns)}) = (
+                    SELECT {", ".join(f"s.{c}" for c in value_columns)} FROM {source} WHERE {same} LIMIT 1
+                )
+                WHERE EXISTS (SELECT 1 FROM {source} WHERE {same})
+            """).rowcount
+
+        columns = match_columns + value_columns
+        keep_conflicts = "" if policy == "rename" else f"WHERE NOT EXISTS (SELECT 1 FROM main.{table} d WHERE {same})"
+        inserted = conn.execute(f"""
+            INSERT INTO main.{table} (org_id, {", ".join(columns)})
+            SELECT m.dst_id, {", ".join(f"s.{c}" for c in columns)}
+            FROM {source}
+            {keep_conflicts}
+        """).rowcount
+        return {"inserted": inserted, "updated": updated, "conflicts": conflicts}
+
+    # BACKUP
+    def backup(self, target_path: Path, pages: int = config.SNAPSHOT_PAGES):
+        """Copy the database to target_path with the online backup API, `pages` pages per step.
+
+        The copy runs on this manager's connection: other work only waits for
+        one step at a time, and writes made through the connection while the
+        copy is running are carried into it, so the result is a consistent
+        snapshot of the last committed state.
+        """
+        target = sqlite3.connect(target_path)
+        try:
+            self.get_connection().backup(target, pages=pages)
+        finally:
+            target.close()
+
+    def restore(self, source_path: Path):
+        """Replace the whole database with a backup in one step, then bring its schema up to date."""
+        source = sqlite3.connect(f"file:{Path(source_path).resolve()}?mode=ro", uri=True)
+        try:
+            # Holding the transaction lock means no transaction is open on the connection being overwritten
+            with self._tx_lock:
+                source.backup(self.get_connection())
+        finally:
+            source.close()
+        self.init_database()
+
     # UTILITY   
     def close_connection(self):
         """Close the database connection."""
@@ -1,7 +1,21 @@
-from database.sqlite_manager import SQLiteManager
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from database.sqlite_manager import COMMITTED_AT, SQLiteManager
 from database.kuzu_manager import KuzuManager
+from database.sync_metrics import SyncMetrics
 from loguru import logger
 from typing import Dict, List, Optional
+import config
+from utils import validators
+
+# Full sync order: tables in the same phase have no dependencies on each other
+SYNC_PHASES = [
+    ["Organisation", "PainPoint"],
+    ["Stakeholder", "Commercial", "OrgRelationship"],
+    ["OrganisationPainPoint"],
+]
 
 class SyncManager:
     """Manages synchronization between SQLite and Kuzu databases."""
@@ -9,171 +23,260 @@ class SyncManager:
     def __init__(self, sqlite_mgr: SQLiteManager, kuzu_mgr: KuzuManager):
         self.sqlite = sqlite_mgr
         self.kuzu = kuzu_mgr
+        self.metrics = SyncMetrics()
+
+    def _read(self, entity: str, getter, *args):
+        """Run a SQLite read under the entity's read-latency metric."""
+        with self.metrics.track(entity, "read"):
+            return getter(*args)
 
     # ========== Sync Individual Records ==========
 
-    def sync_organisation(self, org_id: int):
-        """Sync a single organisation from SQLite to Kuzu."""
-        org = self.sqlite.get_organisation_by_id(org_id)
+    def sync_organisation(self, org_id: int, record: Optional[Dict] = None):
+        """Sync a single organisation from SQLite to Kuzu.
+
+        Pass the record returned by the SQLite write to skip the read.
+        """
+        org = record or self._read("Organisation", self.sqlite.get_organisation_by_id, org_id)
         if org:
-            self.kuzu.upsert_organisations(
-                org['org_id'], 
-                org['org_name'], 
-                org['org_type'], 
-                org['org_function']
-            )
+            with self.metrics.track("Organisation", "write"):
+                self.kuzu.upsert_organisations(
+                    org['org_id'], 
+                    org['org_name'], 
+                    org['org_type'], 
+                    org['org_function']
+                )
+            self.metrics.record_lag("Organisation", org.get(COMMITTED_AT))
 
-    def sync_stakeholder(self, stakeholder_id: int):
-        """Sync a single stakeholder from SQLite to Kuzu."""
-        df = self.sqlite.get_all_stakeholders()
-        stakeholder = df[df['stakeholder_id'] == stakeholder_id]
-        if not stakeholder.empty:
-            row = stakeholder.iloc[0]
-            self.kuzu.upsert_stakeholder(
-                int(row['stakeholder_id']),
-                int(row['org_id']),
-                row['name'],
-                row.get('job_title'),
-                row.get('role'),
-            )
+    def sync_stakeholder(self, stakeholder_id: int, record: Optional[Dict] = None):
+        """Sync a single stakeholder from SQLite to Kuzu.
 
-    def sync_painpoint_node(self, painpoint_id: int):
-        """Sync a single painpoint from SQLite to Kuzu."""
-        df = self.sqlite.get_all_painpoints()
-        painpoint = df[df['painpoint_id'] == painpoint_id]
-        if not painpoint.empty:
-            row = painpoint.iloc[0]
-            self.kuzu.upsert_painpoint(
-                int(row['painpoint_id']),
-                row['description'],
-                row.get('severity'),
-                row.get('urgency'),
-            )
+        Pass the record returned by the SQLite write to skip the read.
+        """
+        stakeholder = record or self._read("Stakeholder", self.sqlite.get_stakeholder_by_id, stakeholder_id)
+        if stakeholder:
+            with self.metrics.track("Stakeholder", "write"):
+                self.kuzu.upsert_stakeholder(
+                    stakeholder['stakeholder_id'],
+                    stakeholder['org_id'],
+                    stakeholder['name'],
+                    stakeholder.get('job_title'),
+                    stakeholder.get('role'),
+                )
+            self.metrics.record_lag("Stakeholder", stakeholder.get(COMMITTED_AT))
+
+    def sync_painpoint_node(self, painpoint_id: int, record: Optional[Dict] = None):
+        """Sync a single painpoint from SQLite to Kuzu.
+
+        Pass the record returned by the SQLite write to skip the read.
+        """
+        painpoint = record or self._read("PainPoint", self.sqlite.get_painpoint_by_id, painpoint_id)
+        if painpoint:
+            with self.metrics.track("PainPoint", "write"):
+                self.kuzu.upsert_painpoint(
+                    painpoint['painpoint_id'],
+                    painpoint['description'],
+                    painpoint.get('severity'),
+                    painpoint.get('urgency'),
+                )
+            self.metrics.record_lag("PainPoint", painpoint.get(COMMITTED_AT))
 
-    def sync_painpoint_assignments(self, painpoint_id: int, org_ids: Optional[List[int]] = None):
-        """Sync organisation ↔ pain point links for a given pain point."""
+    def sync_painpoint_assignments(self, painpoint_id: int, org_ids: Optional[List[int]] = None, committed_at: Optional[float] = None):
+        """Sync organisation ↔ pain point links for a given pain point.
+
+        Pass the COMMITTED_AT of a record written with the links to measure sync lag.
+        """
         if org_ids is None:
-            org_ids = self.sqlite.get_painpoint_assignments(painpoint_id)
+            org_ids = self._read("OrganisationPainPoint", self.sqlite.get_painpoint_assignments, painpoint_id)
 
-        self.kuzu.clear_painpoint_assignments(painpoint_id)
-        for org_id in org_ids:
-            self.kuzu.sync_painpoint_assignment(int(org_id), int(painpoint_id))
+        with self.metrics.track("OrganisationPainPoint", "write", len(org_ids)), self.kuzu.batch():
+            self.kuzu.clear_painpoint_assignments(painpoint_id)
+            for org_id in org_ids:
+                self.kuzu.sync_painpoint_assignment(int(org_id), int(painpoint_id))
+        self.metrics.record_lag("OrganisationPainPoint", committed_at)
         
-    def sync_commercial(self, commercial_id: int):
-        """Sync a single commercial from SQLite to Kuzu."""
-        df = self.sqlite.get_all_commercials()
-        commercial = df[df['commercial_id'] == commercial_id]
-        if not commercial.empty:
-            row = commercial.iloc[0]
-            self.kuzu.upsert_commercial(
-                int(row['commercial_id']),
-                int(row['org_id']),
-                row['method'],
-                float(row['budget'])
+    def sync_commercial(self, commercial_id: int, record: Optional[Dict] = None):
+        """Sync a single commercial from SQLite to Kuzu.
+
+        Pass the record returned by the SQLite write to skip the read.
+        """
+        commercial = record or self._read("Commercial", self.sqlite.get_commercial_by_id, commercial_id)
+        if commercial:
+            with self.metrics.track("Commercial", "write"):
+                self.kuzu.upsert_commercial(
+                    commercial['commercial_id'],
+                    commercial['org_id'],
+                    commercial['method'],
+                    commercial['budget']
+                )
+            self.metrics.record_lag("Commercial", commercial.get(COMMITTED_AT))
+
+    def sync_relationship(self, from_org_id: int, to_org_id: int, relationship_type: str, committed_at: Optional[float] = None):
+        """Sync a single relationship from SQLite to Kuzu.
+
+        Pass the COMMITTED_AT of the record returned by the SQLite write to measure sync lag.
+        """
+        with self.metrics.track("OrgRelationship", "write"):
+            self.kuzu.upsert_relationship(
+                from_org_id, 
+                to_org_id, 
+                relationship_type
             )
+        self.metrics.record_lag("OrgRelationship", committed_at)
 
-    def sync_relationship(self, from_org_id: int, to_org_id: int, relationship_type: str):
-        """Sync a single relationship from SQLite to Kuzu."""
-        self.kuzu.upsert_relationship(
-            from_org_id, 
-            to_org_id, 
-            relationship_type
-        )
+    def sync_records(self, table: str, records: List[Dict]):
+        """Sync records returned by SQLite writes for one of config.TABLES."""
+        self.metrics.record_batch(table, len(records))
+        with self.kuzu.batch():
+            for record in records:
+                if table == "Organisation":
+                    self.sync_organisation(record['org_id'], record)
+                elif table == "Stakeholder":
+                    self.sync_stakeholder(record['stakeholder_id'], record)
+                elif table == "PainPoint":
+                    self.sync_painpoint_node(record['painpoint_id'], record)
+                elif table == "Commercial":
+                    self.sync_commercial(record['commercial_id'], record)
+                elif table == "OrgRelationship":
+                    self.sync_relationship(
+                        record['from_org_id'], record['to_org_id'], record['relationship_type'], record.get(COMMITTED_AT)
+                    )
+                elif table == "OrganisationPainPoint":
+                    # Additive: keep the pain point's other organisation links intact
+                    with self.metrics.track(table, "write"):
+                        self.kuzu.sync_painpoint_assignment(record['org_id'], record['painpoint_id'])
+                    self.metrics.record_lag(table, record.get(COMMITTED_AT))
 
     # ========== Sync All Records ==========
 
-    def full_sync(self):
-        """Perform a full sync of all data from SQLite to Kuzu."""
+    def full_sync(self, chunk_size: int = config.SYNC_CHUNK_SIZE):
+        """Perform a full sync of all data from SQLite to Kuzu.
+
+        Reader threads stream chunks from SQLite into a bounded queue while the
+        calling thread applies them to Kuzu, so reads overlap with writes and
+        memory is bounded by the chunk size rather than the largest table.
+        Tables within a phase do not depend on each other and are read
+        concurrently; each phase finishes before the next starts.
+        """
         logger.info("Starting full sync from SQLite to Kuzu.")
-        
-        # Sync Organisations
-        logger.info("Syncing Organisations...")
-        orgs = self.sqlite.get_all_organisations()
-        for _, row in orgs.iterrows():
-            self.kuzu.upsert_organisations(
-                int(row['org_id']),
-                row['org_name'],
-                row['org_type'],
-                row['org_function']
-            )
-        
-        # Sync Stakeholders
-        logger.info("Syncing Stakeholders...")
-        stakeholders = self.sqlite.get_all_stakeholders()
-        for _, row in stakeholders.iterrows():
-            self.kuzu.upsert_stakeholder(
-                int(row['stakeholder_id']),
-                int(row['org_id']),
-                row['name'],
-                row.get('job_title'),
-                row.get('role'),
-            )
-        
-        # Sync Painpoints
-        logger.info("Syncing Painpoints...")
-        painpoints = self.sqlite.get_all_painpoints()
-        for _, row in painpoints.iterrows():
-            self.kuzu.upsert_painpoint(
-                int(row['painpoint_id']),
-                row['description'],
-                row.get('severity'),
-                row.get('urgency'),
-            )
-        
-        # Sync Commercials
-        logger.info("Syncing Commercials...")
-        commercials = self.sqlite.get_all_commercials()
-        for _, row in commercials.iterrows():
-            self.kuzu.upsert_commercial(
-                int(row['commercial_id']),
-                int(row['org_id']),
-                row['method'],
-                float(row['budget'])
-            )
-        
-        # Sync Relationships
-        relationships = self.sqlite.get_all_org_relationships()
-        logger.info("Syncing Relationships...")
-        for _, row in relationships.iterrows():
-            self.kuzu.upsert_relationship(
-                int(row['from_org_id']),
-                int(row['to_org_id']),
-                row['relationship_type']
-            )
+        started = time.perf_counter()
+        # Per-sync state shared across chunks: pain points whose links were reset, and existing edges
+        state = {'cleared_painpoints': set(), 'relationship_keys': None}
+
+        for phase in SYNC_PHASES:
+            logger.info(f"Syncing {', '.join(phase)}...")
+            chunks = queue.Queue(maxsize=config.SYNC_QUEUE_SIZE)
+            stop = threading.Event()
+
+            with ThreadPoolExecutor(max_workers=len(phase), thread_name_prefix="sync-reader") as pool:
+                readers = [pool.submit(self._read_chunks, table, chunk_size, chunks, stop) for table in phase]
+                try:
+                    remaining = len(readers)
+                    while remaining:
+                        table, rows = chunks.get()
+                        if rows is None:
+                            remaining -= 1
+                            continue
+                        self._apply_chunk(table, rows, state)
+                finally:
+                    # Unblock readers if the writer failed part way through
+                    stop.set()
+
+            for reader in readers:
+                reader.result()  # re-raise any reader error
+
+        logger.info(f"✅ Full sync completed in {time.perf_counter() - started:.1f}s.")
+
+    def rebuild_graph(self, chunk_size: int = config.SYNC_CHUNK_SIZE):
+        """Empty the graph and load it again from SQLite, e.g. after the SQLite file was replaced.
+
+        full_sync only adds and updates, so records missing from SQLite would otherwise stay in the graph.
+        """
+        self.kuzu.clear_graph()
+        self.full_sync(chunk_size)
 
-        # Sync Painpoint Assignments
-        logger.info("Syncing Painpoint Assignments...")
-        assignments = self.sqlite.get_all_painpoint_assignments()
-        if not assignments.empty:
-            assignments_map: Dict[int, List[int]] = {}
-            for _, row in assignments.iterrows():
-                painpoint_id = int(row['painpoint_id'])
-                org_id = int(row['org_id'])
-                assignments_map.setdefault(painpoint_id, []).append(org_id)
+    def _read_chunks(self, table: str, chunk_size: int, chunks: queue.Queue, stop: threading.Event):
+        """Reader thread: stream a table from SQLite onto the queue, then a (table, None) marker."""
+        try:
+            table_chunks = self.sqlite.iter_table(table, chunk_size)
+            while True:
+                with self.metrics.track(table, "read"):
+                    rows = next(table_chunks, None)
+                if rows is None or not self._put(chunks, (table, rows), stop):
+                    return
+        finally:
+            self._put(chunks, (table, None), stop)
 
-            for painpoint_id, org_ids in assignments_map.items():
-                self.sync_painpoint_assignments(painpoint_id, org_ids)
+    @staticmethod
+    def _put(chunks: queue.Queue, item, stop: threading.Event) -> bool:
+        """Block until the item is queued, giving up once the writer has stopped."""
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
 
-        logger.info("✅ Full sync completed.")
+    def _apply_chunk(self, table: str, rows: List[Dict], state: Dict):
+        """Writer: apply one chunk of SQLite rows to Kuzu in a single batch."""
+        self.metrics.record_batch(table, len(rows))
+        with self.metrics.track(table, "write", len(rows)), self.kuzu.batch():
+            if table == "Organisation":
+                self.kuzu.bulk_upsert_organisations(rows)
+            elif table == "Stakeholder":
+                self.kuzu.bulk_upsert_stakeholders(rows)
+            elif table == "PainPoint":
+                self.kuzu.bulk_upsert_painpoints(rows)
+            elif table == "Commercial":
+                for row in rows:
+                    row['budget'] = validators.parse_budget(row['budget'])
+                self.kuzu.bulk_upsert_commercials(rows)
+            elif table == "OrgRelationship":
+                # Bulk COPY only the edges the graph does not have yet
+                if state['relationship_keys'] is None:
+                    state['relationship_keys'] = self.kuzu.get_relationship_keys()
+                keys = state['relationship_keys']
+                new_rows = []
+                for row in rows:
+                    key = (row['from_org_id'], row['to_org_id'], row['relationship_type'])
+                    if key not in keys:
+                        keys.add(key)
+                        new_rows.append(row)
+                self.kuzu.bulk_insert_relationships(new_rows)
+            elif table == "OrganisationPainPoint":
+                # Replace each pain point's links the first time it is seen in this sync,
+                # after which every (unique) SQLite link is new to the graph
+                cleared_painpoints = state['cleared_painpoints']
+                new_ids = list({row['painpoint_id'] for row in rows} - cleared_painpoints)
+                if new_ids:
+                    self.kuzu.bulk_clear_painpoint_assignments(new_ids)
+                    cleared_painpoints.update(new_ids)
+                self.kuzu.bulk_insert_painpoint_assignments(rows)
 
     # ========== Delete Sync Operations ==========
 
     def delete_organisation(self, org_id: int):
         """Delete an organisation and its related nodes from Kuzu."""
-        self.kuzu.delete_organisation(org_id)
+        with self.metrics.track("Organisation", "write"):
+            self.kuzu.delete_organisation(org_id)
 
     def delete_stakeholder(self, stakeholder_id: int):
         """Delete a stakeholder and its related nodes from Kuzu."""
-        self.kuzu.delete_stakeholder(stakeholder_id)
+        with self.metrics.track("Stakeholder", "write"):
+            self.kuzu.delete_stakeholder(stakeholder_id)
 
     def delete_painpoint(self, painpoint_id: int):
         """Delete a painpoint and its related nodes from Kuzu."""
-        self.kuzu.delete_painpoint(painpoint_id)
+        with self.metrics.track("PainPoint", "write"):
+            self.kuzu.delete_painpoint(painpoint_id)
 
     def delete_commercial(self, commercial_id: int):
         """Delete a commercial and its related nodes from Kuzu."""
-        self.kuzu.delete_commercial(commercial_id)
+        with self.metrics.track("Commercial", "write"):
+            self.kuzu.delete_commercial(commercial_id)
 
     def delete_relationship(self, from_org_id: int, to_org_id: int, relationship_type: str):
         """Delete a relationship and its related nodes from Kuzu."""
-        self.kuzu.delete_relationship(from_org_id, to_org_id, relationship_type)
\ No newline at end of file
+        with self.metrics.track("OrgRelationship", "write"):
+            self.kuzu.delete_relationship(from_org_id, to_org_id, relationship_type)
\ No newline at end of file
@@ -0,0 +1,157 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate percentile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(LATENCY_BUCKETS_MS[i], self.max_ms) if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict:
+        labels = [f"≤{b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_ms if self.count else None,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class EntityMetrics:
+    """Counters for one entity type (a config.TABLES key)."""
+
+    def __init__(self):
+        self.synced = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.read = LatencyHistogram()  # SQLite reads
+        self.write = LatencyHistogram()  # Kuzu applies
+        self.batches = 0
+        self.batch_rows = 0
+        self.max_batch = 0
+        self.lag = LatencyHistogram()  # SQLite commit -> Kuzu apply
+
+
+class SyncMetrics:
+    """Thread-safe instrumentation for SyncManager.
+
+    Records per-entity sync counts, failures, SQLite read and Kuzu write
+    latency histograms, batch sizes and the lag between the SQLite commit
+    and the Kuzu apply.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entities: Dict[str, EntityMetrics] = {}
+        self.started_at = time.time()
+
+    def _entity(self, entity: str) -> EntityMetrics:
+        if entity not in self._entities:
+            self._entities[entity] = EntityMetrics()
+        return self._entities[entity]
+
+    @contextmanager
+    def track(self, entity: str, stage: str, records: int = 1):
+        """Time a 'read' (SQLite) or 'write' (Kuzu) stage; failures are counted and re-raised."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                metrics = self._entity(entity)
+                metrics.failures += records
+                metrics.last_error = f"{stage}: {e}"
+            raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            metrics = self._entity(entity)
+            getattr(metrics, stage).observe(elapsed_ms)
+            if stage == "write":
+                metrics.synced += records
+
+    def record_batch(self, entity: str, size: int):
+        with self._lock:
+            metrics = self._entity(entity)
+            metrics.batches += 1
+            metrics.batch_rows += size
+            metrics.max_batch = max(metrics.max_batch, size)
+
+    def record_lag(self, entity: str, committed_at: Optional[float]):
+        """Record the delay between a SQLite commit (time.time()) and now."""
+        if committed_at is None:
+            return
+        with self._lock:
+            self._entity(entity).lag.observe(max(0.0, (time.time() - committed_at) * 1000))
+
+    def reset(self):
+        with self._lock:
+            self._entities.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Return a plain-dict copy of all metrics, keyed by entity."""
+        with self._lock:
+            return {
+                entity: {
+                    "synced": m.synced,
+                    "failures": m.failures,
+                    "last_error": m.last_error,
+                    "batches": m.batches,
+                    "avg_batch": m.batch_rows / m.batches if m.batches else None,
+                    "max_batch": m.max_batch,
+                    "read": m.read.snapshot(),
+                    "write": m.write.snapshot(),
+                    "lag": m.lag.snapshot(),
+                }
+                for entity, m in sorted(self._entities.items())
+            }
+
+
+def snapshot_rows(snapshot: Dict[str, Dict]) -> List[Dict]:
+    """Flatten a snapshot into one summary row per entity for display."""
+    rows = []
+    for entity, m in snapshot.items():
+        rows.append({
+            "Entity": entity,
+            "Synced": m["synced"],
+            "Failures": m["failures"],
+            "Batches": m["batches"],
+            "Avg batch": m["avg_batch"],
+            "SQLite read avg (ms)": m["read"]["avg_ms"],
+            "SQLite read p95 (ms)": m["read"]["p95_ms"],
+            "Kuzu write avg (ms)": m["write"]["avg_ms"],
+            "Kuzu write p95 (ms)": m["write"]["p95_ms"],
+            "Lag avg (ms)": m["lag"]["avg_ms"],
+            "Lag max (ms)": m["lag"]["max_ms"],
+        })
+    return rows
@@ -0,0 +1,18 @@
+import pandas as pd
+import pytest
+import config
+from database.sqlite_manager import SQLiteManager
+
+
+@pytest.fixture
+def sqlite_mgr(tmp_path):
+    """An empty database in a temporary folder."""
+    mgr = SQLiteManager(tmp_path / "test.db")
+    yield mgr
+    if mgr.conn:
+        mgr.conn.close()
+
+
+def frame(table_type: str, rows: list) -> pd.DataFrame:
+    """Build a frame with every column of a table, blank where a row leaves it out."""
+    return pd.DataFrame(rows, columns=config.TABLES[table_type])
@@ -0,0 +1,143 @@
+import zipfile
+import pandas as pd
+from database.import_manager import ImportManager
+from database.import_precheck import ImportPrecheck
+from tests.conftest import frame
+
+
+def organisations(*rows):
+    return frame("Organisation", [
+        {"org_id": org_id, "org_name": name, "org_type": "agency", "org_function": "x"} for org_id, name in rows
+    ])
+
+
+def chunk(df: pd.DataFrame, start: int) -> pd.DataFrame:
+    """Number a chunk's rows from start, as precheck_file does across a file."""
+    df.index = pd.RangeIndex(start, start + len(df))
+    return df
+
+
+def errors(report: pd.DataFrame):
+    return sorted(zip(report["Row"], report["Error"]))
+
+
+def test_clean_chunks_report_nothing(sqlite_mgr):
+    checker = ImportPrecheck(sqlite_mgr, "Organisation")
+    assert checker.check(chunk(organisations((1, "A"), (2, "B")), 0)).empty
+    assert checker.check(chunk(organisations((3, "C")), 2)).empty
+
+
+def test_duplicate_keys_within_a_chunk(sqlite_mgr):
+    report = ImportPrecheck(sqlite_mgr, "Organisation").check(organisations((1, "A"), (1, "B")))
+    assert errors(report) == [(1, "Duplicate org_id in file"), (2, "Duplicate org_id in file")]
+
+
+def test_duplicate_keys_across_chunks(sqlite_mgr):
+    checker = ImportPrecheck(sqlite_mgr, "Organisation")
+    assert checker.check(chunk(organisations((1, "A"), (2, "B")), 0)).empty
+    # The first occurrence was already reported clean; the later one is flagged
+    report = checker.check(chunk(organisations((3, "C"), (1, "D")), 2))
+    assert errors(report) == [(4, "Duplicate org_id in file")]
+
+
+def test_empty_chunk_keeps_earlier_keys(sqlite_mgr):
+    checker = ImportPrecheck(sqlite_mgr, "Organisation")
+    checker.check(chunk(organisations((1, "A")), 0))
+    assert checker.check(chunk(organisations(), 1)).empty
+    assert errors(checker.check(chunk(organisations((1, "B")), 1))) == [(2, "Duplicate org_id in file")]
+
+
+def test_invalid_keys_are_not_remembered(sqlite_mgr):
+    checker = ImportPrecheck(sqlite_mgr, "Organisation")
+    first = checker.check(chunk(organisations(("x", "A")), 0))
+    assert errors(first) == [(1, "Missing or non-integer ID")]
+    assert checker.check(chunk(organisations((1, "B")), 1)).empty
+
+
+def test_composite_keys_across_chunks(sqlite_mgr):
+    sqlite_mgr.insert_organisation("A", "agency", "x", org_id=1)
+    sqlite_mgr.insert_organisation("B", "agency", "x", org_id=2)
+    checker = ImportPrecheck(sqlite_mgr, "OrgRelationship")
+    links = lambda *rows: frame("OrgRelationship", [
+        {"from_org_id": a, "to_org_id": b, "relationship_type": t} for a, b, t in rows
+    ])
+    assert checker.check(chunk(links((1, 2, "supplier")), 0)).empty
+    report = checker.check(chunk(links((1, 2, "oversight"), (1, 2, "Supplier")), 1))
+    assert errors(report) == [(3, "Duplicate from_org_id, to_org_id, relationship_type in file")]
+
+
+def test_keys_against_the_database(sqlite_mgr):
+    sqlite_mgr.insert_organisation("A", "agency", "x", org_id=1)
+    report = ImportPrecheck(sqlite_mgr, "Organisation").check(organisations((1, "A"), (2, "B")))
+    assert errors(report) == [(1, "org_id already exists")]
+
+    report = ImportPrecheck(sqlite_mgr, "Organisation", replace_existing=True).check(organisations((1, "A"), (2, "B")))
+    assert errors(report) == [(2, "No existing record with this org_id to replace")]
+
+
+def test_replace_mode_skips_stored_links(sqlite_mgr):
+    sqlite_mgr.insert_organisation("A", "agency", "x", org_id=1)
+    sqlite_mgr.insert_painpoint("Slow", "High", "Low", painpoint_id=1)
+    sqlite_mgr.insert_painpoint_assignment(1, 1)
+    checker = ImportPrecheck(sqlite_mgr, "OrganisationPainPoint", replace_existing=True)
+    assert checker.check(frame("OrganisationPainPoint", [{"org_id": 1, "painpoint_id": 1}])).empty
+
+
+def test_missing_foreign_keys(sqlite_mgr):
+    sqlite_mgr.insert_organisation("A", "agency", "x", org_id=1)
+    report = ImportPrecheck(sqlite_mgr, "Stakeholder").check(frame("Stakeholder", [
+        {"stakeholder_id": 1, "org_id": 1, "name": "Ann"},
+        {"stakeholder_id": 2, "org_id": 9, "name": "Bob"},
+    ]))
+    assert errors(report) == [(2, "Referenced Organisation does not exist")]
+
+
+def test_pending_keys_satisfy_foreign_keys(sqlite_mgr):
+    pending = {"Organisation": pd.Index([9])}
+    report = ImportPrecheck(sqlite_mgr, "Stakeholder", pending_keys=pending).check(frame("Stakeholder", [
+        {"stakeholder_id": 1, "org_id": 9, "name": "Ann"},
+    ]))
+    assert report.empty
+
+
+def test_duplicate_names_across_chunks(sqlite_mgr):
+    checker = ImportPrecheck(sqlite_mgr, "Organisation")
+    assert checker.check(chunk(organisations((1, "A")), 0)).empty
+    report = checker.check(chunk(organisations((2, " A "), (3, "B"), (4, "B")), 1))
+    assert errors(report) == [
+        (2, "Duplicate org_name in file"),
+        (3, "Duplicate org_name in file"),
+        (4, "Duplicate org_name in file"),
+    ]
+
+
+def test_names_owned_by_another_organisation(sqlite_mgr):
+    sqlite_mgr.insert_organisation("A", "agency", "x", org_id=1)
+    report = ImportPrecheck(sqlite_mgr, "Organisation", replace_existing=True).check(organisations((1, "A")))
+    assert report.empty
+    report = ImportPrecheck(sqlite_mgr, "Organisation").check(organisations((2, "A")))
+    assert errors(report) == [(1, "org_name is already used by another organisation")]
+
+
+def test_precheck_file_numbers_rows_across_chunks(sqlite_mgr, tmp_path):
+    path = tmp_path / "organisations.csv"
+    organisations((1, "A"), (2, "B"), (3, "C"), (2, "D"), (5, "A")).to_csv(path, index=False)
+    report = ImportManager(sqlite_mgr, sync_mgr=None).precheck_file(path, "Organisation", chunk_size=2)
+    assert errors(report) == [
+        (4, "Duplicate org_id in file"),
+        (5, "Duplicate org_name in file"),
+    ]
+
+
+def test_precheck_bundle_links_to_pending_rows(sqlite_mgr, tmp_path):
+    path = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(path, "w") as bundle:
+        bundle.writestr("Organisation.csv", organisations((1, "A")).to_csv(index=False))
+        bundle.writestr("Stakeholder.csv", frame("Stakeholder", [
+            {"stakeholder_id": 1, "org_id": 1, "name": "Ann"},
+            {"stakeholder_id": 2, "org_id": 2, "name": "Bob"},
+        ]).to_csv(index=False))
+    report = ImportManager(sqlite_mgr, sync_mgr=None).precheck_bundle(path)
+    assert list(zip(report["Table"], report["Row"], report["Error"])) == [
+        ("Stakeholder", 2, "Referenced Organisation does not exist"),
+    ]
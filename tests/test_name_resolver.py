@@ -0,0 +1,89 @@
+import pandas as pd
+from database.import_manager import ImportManager
+from database.name_resolver import NameResolver
+
+
+def stakeholders(*org_names):
+    return pd.DataFrame({
+        "stakeholder_id": range(1, len(org_names) + 1),
+        "org_name": list(org_names),
+        "name": "Ann",
+        "job_title": None,
+        "role": None,
+    })
+
+
+def test_names_match_ignoring_case_and_whitespace(sqlite_mgr):
+    sqlite_mgr.insert_organisation("Cabinet Office", "department", "x", org_id=7)
+    resolver = NameResolver(sqlite_mgr, "Stakeholder", ["stakeholder_id", "org_name", "name"])
+    resolved, report = resolver.resolve(stakeholders(" cabinet office", "CABINET OFFICE "))
+    assert report.empty
+    assert list(resolved["org_id"]) == [7, 7]
+
+
+def test_names_that_differ_only_in_case_are_ambiguous(sqlite_mgr):
+    sqlite_mgr.insert_organisation("Acme", "agency", "x", org_id=1)
+    sqlite_mgr.insert_organisation("ACME", "agency", "x", org_id=2)
+    sqlite_mgr.insert_organisation("Other", "agency", "x", org_id=3)
+    resolver = NameResolver(sqlite_mgr, "Stakeholder", ["org_name"])
+    resolved, report = resolver.resolve(stakeholders("acme", "Other", "Acme"))
+    assert list(resolved.index) == [1]
+    assert list(resolved["org_id"]) == [3]
+    assert list(zip(report["Row"], report["Error"])) == [
+        (1, "Name matches more than one Organisation"),
+        (3, "Name matches more than one Organisation"),
+    ]
+
+
+def test_unknown_and_blank_names_are_reported(sqlite_mgr):
+    sqlite_mgr.insert_organisation("Acme", "agency", "x", org_id=1)
+    resolver = NameResolver(sqlite_mgr, "Stakeholder", ["org_name"])
+    resolved, report = resolver.resolve(stakeholders("Acme", "Nobody", None, "  "))
+    assert list(resolved.index) == [0]
+    assert list(report["Row"]) == [2, 3, 4]
+    assert set(report["Error"]) == {"No Organisation with this name"}
+
+
+def test_both_ends_of_a_relationship(sqlite_mgr):
+    sqlite_mgr.insert_organisation("A", "agency", "x", org_id=1)
+    sqlite_mgr.insert_organisation("B", "agency", "x", org_id=2)
+    df = pd.DataFrame({"from_org_name": ["a", "b", "a"], "to_org_name": ["b", "a", "c"], "relationship_type": "supplier"})
+    resolver = NameResolver(sqlite_mgr, "OrgRelationship", df.columns)
+    assert set(resolver.columns) == {"from_org_id", "to_org_id"}
+    resolved, report = resolver.resolve(df)
+    assert list(zip(resolved["from_org_id"], resolved["to_org_id"])) == [(1, 2), (2, 1)]
+    assert list(zip(report["Row"], report["Column"])) == [(3, "to_org_name")]
+
+
+def test_painpoint_descriptions(sqlite_mgr):
+    sqlite_mgr.insert_organisation("A", "agency", "x", org_id=1)
+    sqlite_mgr.insert_painpoint("Slow payments", "High", "High", painpoint_id=5)
+    df = pd.DataFrame({"org_id": [1], "painpoint_description": ["slow payments"]})
+    resolved, report = NameResolver(sqlite_mgr, "OrganisationPainPoint", df.columns).resolve(df)
+    assert report.empty
+    assert list(resolved["painpoint_id"]) == [5]
+
+
+def test_id_columns_take_precedence_over_names(sqlite_mgr):
+    resolver = NameResolver(sqlite_mgr, "Stakeholder", ["org_id", "org_name"])
+    df = stakeholders("Nobody").assign(org_id=1)
+    resolved, report = resolver.resolve(df)
+    assert report.empty
+    assert resolved.equals(df)
+
+
+def test_summarize_counts_rows_per_name(sqlite_mgr):
+    resolver = NameResolver(sqlite_mgr, "Stakeholder", ["org_name"])
+    _, report = resolver.resolve(stakeholders("X", "Y", "X"))
+    summary = NameResolver.summarize(report)
+    assert list(zip(summary["Value"], summary["Rows"])) == [("X", 2), ("Y", 1)]
+
+
+def test_import_by_name_skips_unresolved_rows(sqlite_mgr, tmp_path):
+    sqlite_mgr.insert_organisation("Acme", "agency", "x", org_id=1)
+    path = tmp_path / "stakeholders.csv"
+    stakeholders("acme", "Nobody").to_csv(path, index=False)
+    stats = ImportManager(sqlite_mgr, sync_mgr=None).import_file(path, "Stakeholder", sync_to_kuzu=False)
+    assert (stats["imported"], stats["failed"]) == (1, 1)
+    assert sqlite_mgr.get_stakeholder_by_id(1)["org_id"] == 1
+    assert sqlite_mgr.get_stakeholder_by_id(2) is None
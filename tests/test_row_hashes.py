@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+from database.import_manager import ImportManager, row_hashes
+from utils import validators
+from tests.conftest import frame
+
+
+def commercial(**values):
+    return frame("Commercial", [{"commercial_id": 1, "org_id": 1, "method": "DPS", "budget": 1000.0, **values}])
+
+
+@pytest.mark.parametrize("ids", [(1, 1), (1.0, 1.0), ("1", "1"), (1, "1.0")])
+def test_id_types_hash_alike(ids):
+    commercial_id, org_id = ids
+    assert row_hashes("Commercial", commercial(commercial_id=commercial_id, org_id=org_id)).equals(
+        row_hashes("Commercial", commercial())
+    )
+
+
+@pytest.mark.parametrize("budget", [1000, 1000.0, "1000", "1000.00"])
+def test_budget_types_hash_alike(budget):
+    assert row_hashes("Commercial", commercial(budget=budget))[0] == row_hashes("Commercial", commercial())[0]
+
+
+def test_missing_values_hash_alike():
+    hashes = {
+        row_hashes("Commercial", commercial(budget=blank, method=blank))[0]
+        for blank in (None, float("nan"), pd.NA)
+    }
+    assert len(hashes) == 1
+
+
+def test_changed_content_changes_the_hash():
+    base = row_hashes("Commercial", commercial())[0]
+    assert row_hashes("Commercial", commercial(budget=1000.5))[0] != base
+    assert row_hashes("Commercial", commercial(budget=None))[0] != base
+    assert row_hashes("Commercial", commercial(method="dps"))[0] != base
+    assert row_hashes("Commercial", commercial(commercial_id=2))[0] != base
+
+
+def test_validated_rows_hash_like_stored_rows(sqlite_mgr):
+    sqlite_mgr.insert_organisation("A", "agency", "x", org_id=1)
+    sqlite_mgr.insert_commercial(1, "DPS", 1000.0, commercial_id=1)
+    stored = sqlite_mgr.get_rows_by_key("Commercial", "commercial_id", [1])
+
+    clean, _ = validators.validate_frame("Commercial", commercial(commercial_id="1", org_id=1.0, method=" dps ", budget="£1,000"))
+    assert row_hashes("Commercial", clean)[0] == row_hashes("Commercial", stored)[0]
+
+
+def test_replace_import_skips_unchanged_rows(sqlite_mgr, tmp_path):
+    sqlite_mgr.insert_organisation("A", "agency", "Tax", org_id=1)
+    sqlite_mgr.insert_organisation("B", "agency", None, org_id=2)
+    path = tmp_path / "organisations.csv"
+    frame("Organisation", [
+        {"org_id": 1, "org_name": "A", "org_type": "Agency", "org_function": "Tax"},
+        {"org_id": 2, "org_name": "B", "org_type": "agency", "org_function": ""},
+        {"org_id": 3, "org_name": "C", "org_type": "agency", "org_function": "New"},
+    ]).to_csv(path, index=False)
+
+    stats = ImportManager(sqlite_mgr, sync_mgr=None).import_file(path, "Organisation", replace_existing=True, sync_to_kuzu=False)
+    assert stats["unchanged"] == 2
+    assert stats["imported"] == 0
+    assert stats["failed"] == 1  # org 3 has no record to replace
+
+
+def test_replace_import_writes_changed_rows(sqlite_mgr):
+    sqlite_mgr.insert_organisation("A", "agency", "Tax", org_id=1)
+    sqlite_mgr.insert_organisation("B", "agency", "Tax", org_id=2)
+    df = frame("Organisation", [
+        {"org_id": 1, "org_name": "A", "org_type": "agency", "org_function": "Tax"},
+        {"org_id": 2, "org_name": "B", "org_type": "agency", "org_function": "Health"},
+    ])
+    imported, failed = ImportManager(sqlite_mgr, sync_mgr=None).import_rows("Organisation", df, replace_existing=True, sync_to_kuzu=False)
+    assert (imported, failed) == (1, 0)
+    assert sqlite_mgr.get_organisation_by_id(2)["org_function"] == "Health"
@@ -0,0 +1,116 @@
+import time
+import pytest
+from database.sync_metrics import LATENCY_BUCKETS_MS, LatencyHistogram, SyncMetrics, snapshot_rows
+
+
+def test_values_on_a_bound_fall_in_that_bucket():
+    histogram = LatencyHistogram()
+    for ms in (0.2, 1, 1.01, 5, 5000, 5000.5, 60000):
+        histogram.observe(ms)
+    buckets = histogram.snapshot()["buckets"]
+    assert buckets["≤1ms"] == 2
+    assert buckets["≤5ms"] == 2
+    assert buckets["≤5000ms"] == 1
+    assert buckets[">5000ms"] == 2
+    assert sum(buckets.values()) == histogram.count == 7
+    assert len(buckets) == len(LATENCY_BUCKETS_MS) + 1
+
+
+def test_empty_histogram_has_no_statistics():
+    snapshot = LatencyHistogram().snapshot()
+    assert snapshot["count"] == 0
+    assert snapshot["avg_ms"] is None
+    assert snapshot["p50_ms"] is None
+    assert snapshot["max_ms"] is None
+
+
+def test_percentile_is_capped_by_the_largest_value():
+    histogram = LatencyHistogram()
+    for ms in (2, 3, 3, 4):
+        histogram.observe(ms)
+    # All values sit in the 5 ms bucket, but none is above 4 ms
+    assert histogram.percentile(0.5) == 4
+    assert histogram.percentile(0.95) == 4
+
+
+def test_percentile_picks_the_bucket_holding_the_quantile():
+    histogram = LatencyHistogram()
+    for _ in range(90):
+        histogram.observe(0.5)
+    for _ in range(10):
+        histogram.observe(300)
+    assert histogram.percentile(0.5) == 1
+    assert histogram.percentile(0.9) == 1
+    assert histogram.percentile(0.95) == 300
+
+
+def test_open_bucket_percentile_is_the_maximum():
+    histogram = LatencyHistogram()
+    histogram.observe(7000)
+    histogram.observe(9000)
+    assert histogram.percentile(0.5) == 9000
+
+
+def test_failed_stage_counts_failures_not_latency():
+    metrics = SyncMetrics()
+    with pytest.raises(RuntimeError):
+        with metrics.track("Organisation", "write", records=3):
+            raise RuntimeError("boom")
+    with metrics.track("Organisation", "write", records=2):
+        pass
+    snapshot = metrics.snapshot()["Organisation"]
+    assert snapshot["failures"] == 3
+    assert snapshot["synced"] == 2
+    assert snapshot["write"]["count"] == 1
+    assert snapshot["last_error"] == "write: boom"
+
+
+def test_reads_do_not_count_as_synced():
+    metrics = SyncMetrics()
+    with metrics.track("Stakeholder", "read"):
+        pass
+    snapshot = metrics.snapshot()["Stakeholder"]
+    assert snapshot["synced"] == 0
+    assert snapshot["read"]["count"] == 1
+
+
+def test_batches():
+    metrics = SyncMetrics()
+    metrics.record_batch("PainPoint", 10)
+    metrics.record_batch("PainPoint", 30)
+    snapshot = metrics.snapshot()["PainPoint"]
+    assert snapshot["batches"] == 2
+    assert snapshot["avg_batch"] == 20
+    assert snapshot["max_batch"] == 30
+
+
+def test_lag_without_a_commit_time_is_ignored():
+    metrics = SyncMetrics()
+    metrics.record_lag("Commercial", None)
+    assert metrics.snapshot() == {}
+
+
+def test_lag_is_never_negative():
+    metrics = SyncMetrics()
+    metrics.record_lag("Commercial", time.time() + 60)
+    metrics.record_lag("Commercial", time.time() - 0.2)
+    lag = metrics.snapshot()["Commercial"]["lag"]
+    assert lag["count"] == 2
+    assert lag["buckets"]["≤1ms"] == 1
+    assert lag["max_ms"] >= 200
+
+
+def test_snapshot_rows_one_per_entity_in_order():
+    metrics = SyncMetrics()
+    metrics.record_batch("Stakeholder", 1)
+    metrics.record_batch("Organisation", 1)
+    rows = snapshot_rows(metrics.snapshot())
+    assert [row["Entity"] for row in rows] == ["Organisation", "Stakeholder"]
+    assert rows[0]["Lag avg (ms)"] is None
+
+
+def test_reset_clears_entities():
+    metrics = SyncMetrics()
+    metrics.record_batch("Organisation", 1)
+    metrics.reset()
+    assert metrics.snapshot() == {}
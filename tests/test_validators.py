@@ -0,0 +1,71 @@
+import pandas as pd
+from database.import_manager import ImportManager
+from utils import validators
+from tests.conftest import frame
+
+
+def test_known_values_take_their_config_spelling():
+    clean, report = validators.validate_frame("PainPoint", frame("PainPoint", [
+        {"painpoint_id": 1, "description": "Slow", "severity": " high ", "urgency": "LOW"},
+    ]))
+    assert report.empty
+    assert clean.loc[0, "severity"] == "High"
+    assert clean.loc[0, "urgency"] == "Low"
+
+
+def test_unknown_values_are_kept_as_warnings():
+    clean, report = validators.validate_frame("PainPoint", frame("PainPoint", [
+        {"painpoint_id": 1, "description": "Slow", "severity": " Critical ", "urgency": "Low"},
+        {"painpoint_id": 2, "description": "Costly", "severity": "Medium", "urgency": "Medium"},
+    ]))
+    assert list(clean.index) == [0, 1]
+    assert clean.loc[0, "severity"] == "Critical"
+    assert validators.report_errors(report).empty
+    warnings = validators.report_warnings(report)
+    assert list(warnings["Row"]) == [1]
+    assert list(warnings["Column"]) == ["severity"]
+
+
+def test_unknown_org_type_is_normalized():
+    clean, report = validators.validate_frame("Organisation", frame("Organisation", [
+        {"org_id": 1, "org_name": "A", "org_type": " Charity "},
+    ]))
+    assert clean.loc[0, "org_type"] == "charity"
+    assert len(validators.report_warnings(report)) == 1
+
+
+def test_warnings_do_not_hide_errors():
+    clean, report = validators.validate_frame("Commercial", frame("Commercial", [
+        {"commercial_id": 1, "org_id": 1, "method": "Tender", "budget": "£1,000"},
+        {"commercial_id": "x", "org_id": 1, "method": "DPS", "budget": "lots"},
+    ]))
+    assert list(clean.index) == [0]
+    assert clean.loc[0, "budget"] == 1000.0
+    assert set(validators.report_errors(report)["Row"]) == {2}
+    assert set(validators.report_warnings(report)["Row"]) == {1}
+
+
+def test_reports_without_a_level_are_errors():
+    report = pd.DataFrame({"Row": [1], "Column": "org_id", "Value": "x", "Error": "Bad"})
+    assert len(validators.report_errors(report)) == 1
+    assert validators.report_warnings(report).empty
+
+
+def test_rows_with_unknown_values_are_imported(sqlite_mgr):
+    import_mgr = ImportManager(sqlite_mgr, sync_mgr=None)
+    imported, failed = import_mgr.import_rows("Organisation", frame("Organisation", [
+        {"org_id": 1, "org_name": "A", "org_type": "Charity", "org_function": "Aid"},
+        {"org_id": 2, "org_name": "B", "org_type": "agency", "org_function": "Tax"},
+    ]), sync_to_kuzu=False)
+    assert (imported, failed) == (2, 0)
+    assert sqlite_mgr.get_organisation_by_id(1)["org_type"] == "charity"
+
+
+def test_precheck_passes_files_with_only_warnings(sqlite_mgr, tmp_path):
+    path = tmp_path / "painpoints.csv"
+    frame("PainPoint", [
+        {"painpoint_id": 1, "description": "Slow", "severity": "Critical", "urgency": "Soon"},
+    ]).to_csv(path, index=False)
+    report = ImportManager(sqlite_mgr, sync_mgr=None).precheck_file(path, "PainPoint")
+    assert validators.report_errors(report).empty
+    assert list(validators.report_warnings(report)["Column"]) == ["severity", "urgency"]
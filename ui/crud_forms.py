@@ -1,6 +1,6 @@
 from hmac import new
 import streamlit as st
-from database.sqlite_manager import SQLiteManager
+from database.sqlite_manager import COMMITTED_AT, SQLiteManager, Rollback
 from database.sync_manager import SyncManager
 import config
 
@@ -115,15 +115,15 @@ def render_organisation_crud(sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
                 if not org_name:
                     st.error("Organisation name is required!")
                 else:
-                    new_id = sqlite_mgr.insert_organisation(
+                    new_org = sqlite_mgr.insert_organisation(
                         org_name, org_type, org_function
                     )
 
-                    if new_id:
-                        st.success(f"✅ Added organisation: {org_name} with ID {new_id}")
+                    if new_org:
+                        st.success(f"✅ Added organisation: {org_name} with ID {new_org['org_id']}")
                         
                         if sync_to_kuzu:
-                            sync_mgr.sync_organisation(new_id)
+                            sync_mgr.sync_organisation(new_org['org_id'], new_org)
                             st.success("✅ Synced to graph database")
                         
                         st.rerun()
@@ -169,15 +169,15 @@ def render_organisation_crud(sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
                         if not org_name:
                             st.error("Organisation name is required!")
                         else:
-                            success =sqlite_mgr.update_organisation(
+                            updated_org = sqlite_mgr.update_organisation(
                                 org_id, org_name, org_type, org_function
                             )
 
-                            if success:
+                            if updated_org:
                                 st.success(f"✅ Updated organisation: {org_name}")
 
                                 if sync_to_kuzu:
-                                    sync_mgr.sync_organisation(org_id)
+                                    sync_mgr.sync_organisation(org_id, updated_org)
                                     st.success("✅ Synced to graph database")
 
                                 st.rerun()
@@ -295,15 +295,15 @@ def render_stakeholder_crud(sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
                     if not name:
                         st.error("Stakeholder name is required!")
                     else:
-                        new_id = sqlite_mgr.insert_stakeholder(
+                        new_stakeholder = sqlite_mgr.insert_stakeholder(
                             org_id, name, job_title, role
                         )
 
-                        if new_id:
-                            st.success(f"✅ Added stakeholder: {name} with ID {new_id}")
+                        if new_stakeholder:
+                            st.success(f"✅ Added stakeholder: {name} with ID {new_stakeholder['stakeholder_id']}")
 
                             if sync_to_kuzu:
-                                sync_mgr.sync_stakeholder(new_id)
+                                sync_mgr.sync_stakeholder(new_stakeholder['stakeholder_id'], new_stakeholder)
                                 st.success("✅ Synced to graph database")
 
                             st.rerun()
@@ -349,15 +349,15 @@ def render_stakeholder_crud(sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
                         if not name:
                             st.error("Stakeholder name is required!")
                         else:
-                            success = sqlite_mgr.update_stakeholder(
+                            updated_stakeholder = sqlite_mgr.update_stakeholder(
                                 stakeholder_id, org_id, name, job_title, role
                             )
 
-                            if success:
+                            if updated_stakeholder:
                                 st.success(f"✅ Updated stakeholder: {name}")
 
                                 if sync_to_kuzu:
-                                    sync_mgr.sync_stakeholder(stakeholder_id)
+                                    sync_mgr.sync_stakeholder(stakeholder_id, updated_stakeholder)
                                     st.success("✅ Synced to graph database")
 
                                 st.rerun()
@@ -478,15 +478,15 @@ def render_painpoint_crud(sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
                 if not description:
                     st.error("Pain point description is required!")
                 else:
-                    new_id = sqlite_mgr.insert_painpoint(
+                    new_painpoint = sqlite_mgr.insert_painpoint(
                         description, severity, urgency
                     )
 
-                    if new_id:
-                        st.success(f"✅ Added pain point ({new_id}). Go to the 'Edit' tab to assign organisations.")
+                    if new_painpoint:
+                        st.success(f"✅ Added pain point ({new_painpoint['painpoint_id']}). Go to the 'Edit' tab to assign organisations.")
 
                         if sync_to_kuzu:
-                            sync_mgr.sync_painpoint_node(new_id)
+                            sync_mgr.sync_painpoint_node(new_painpoint['painpoint_id'], new_painpoint)
                             st.success("✅ Synced to graph database")
 
                         st.rerun()
@@ -565,20 +565,27 @@ def render_painpoint_crud(sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
                         if not description:
                             st.error("Pain point description is required!")
                         else:
-                            success = sqlite_mgr.update_painpoint(
-                                painpoint_id, description, severity, urgency
-                            )
+                            # Commit the pain point and its assignments together
+                            with sqlite_mgr.transaction():
+                                updated_painpoint = sqlite_mgr.update_painpoint(
+                                    painpoint_id, description, severity, urgency
+                                )
 
-                            assign_success = sqlite_mgr.update_painpoint_assignments(
-                                painpoint_id, selected_org_ids
-                            )
+                                assign_success = updated_painpoint is not None and sqlite_mgr.update_painpoint_assignments(
+                                    painpoint_id, selected_org_ids
+                                )
+
+                                if not assign_success:
+                                    raise Rollback()
 
-                            if success and assign_success:
+                            if updated_painpoint and assign_success:
                                 st.success("✅ Updated pain point and assignments")
 
                                 if sync_to_kuzu:
-                                    sync_mgr.sync_painpoint_node(painpoint_id)
-                                    sync_mgr.sync_painpoint_assignments(painpoint_id, selected_org_ids)
+                                    sync_mgr.sync_painpoint_node(painpoint_id, updated_painpoint)
+                                    sync_mgr.sync_painpoint_assignments(
+                                        painpoint_id, selected_org_ids, updated_painpoint.get(COMMITTED_AT)
+                                    )
                                     st.success("✅ Synced to graph database")
 
                                 st.rerun()
@@ -710,15 +717,15 @@ def render_commercial_crud(sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
                     sync_to_kuzu = st.checkbox("Sync to graph", value=True)
 
                 if submit:
-                    new_id = sqlite_mgr.insert_commercial(
+                    new_commercial = sqlite_mgr.insert_commercial(
                         org_id, method, budget
                     )
 
-                    if new_id:
-                        st.success(f"✅ Added commercial entry ({new_id})")
+                    if new_commercial:
+                        st.success(f"✅ Added commercial entry ({new_commercial['commercial_id']})")
 
                         if sync_to_kuzu:
-                            sync_mgr.sync_commercial(new_id)
+                            sync_mgr.sync_commercial(new_commercial['commercial_id'], new_commercial)
                             st.success("✅ Synced to graph database")
 
                         st.rerun()
@@ -760,15 +767,15 @@ def render_commercial_crud(sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
                         sync_to_kuzu = st.checkbox("Sync to graph", value=True)
 
                     if submit:
-                        success = sqlite_mgr.update_commercial(
+                        updated_commercial = sqlite_mgr.update_commercial(
                             commercial_id, org_id, method, budget
                         )
 
-                        if success:
+                        if updated_commercial:
                             st.success("✅ Updated commercial entry")
 
                             if sync_to_kuzu:
-                                sync_mgr.sync_commercial(commercial_id)
+                                sync_mgr.sync_commercial(commercial_id, updated_commercial)
                                 st.success("✅ Synced to graph database")
 
                             st.rerun()
@@ -913,16 +920,17 @@ def render_relationship_crud(sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
                         from_org_id = org_id_map[from_org]
                         to_org_id = org_id_map[to_org]
 
-                        success = sqlite_mgr.insert_org_relationship(
+                        new_relationship = sqlite_mgr.insert_org_relationship(
                             from_org_id, to_org_id, relationship_type
                         )
 
-                        if success:
+                        if new_relationship:
                             st.success(f"✅ Added relationship: {from_org} → {to_org}")
 
                             if sync_to_kuzu:
                                 sync_mgr.sync_relationship(
-                                    from_org_id, to_org_id, relationship_type
+                                    from_org_id, to_org_id, new_relationship['relationship_type'],
+                                    new_relationship.get(COMMITTED_AT)
                                 )
                                 st.success("✅ Synced to graph database")
 
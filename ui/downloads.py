@@ -0,0 +1,73 @@
+import os
+import secrets
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+import streamlit as st
+from loguru import logger
+import config
+
+"""
+Serve large files from disk through Streamlit's static file serving.
+
+st.download_button reads its data into Streamlit's in-memory media storage,
+so exports and snapshots are published under static/downloads instead and
+the browser fetches them straight from the file.
+"""
+
+
+def _prune():
+    """Delete published downloads older than DOWNLOAD_TTL_SECONDS."""
+    if not config.DOWNLOAD_DIR.exists():
+        return
+    cutoff = time.time() - config.DOWNLOAD_TTL_SECONDS
+    for folder in config.DOWNLOAD_DIR.iterdir():
+        if folder.is_dir() and folder.stat().st_mtime < cutoff:
+            shutil.rmtree(folder, ignore_errors=True)
+            logger.info(f"Expired download {folder.name}.")
+
+
+def publish(path: Path, move: bool = False) -> Optional[str]:
+    """
+    Make a file downloadable and return its URL, or None if it is too large to serve.
+
+    The file is hard-linked (or moved, for files the caller no longer needs)
+    into a folder with a random name, so the URL cannot be guessed, and is
+    deleted DOWNLOAD_TTL_SECONDS later.
+    """
+    path = Path(path)
+    _prune()
+    if path.stat().st_size > config.DOWNLOAD_MAX_BYTES:
+        return None
+
+    token = secrets.token_urlsafe(16)
+    folder = config.DOWNLOAD_DIR / token
+    folder.mkdir(parents=True)
+    target = folder / path.name
+    if move:
+        shutil.move(path, target)
+    else:
+        try:
+            os.link(path, target)
+        except OSError:
+            # Different filesystem, or links not supported
+            shutil.copyfile(path, target)
+
+    base = st.get_option("server.baseUrlPath").strip("/")
+    prefix = f"/{base}" if base else ""
+    return f"{prefix}/app/static/downloads/{token}/{path.name}"
+
+
+def download_link(label: str, path: Path, file_name: Optional[str] = None, move: bool = False):
+    """Publish a file and show a download link for it, or its location on disk if it is too large."""
+    url = publish(path, move=move)
+    if url is None:
+        st.info(
+            f"ℹ️ {Path(path).name} is larger than Streamlit can serve "
+            f"({config.DOWNLOAD_MAX_BYTES // (1024 * 1024)} MB); copy it from {path}"
+        )
+        return
+    file_name = file_name or Path(path).name
+    st.markdown(f'<a href="{url}" download="{file_name}">{label}</a>', unsafe_allow_html=True)
+    st.caption(f"The link expires after {config.DOWNLOAD_TTL_SECONDS // 60} minutes.")
@@ -1,37 +1,86 @@
-import tempfile
-import os
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+import streamlit as st
+from jinja2 import Environment, FileSystemLoader
+import config
 
 """
 Utilities for enhancing PyVis graph HTML with custom JavaScript
 """
 
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+GRAPH_TEMPLATE = "graph.html"
 
-def get_base_html_from_network(net):
+# vis-network bundle vendored under static/, served by Streamlit at /app/static
+VIS_NETWORK_JS = "vis-network-9.1.2/vis-network.min.js"
+VIS_NETWORK_CSS = "vis-network-9.1.2/vis-network.css"
+
+
+@lru_cache(maxsize=None)
+def _template_env(template_dir):
+    """
+    Jinja environment for the graph template, shared by every render.
+
+    Templates are parsed and compiled once per process and never re-checked
+    on disk.
+    """
+    return Environment(loader=FileSystemLoader(template_dir), auto_reload=False)
+
+
+@lru_cache(maxsize=None)
+def _asset_version(relative_path):
+    """Short content hash of a static asset, so its URL changes whenever the file does."""
+    return hashlib.sha256((config.STATIC_DIR / relative_path).read_bytes()).hexdigest()[:12]
+
+
+def static_url(relative_path):
     """
-    Generate HTML string from PyVis network without saving to disk.
+    URL of a file in static/, with a content-hash query string.
+
+    Streamlit caches static files for ten years when a `v` query parameter
+    is present (newer releases revalidate with an ETag instead), so the
+    browser downloads each version of an asset only once.
+    """
+    base = st.get_option("server.baseUrlPath").strip("/")
+    prefix = f"/{base}" if base else ""
+    return f"{prefix}/app/static/{relative_path}?v={_asset_version(relative_path)}"
+
+
+def get_graph_html(net, graph):
+    """
+    Generate the graph HTML in memory.
+
+    Uses a slim template instead of pyvis' own: vis-network is loaded from
+    Streamlit's static file serving rather than a CDN, so each render only
+    carries the graph data and a small bootstrap script.
 
     Args:
-        net: PyVis Network instance
+        net: PyVis Network instance, used for its size, colours and options
+        graph: Compact graph payload (see ui.graph_viz._graph_payload)
 
     Returns:
         str: Complete HTML document as string
     """
-    # Create a temporary file
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".html", delete=False, encoding="utf-8"
-    ) as f:
-        temp_path = f.name
-
-    try:
-        net.save_graph(temp_path)
-        with open(temp_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
-    finally:
-        # Clean up temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+    _, _, _, height, width, options = net.get_network_data()
+    if isinstance(net.options, dict):
+        physics_enabled = net.options.get("physics", {}).get("enabled", True)
+    else:
+        physics_enabled = net.options.physics.enabled
 
-    return html_content
+    template = _template_env(TEMPLATE_DIR).get_template(GRAPH_TEMPLATE)
+    return template.render(
+        graph=graph,
+        node_count=len(graph["label"]),
+        height=height,
+        width=width,
+        options=options,
+        physics_enabled=physics_enabled,
+        bgcolor=net.bgcolor,
+        conf=net.conf,
+        vis_js=static_url(VIS_NETWORK_JS),
+        vis_css=static_url(VIS_NETWORK_CSS),
+    )
 
 
 def inject_custom_js(html_content, js_code):
@@ -57,7 +106,9 @@ def inject_custom_js(html_content, js_code):
     else:
         # Fallback: append at end
         return html_content + js_wrapped
-    
+
+
+@lru_cache(maxsize=None)
 def get_delete_node_js():
     """
     Returns JavaScript code that enables right-click to delete nodes.
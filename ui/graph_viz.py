@@ -4,8 +4,244 @@ from pyvis.network import Network
 from database.kuzu_manager import KuzuManager
 from database.sqlite_manager import SQLiteManager
 import config
-from utils import validators
-from ui.graph_utils import get_base_html_from_network, inject_custom_js, get_delete_node_js
+from utils import graph_layout, graph_lod, validators
+from ui.graph_utils import get_graph_html, inject_custom_js, get_delete_node_js
+
+
+# vis-network groups: one style per node kind instead of one per node
+NODE_GROUPS = {
+    "department": {"color": "#2980b9", "size": 30, "shape": "dot"},  # Blue
+    "agency": {"color": "#16a085", "size": 30, "shape": "dot"},  # Teal
+    "ndpb": {"color": "#d35400", "size": 30, "shape": "dot"},  # Orange
+    "organisation": {"color": "#7f8c8d", "size": 30, "shape": "dot"},  # Gray, other org types
+    "stakeholder": {"color": "#27ae60", "size": 20, "shape": "dot"},  # Green
+    "painpoint": {"color": "#c0392b", "size": 15, "shape": "triangle"},  # Red
+    "commercial": {"color": "#f39c12", "size": 15, "shape": "square"},  # Orange
+    "cluster": {"color": "#8e44ad", "size": 25, "shape": "hexagon"},  # Purple
+    "badge": {"color": "#34495e", "size": 10, "shape": "box"},  # Slate
+    "other": {"color": "#95a5a6", "size": 15, "shape": "dot"},
+}
+
+# Hover details per node kind: (label, node key). The browser builds each tooltip
+# from these labels and the node's values the first time the node is hovered.
+DETAIL_FIELDS = {
+    "organisation": [("Type", "org_type"), ("Function", "function")],
+    "stakeholder": [("Job Title", "job_title"), ("Role", "role")],
+    "painpoint": [("Severity", "severity"), ("Urgency", "urgency")],
+    "commercial": [("Method", "method"), ("Budget", "budget")],
+}
+
+# Counts shown on collapsed nodes, in display order
+_COLLAPSED_COUNTS = [
+    ("organisation", "organisations"),
+    ("stakeholder", "stakeholders"),
+    ("painpoint", "pain points"),
+    ("commercial", "commercials"),
+]
+
+_EXPAND_NOTE = "Expand it with 'Expand collapsed nodes' below the graph"
+
+# Org relationship colours; other edges are gray
+RELATION_COLORS = {
+    "mission": "#9b59b6",  # Purple
+    "supplier": "#27ae60",  # Green
+    "consumer": "#f39c12",  # Orange
+    "oversight": "#e74c3c",  # Red
+}
+
+
+def _node_group(node):
+    ntype = validators.normalize_node_type(node.get("type"))
+    if ntype == "organisation":
+        org_type = validators.normalize_org_type(node.get("org_type"))
+        return org_type if org_type in NODE_GROUPS else "organisation"
+    return ntype if ntype in NODE_GROUPS else "other"
+
+
+def _node_details(node, ntype):
+    """Tooltip values for one node, in the order of DETAIL_FIELDS (or full lines for collapsed nodes)."""
+    if ntype in ("cluster", "badge"):
+        counts = node["counts"]
+        return [f"{label.title()}: {counts[t]}" for t, label in _COLLAPSED_COUNTS if t in counts]
+    values = []
+    for _, key in DETAIL_FIELDS.get(ntype, []):
+        if key == "org_type":
+            values.append(validators.normalize_org_type(node.get(key)))
+        elif key == "budget":
+            values.append(f"£{(node.get(key) or 0) / 1e6:.2f}m")
+        else:
+            values.append(str(node.get(key, "N/A")))
+    return values
+
+
+def _graph_payload(nodes, edges, positions):
+    """Columnar graph for the browser: integer IDs, group indexes and per-kind edge styles.
+
+    Styles are sent once per group instead of once per node, and tooltips are
+    built in the browser on first hover rather than embedded for every node.
+    """
+    group_names = list(NODE_GROUPS)
+    group_index = {name: i for i, name in enumerate(group_names)}
+    index = {}
+    labels, groups, details, sizes = [], [], [], {}
+    xs, ys = [], []
+    for node in nodes:
+        if node["id"] in index:
+            continue
+        i = index[node["id"]] = len(labels)
+        group = _node_group(node)
+        ntype = validators.normalize_node_type(node.get("type"))
+        labels.append(node["label"])
+        groups.append(group_index[group])
+        details.append(_node_details(node, ntype))
+        if ntype == "cluster":
+            sizes[i] = round(min(60, 25 + 3 * node["members"] ** 0.5))
+        if positions:
+            x, y = positions[node["id"]]
+            xs.append(round(x))
+            ys.append(round(y))
+
+    # Edge styles are (colour, width, title), shared by every edge of the same kind
+    styles, style_index = [], {}
+    sources, targets, edge_styles, counts = [], [], [], {}
+    for edge in edges:
+        if edge["from"] not in index or edge["to"] not in index:
+            continue
+        etype = validators.normalize_node_type(edge.get("type"))
+        if etype == "org_relation":
+            elabel = validators.normalize_relationship_type(edge.get("label"))
+            style = (RELATION_COLORS.get(elabel, "#bdc3c7"), 2, edge["label"])
+        elif etype == "cluster_link":
+            style = ("#bdc3c7", 1, "")
+            counts[len(sources)] = edge["count"]
+        else:
+            style = ("#7f8c8d", 1, edge["label"])
+        if style not in style_index:
+            style_index[style] = len(styles)
+            styles.append(style)
+        sources.append(index[edge["from"]])
+        targets.append(index[edge["to"]])
+        edge_styles.append(style_index[style])
+
+    return {
+        "groups": {name: {**style, "font": {"color": "white"}} for name, style in NODE_GROUPS.items()},
+        "group_names": group_names,
+        "fields": {
+            group: [label for label, _ in DETAIL_FIELDS[ntype]]
+            for group, ntype in ((group, "organisation" if group in config.ORG_TYPES else group) for group in group_names)
+            if ntype in DETAIL_FIELDS
+        },
+        "notes": {"cluster": _EXPAND_NOTE, "badge": _EXPAND_NOTE},
+        "label": labels,
+        "group": groups,
+        "details": details,
+        "size": sizes,
+        "x": xs,
+        "y": ys,
+        "edge_styles": styles,
+        "from": sources,
+        "to": targets,
+        "style": edge_styles,
+        "count": counts,
+    }
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _render_graph_html(
+    graph_version,
+    relationship_filters,
+    node_types,
+    org_type_filter,
+    physics_enabled,
+    layout_algorithm,
+    neighborhood_query,
+    node_budget,
+    expanded,
+    _nodes,
+    _edges,
+):
+    """Build the PyVis network and its HTML, cached per graph version and view settings.
+
+    The other arguments determine _nodes/_edges, so those are left out of the
+    cache key instead of being hashed on every rerun.
+    """
+    # Create PyVis network
+    net = Network(
+        height="700px",
+        width="100%",
+        bgcolor="#222222",
+        font_color="white",
+        notebook=False,
+    )
+
+    # Configure physics
+    positions = {}
+    if layout_algorithm == "precomputed":
+        # Cached separately per graph version and node/edge set, so view settings that
+        # keep the same nodes reuse the layout; the browser only draws
+        positions = _precomputed_positions(
+            graph_version,
+            tuple(sorted(node["id"] for node in _nodes)),
+            tuple(sorted((edge["from"], edge["to"]) for edge in _edges)),
+        )
+        net.toggle_physics(False)
+    elif physics_enabled:
+        if layout_algorithm == "force_atlas_2based":
+            net.barnes_hut()
+        elif layout_algorithm == "barnes_hut":
+            net.force_atlas_2based()
+        elif layout_algorithm == "hierarchical":
+            net.show_buttons(filter_=["physics"])
+    else:
+        net.toggle_physics(False)
+
+    payload = _graph_payload(_nodes, _edges, positions)
+
+    # Generate HTML in memory
+    html_content = get_graph_html(net, payload)
+
+    # Inject delete functionality
+    delete_js = get_delete_node_js()
+    return inject_custom_js(html_content, delete_js)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _level_of_detail(
+    graph_version,
+    relationship_filters,
+    node_types,
+    org_type_filter,
+    neighborhood_query,
+    node_budget,
+    expanded,
+    _nodes,
+    _edges,
+):
+    """Nodes and edges to draw, collapsed to about node_budget nodes (see utils/graph_lod.py)."""
+    return graph_lod.level_of_detail(_nodes, _edges, node_budget, expanded)
+
+
+@st.cache_resource
+def _layout_memory():
+    """Recent node positions, shared by all sessions to seed later layouts."""
+    return graph_layout.LayoutMemory(config.GRAPH_LAYOUT_MEMORY)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _precomputed_positions(graph_version, node_ids, edge_pairs):
+    """Server-side layout, seeded from earlier positions so small edits keep the picture stable."""
+    memory = _layout_memory()
+    positions = graph_layout.force_layout(node_ids, edge_pairs, previous=memory.recall(node_ids))
+    memory.remember(positions)
+    return positions
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _load_graph_data(_kuzu_mgr: KuzuManager, graph_version, relationship_filters, neighborhood_query):
+    """Nodes and edges from Kuzu, reloaded only when the graph changes."""
+    if neighborhood_query:
+        return _kuzu_mgr.get_organisation_neighborhood(neighborhood_query['org_id'], neighborhood_query['depth'])
+    return _kuzu_mgr.get_graph_data(relationship_filters)
 
 
 def render_graph_explorer(kuzu_mgr: KuzuManager, sqlite_mgr: SQLiteManager):
@@ -44,11 +280,28 @@ def render_graph_explorer(kuzu_mgr: KuzuManager, sqlite_mgr: SQLiteManager):
         physics_enabled = st.checkbox("Enable Physics", value=True)
 
         layout_algorithm = st.selectbox(
-            "Layout Algorithm", ["barnes_hut", "force_atlas_2based", "hierarchical"]
+            "Layout Algorithm",
+            ["precomputed", "barnes_hut", "force_atlas_2based", "hierarchical"],
+            help="precomputed lays the graph out on the server once per data change and draws it without physics; "
+            "the others run physics in the browser",
+        )
+
+        node_budget = st.number_input(
+            "Node budget",
+            min_value=100,
+            max_value=20000,
+            value=config.GRAPH_NODE_BUDGET,
+            step=100,
+            help="Above this many nodes, each organisation's stakeholders, pain points and commercials "
+            "are collapsed into a badge, then groups of related organisations into clusters",
         )
 
         # Refresh button
         if st.button("🔄 Refresh Graph", width='stretch'):
+            _load_graph_data.clear()
+            _render_graph_html.clear()
+            _level_of_detail.clear()
+            _precomputed_positions.clear()
             st.rerun()
 
         # -- Neighbourhood explorer --
@@ -83,11 +336,21 @@ def render_graph_explorer(kuzu_mgr: KuzuManager, sqlite_mgr: SQLiteManager):
     # If user requested a neighbourhood query (via sidebar) use that dataset;
     # otherwise fall back to global graph data.
     try:
-        if st.session_state.get('neighborhood_query'):
-            q = st.session_state['neighborhood_query']
-            graph_data = kuzu_mgr.get_organisation_neighborhood(q['org_id'], q['depth'])
-        else:
-            graph_data = kuzu_mgr.get_graph_data(relationship_filters)
+        # Data and HTML are cached under the graph version, so reruns from unrelated
+        # widgets (e.g. the details selectbox below) neither query Kuzu nor rebuild the network
+        graph_version = kuzu_mgr.graph_version
+        neighborhood_query = st.session_state.get('neighborhood_query')
+        node_types = tuple(
+            ntype
+            for ntype, shown in (
+                ("organisation", show_orgs),
+                ("stakeholder", show_stakeholders),
+                ("painpoint", show_painpoints),
+                ("commercial", show_commercials),
+            )
+            if shown
+        )
+        graph_data = _load_graph_data(kuzu_mgr, graph_version, relationship_filters, neighborhood_query)
 
         nodes = graph_data["nodes"]
         edges = graph_data["edges"]
@@ -138,127 +401,67 @@ def render_graph_explorer(kuzu_mgr: KuzuManager, sqlite_mgr: SQLiteManager):
             )
             st.metric("Stakeholders", stakeholder_count)
 
-        # Create PyVis network
-        net = Network(
-            height="700px",
-            width="100%",
-            bgcolor="#222222",
-            font_color="white",
-            notebook=False,
+        # Level of detail: the widget below the graph picks which collapsed nodes to open
+        expanded = tuple(st.session_state.get("graph_expanded", []))
+        display_nodes, display_edges = _level_of_detail(
+            graph_version,
+            relationship_filters,
+            node_types,
+            org_type_filter,
+            neighborhood_query,
+            node_budget,
+            expanded,
+            filtered_nodes,
+            filtered_edges,
         )
-
-        # Configure physics
-        if physics_enabled:
-            if layout_algorithm == "force_atlas_2based":
-                net.barnes_hut()
-            elif layout_algorithm == "barnes_hut":
-                net.force_atlas_2based()
-            elif layout_algorithm == "hierarchical":
-                net.show_buttons(filter_=["physics"])
-        else:
-            net.toggle_physics(False)
-
-        # Add nodes
-        for node in filtered_nodes:
-            # Determine color based on type
-            ntype = validators.normalize_node_type(node.get("type"))
-            org_type = validators.normalize_org_type(node.get("org_type"))
-
-            if ntype == "organisation":
-                if org_type == "department":
-                    color = "#2980b9"  # Blue
-                elif org_type == "agency":
-                    color = "#16a085"  # Teal
-                elif org_type == "ndpb":
-                    color = "#d35400"  # Orange
-                else:
-                    color = "#7f8c8d"  # Gray
-                size = 30
-                shape = "dot"
-            elif ntype == "stakeholder":
-                color = "#27ae60"  # Green
-                size = 20
-                shape = "dot"
-            elif ntype == "painpoint":
-                color = "#c0392b"  # Red
-                size = 15
-                shape = "triangle"
-            elif ntype == "commercial":
-                color = "#f39c12"  # Orange
-                size = 15
-                shape = "square"
-            else:
-                color = "#95a5a6"
-                size = 15
-                shape = "dot"
-
-            # Create hover title with details (no HTML; use \n for new lines)
-            lines = [f"{node['label']}"]  # No <b> or </b>
-            if ntype == "organisation":
-                lines.append(f"Type: {org_type}")
-                lines.append(f"Function: {node.get('function', 'N/A')}")
-            elif ntype == "stakeholder":
-                lines.append(f"Job Title: {node.get('job_title', 'N/A')}")
-                lines.append(f"Role: {node.get('role', 'N/A')}")
-            elif ntype == "painpoint":
-                lines.append(f"Severity: {node.get('severity', 'N/A')}")
-                lines.append(f"Urgency: {node.get('urgency', 'N/A')}")
-            elif ntype == "commercial":
-                lines.append(f"Method: {node.get('method', 'N/A')}")
-                lines.append(f"Budget: £{node.get('budget', 0) / 1e6:.2f}m")
-
-            title = "\n".join(lines)
-
-            net.add_node(
-                node["id"],
-                label=node["label"],
-                title=title,
-                color=color,
-                size=size,
-                shape=shape,
+        if len(display_nodes) < len(filtered_nodes):
+            st.caption(
+                f"Showing {len(display_nodes)} of {len(filtered_nodes)} nodes: "
+                "collapsed badges (▭) and clusters (⬢) can be expanded below the graph."
             )
 
-        # Add edges
-        for edge in filtered_edges:
-            # Determine edge color based on type
-            etype = validators.normalize_node_type(edge.get("type"))
-            elabel = validators.normalize_relationship_type(edge.get("label"))
-
-            if etype == "org_relation":
-                if elabel == "mission":
-                    color = "#9b59b6"  # Purple
-                elif elabel == "supplier":
-                    color = "#27ae60"  # Green
-                elif elabel == "consumer":
-                    color = "#f39c12"  # Orange
-                elif elabel == "oversight":
-                    color = "#e74c3c"  # Red
-                else:
-                    color = "#bdc3c7"  # Gray
-                width = 2
-            else:
-                color = "#7f8c8d"  # Gray for other relationships
-                width = 1
-
-            net.add_edge(
-                edge["from"],
-                edge["to"],
-                title=edge["label"],
-                color=color,
-                width=width,
-                arrows="to",
+        if layout_algorithm == "precomputed" and len(display_nodes) > config.GRAPH_LAYOUT_MAX_NODES:
+            # The server layout compares every pair of nodes, so it stops scaling here
+            st.info(
+                f"ℹ️ {len(display_nodes)} nodes is more than the precomputed layout handles "
+                f"({config.GRAPH_LAYOUT_MAX_NODES}); laying out in the browser with barnes_hut instead. "
+                "Lower the node budget to use it."
             )
-
-        # Generate HTML in memory
-        html_content = get_base_html_from_network(net)
-
-        # Inject delete functionality
-        delete_js = get_delete_node_js()
-        html_content = inject_custom_js(html_content, delete_js)
+            layout_algorithm = "barnes_hut"
+
+        html_content = _render_graph_html(
+            graph_version,
+            relationship_filters,
+            node_types,
+            org_type_filter,
+            physics_enabled,
+            layout_algorithm,
+            neighborhood_query,
+            node_budget,
+            expanded,
+            display_nodes,
+            display_edges,
+        )
 
         # Display in Streamlit
         components.html(html_content, height=750)
 
+        # The graph iframe cannot send clicks back to Python, so expanding happens here
+        collapsed = {
+            node["id"]: f"{node['org_label']}: {node['label']}" if node["type"] == "badge" else node["label"]
+            for node in display_nodes
+            if node.get("type") in ("cluster", "badge")
+        }
+        if collapsed or expanded:
+            labels = {**st.session_state.get("graph_expanded_labels", {}), **collapsed}
+            st.session_state["graph_expanded_labels"] = labels
+            st.multiselect(
+                "Expand collapsed nodes",
+                options=sorted(set(collapsed) | set(expanded), key=lambda node_id: (node_id not in expanded, labels.get(node_id, node_id))),
+                format_func=lambda node_id: f"{'⬢' if node_id.startswith('cluster:') else '▭'} {labels.get(node_id, node_id)}",
+                key="graph_expanded",
+            )
+
         # Legend
         with st.expander("📖 Legend", expanded=False):
             st.write("### Node Types")
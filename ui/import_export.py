@@ -3,21 +3,31 @@ import pandas as pd
 from pathlib import Path
 from loguru import logger
 import config
+import zipfile
 from database.sqlite_manager import SQLiteManager
 from database.sync_manager import SyncManager
-import zipfile
-import io
+from database.import_manager import ImportManager
+from database.import_jobs import file_hash
+from database.name_resolver import NAME_COLUMNS, NameResolver
+from database.export_manager import ExportManager
+from database.delta_export import DeltaExporter
+from utils import tabular_io, validators
+from ui import downloads
 
 def render_import_export(sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
-    """Render CSV import/export interface"""
+    """Render CSV, Parquet and Arrow IPC import/export interface"""
     
     st.header("📁 Import/Export Data")
 
-    tab1, tab2 = st.tabs(["Import CSV", "Export CSV"])
+    import_mgr = ImportManager(sqlite_mgr, sync_mgr)
+    export_mgr = ExportManager(sqlite_mgr)
+    delta_exporter = DeltaExporter(sqlite_mgr)
 
-    # ========== Import CSV Tab ==========
+    tab1, tab_bundle, tab2 = st.tabs(["Import", "Import Bundle", "Export"])
+
+    # ========== Import Tab ==========
     with tab1:
-        st.subheader("Import Data from CSV")
+        st.subheader("Import Data from CSV, Parquet or Arrow IPC")
 
         table_type = st.selectbox(
             "Select data type to import",
@@ -25,36 +35,43 @@ def render_import_export(sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
         )
 
         uploaded_file = st.file_uploader(
-            f"Upload {table_type}.csv",
-            type=["csv"],
+            f"Upload {table_type} (.csv, .parquet, .arrow/.feather)",
+            type=tabular_io.upload_types(),
             key=f"upload_{table_type.lower()}"
         )
 
         if uploaded_file is not None:
             try:
-                df = pd.read_csv(uploaded_file)
+                file_format = tabular_io.detect_format(uploaded_file.name)
+
+                # Only the first rows are parsed here; the full file is streamed on import
+                preview_df = import_mgr.preview(uploaded_file, file_format)
 
                 st.write("Preview of uploaded data:")
-                st.dataframe(df.head())
+                st.dataframe(preview_df)
 
-                st.write(f"**Rows:** {len(df)}")
-                st.write(f"**Columns:** {', '.join(df.columns.tolist())}")
+                st.write(f"**Format:** {file_format}")
+                st.write(f"**Size:** {uploaded_file.size / 1_000_000:.1f} MB")
+                st.write(f"**Columns:** {', '.join(preview_df.columns.tolist())}")
 
                 # Validate columns
-                expected_columns =config.TABLES[table_type]
-                missing_columns = set(expected_columns) - set(df.columns)
+                missing_columns = import_mgr.missing_columns(table_type, preview_df.columns)
 
                 if missing_columns:
                     st.error(f"Missing required columns: {', '.join(missing_columns)}")
                 else:
                     st.success("✅ All required columns are present.")
 
-                    col1, col2 = st.columns(2)
+                    name_columns = NameResolver.name_columns(table_type, preview_df.columns)
+                    if name_columns:
+                        st.info("🔗 Names will be resolved to IDs: " + ", ".join(f"{name} → {fk}" for fk, name in name_columns.items()))
+
+                    col1, col2, col3 = st.columns(3)
 
                     with col1:
                         replace_existing = st.checkbox(
                             "Replace existing data",
-                            help="If checked, existing records with same IDs will be updated"
+                            help="If checked, existing records with same IDs will be updated. Rows identical to the stored data are skipped."
                         )
 
                     with col2:
@@ -64,251 +81,252 @@ def render_import_export(sqlite_mgr: SQLiteManager, sync_mgr: SyncManager):
                             help="Automatically sync imported data to the graph database"
                         )
 
-                    if st.button("Import Data", type="primary"):
-                        with st.spinner("Importing data..."):
-                            success_count = 0
-                            error_count = 0
-
-                            if table_type == "Organisation":
-                                for _, row in df.iterrows():
-                                    org_id_int = int(row['org_id'])
-                                    if replace_existing:
-                                        success = sqlite_mgr.update_organisation(
-                                            org_id=org_id_int,
-                                            org_name=row['org_name'],
-                                            org_type=row['org_type'],
-                                            org_function=row['org_function'],
-                                        )
-                                    else:
-                                        success = sqlite_mgr.insert_organisation(
-                                            org_id=org_id_int,
-                                            org_name=row['org_name'],
-                                            org_type=row['org_type'],
-                                            org_function=row['org_function'],
-                                        )
-
-                                    if success:
-                                        success_count += 1
-                                        if sync_to_kuzu:
-                                            sync_mgr.sync_organisation(int(row['org_id']))
-                                    else:
-                                        error_count += 1
-                                        logger.error(f"Failed to import Organisation: {row['org_id']}")
-
-                            elif table_type == "Stakeholder":
-                                for _, row in df.iterrows():
-                                    stakeholder_id_int = int(row['stakeholder_id'])
-                                    if replace_existing:
-                                        success = sqlite_mgr.update_stakeholder(
-                                            stakeholder_id=stakeholder_id_int,
-                                            org_id=int(row['org_id']),
-                                            name=row['name'],
-                                            job_title=row['job_title'],
-                                        role=row['role'],
-                                    )
-                                    else:
-                                        success = sqlite_mgr.insert_stakeholder(
-                                            stakeholder_id=stakeholder_id_int,
-                                            org_id=int(row['org_id']),
-                                            name=row['name'],
-                                            job_title=row['job_title'],
-                                            role=row['role'],
-                                        )
-                                    if success:
-                                        success_count += 1
-                                        if sync_to_kuzu:
-                                            sync_mgr.sync_stakeholder(int(row['stakeholder_id']))
-                                    else:
-                                        error_count += 1
-                                        logger.error(f"Failed to import Stakeholder: {row['stakeholder_id']}")
-
-                            elif table_type == "PainPoint":
-                                for _, row in df.iterrows():
-                                    painpoint_id_int = int(row.get('painpoint_id'))
-                                    if replace_existing:
-                                        success = sqlite_mgr.update_painpoint(
-                                            painpoint_id=painpoint_id_int,
-                                            description=row.get('description'),
-                                            severity=row.get('severity'),
-                                            urgency=row.get('urgency'),
-                                    )
-                                    else:
-                                        success = sqlite_mgr.insert_painpoint(
-                                            painpoint_id=painpoint_id_int,
-                                            description=row.get('description'),
-                                            severity=row.get('severity'),
-                                            urgency=row.get('urgency'),
-                                    )
-                                    if success:
-                                        success_count += 1
-                                        if sync_to_kuzu:
-                                            sync_mgr.sync_painpoint_node(int(row['painpoint_id']))
-                                    else:
-                                        error_count += 1
-                                        logger.error(f"Failed to import PainPoint: {row['painpoint_id']}")
-
-                            elif table_type == "Commercial":
-                                for _, row in df.iterrows():
-                                    commercial_id_int = int(row.get('commercial_id'))
-                                    if replace_existing:
-                                        success = sqlite_mgr.update_commercial(
-                                            commercial_id=commercial_id_int,
-                                            org_id=int(row['org_id']),
-                                            method=row['method'],
-                                            budget=float(row['budget']),
-                                    )
-                                    else:
-                                        success = sqlite_mgr.insert_commercial(
-                                            commercial_id=commercial_id_int,
-                                            org_id=int(row['org_id']),
-                                            method=row['method'],
-                                            budget=float(row['budget']),
-                                    )
-                                    if success:
-                                        success_count += 1
-                                        if sync_to_kuzu:
-                                            sync_mgr.sync_commercial(int(row['commercial_id']))
-                                    else:
-                                        error_count += 1
-                                        logger.error(f"Failed to import Commercial: {row['commercial_id']}")
-
-                            elif table_type == "OrgRelationship":
-                                for _, row in df.iterrows():
-                                    success = sqlite_mgr.insert_org_relationship(
-                                        from_org_id=int(row['from_org_id']),
-                                        to_org_id=int(row['to_org_id']),
-                                        relationship_type=row['relationship_type'],
-                                    )
-                                    if success:
-                                        success_count += 1
-                                        if sync_to_kuzu:
-                                            sync_mgr.sync_relationship(
-                                                int(row['from_org_id']),
-                                                int(row['to_org_id']),
-                                                row['relationship_type']
-                                            )
-                                    else:
-                                        error_count += 1
-                                        logger.error(f"Failed to import OrgRelationship: {row['from_org_id']} -> {row['to_org_id']}")
-                            
-                            elif table_type == "OrganisationPainPoint":
-                                for _, row in df.iterrows():
-                                    org_id = int(row['org_id'])
-                                    painpoint_id = int(row['painpoint_id'])
-                                    success = sqlite_mgr.insert_painpoint_assignment(
-                                        org_id=org_id,
-                                        painpoint_id=painpoint_id
-                                    )
-                                    if success:
-                                        success_count += 1
-                                        if sync_to_kuzu:
-                                            sync_mgr.sync_painpoint_assignments(
-                                                org_ids=[org_id],
-                                                painpoint_id=painpoint_id
-                                            )
-                                    else:
-                                        error_count += 1
-                                        logger.error(f"Failed to import OrganisationPainPoint: {org_id} - {painpoint_id}")
-
-                            st.success(f"✅ Imported {success_count} records successfully!")
-
-                            if error_count > 0:
-                                st.warning(f"⚠️ {error_count} records failed (possibly duplicates)")
-
-                            st.rerun()
+                    with col3:
+                        chunk_size = st.number_input(
+                            "Rows per chunk",
+                            min_value=100,
+                            max_value=100_000,
+                            value=config.IMPORT_CHUNK_SIZE,
+                            step=1000,
+                            help="Each chunk is validated, written and synced as one batch"
+                        )
+
+                    if st.button("🔍 Validate (dry run)", help="Check keys and references without writing anything"):
+                        with st.spinner("Validating..."):
+                            report = import_mgr.precheck_file(uploaded_file, table_type, file_format, replace_existing, int(chunk_size))
+                        render_precheck_report(report, f"{table_type.lower()}_precheck.csv")
+
+                    # Hash once per upload; a matching unfinished job can be resumed
+                    hash_key = f"import_hash_{uploaded_file.file_id}"
+                    if hash_key not in st.session_state:
+                        with st.spinner("Checking for an interrupted import of this file..."):
+                            st.session_state[hash_key] = file_hash(uploaded_file)
+                    resumable = import_mgr.jobs.find_resumable(st.session_state[hash_key], table_type)
+
+                    def run_import(job_id):
+                        progress_bar = st.progress(0.0, text="Importing data...")
+
+                        def update_progress(stats):
+                            progress_bar.progress(
+                                stats["fraction"],
+                                text=f"Imported {stats['imported']} rows ({stats['failed']} failed) in {stats['chunks']} chunks..."
+                            )
+
+                        stats = import_mgr.import_file(
+                            uploaded_file,
+                            table_type,
+                            file_format=file_format,
+                            chunk_size=int(chunk_size),
+                            replace_existing=replace_existing,
+                            sync_to_kuzu=sync_to_kuzu,
+                            progress=update_progress,
+                            job_id=job_id,
+                        )
+                        progress_bar.progress(1.0, text="Import complete")
+
+                        st.success(f"✅ Imported {stats['imported']} records successfully!")
+
+                        if stats["failed"] > 0:
+                            st.warning(f"⚠️ {stats['failed']} records failed (possibly duplicates)")
+
+                        if stats["unchanged"] > 0:
+                            st.info(f"⏭️ {stats['unchanged']} records were identical to the stored data and skipped")
+
+                        st.rerun()
+
+                    if resumable:
+                        st.warning(
+                            f"⏸️ An earlier import of this file (job {resumable['job_id']}, started {resumable['started_at']}) "
+                            f"stopped after {resumable['rows_committed']:,} rows: {resumable['imported']:,} imported, "
+                            f"{resumable['failed']:,} failed. Resuming skips the rows already committed."
+                        )
+                        if resumable["error_log"]:
+                            with st.expander("Job error log"):
+                                st.code(resumable["error_log"])
+                        col_resume, col_restart = st.columns(2)
+                        with col_resume:
+                            if st.button("▶️ Resume Import", type="primary"):
+                                run_import(resumable["job_id"])
+                        with col_restart:
+                            # Closing the old job first, so it is not offered again alongside the new one
+                            if st.button(
+                                "🔁 Start Over",
+                                help="Abandon the earlier job and import from the first row. Rows it already "
+                                "committed will fail as duplicates, or be rewritten with 'Replace existing data'",
+                            ):
+                                import_mgr.jobs.finish(resumable["job_id"], "abandoned", "Abandoned: import started over")
+                                job = import_mgr.start_job(uploaded_file, table_type, file_format, replace_existing, st.session_state[hash_key])
+                                run_import(job["job_id"])
+
+                    elif st.button("Import Data", type="primary"):
+                        job = import_mgr.start_job(uploaded_file, table_type, file_format, replace_existing, st.session_state[hash_key])
+                        run_import(job["job_id"])
+
+            except Exception as e:
+                st.error(f"Error reading {uploaded_file.name}: {e}")
+
+    # ========== Import Bundle Tab ==========
+    with tab_bundle:
+        st.subheader("Import All Tables from a ZIP Bundle")
+        st.caption("Accepts the \"All Tables\" export. Tables are loaded in dependency order in one transaction.")
+
+        bundle_file = st.file_uploader("Upload bundle (.zip)", type=["zip"], key="upload_bundle")
+
+        if bundle_file is not None:
+            try:
+                with zipfile.ZipFile(bundle_file) as zip_file:
+                    members = import_mgr.bundle_members(zip_file)
+                bundle_file.seek(0)
+
+                if not members:
+                    st.error("No table files found in the bundle.")
+                else:
+                    st.write("**Tables found:** " + ", ".join(f"{table} ({name})" for table, name in members.items()))
+
+                    col1, col2 = st.columns(2)
+
+                    with col1:
+                        bundle_replace = st.checkbox(
+                            "Replace existing data",
+                            key="bundle_replace",
+                            help="If checked, existing records with same IDs will be updated"
+                        )
+
+                    with col2:
+                        bundle_sync = st.checkbox(
+                            "Sync to graph database",
+                            value=True,
+                            key="bundle_sync",
+                            help="Run one full graph sync after all tables are loaded"
+                        )
+
+                    if st.button("🔍 Validate bundle (dry run)", help="Check keys and references without writing anything"):
+                        with st.spinner("Validating..."):
+                            report = import_mgr.precheck_bundle(bundle_file, bundle_replace)
+                        render_precheck_report(report, "bundle_precheck.csv")
+
+                    if st.button("Import Bundle", type="primary"):
+                        progress_bar = st.progress(0.0, text="Parsing bundle...")
+
+                        def update_bundle_progress(stats):
+                            progress_bar.progress(stats["fraction"], text=f"Loaded {stats['table']}...")
+
+                        results = import_mgr.import_bundle(
+                            bundle_file,
+                            replace_existing=bundle_replace,
+                            sync_to_kuzu=bundle_sync,
+                            progress=update_bundle_progress,
+                        )
+                        progress_bar.progress(1.0, text="Import complete")
+
+                        st.success(f"✅ Imported {sum(r['imported'] for r in results.values())} records successfully!")
+                        st.dataframe(pd.DataFrame.from_dict(results, orient="index"))
+
+                        failed = sum(r["failed"] for r in results.values())
+                        if failed > 0:
+                            st.warning(f"⚠️ {failed} records failed (possibly duplicates)")
 
             except Exception as e:
-                st.error(f"Error reading CSV: {e}")
+                st.error(f"❌ Error importing bundle: {e}")
 
-    # ========== Export CSV Tab ==========
+    # ========== Export Tab ==========
     with tab2:
-        st.subheader("Export Data to CSV")
+        st.subheader("Export Data")
 
         export_type = st.selectbox(
             "Select data to export",
             ["Organisation", "Stakeholder", "PainPoint", "Commercial", "OrgRelationship", "OrganisationPainPoint", "All Tables"]
         )
 
-        if st.button("Generate CSV", type="primary"):
+        export_format = st.radio(
+            "Format",
+            list(tabular_io.FORMATS),
+            horizontal=True,
+            help="Parquet (zstd) and Arrow IPC keep column types and are much smaller than CSV"
+        )
+
+        if st.button("Generate Export", type="primary"):
+            filename = export_type
             try:
-                if export_type == "Organisation":
-                    df = sqlite_mgr.get_all_organisations()
-                    filename = "organisations_export.csv"
-                
-                elif export_type == "Stakeholder":
-                    df = sqlite_mgr.get_all_stakeholders()
-                    df = df.drop(columns=['org_name'], errors='ignore')  
-                    # Drop org_name as join column
-                    filename = "stakeholders_export.csv"
-
-                elif export_type == "PainPoint":
-                    df = sqlite_mgr.get_all_painpoints()
-                    df = df.drop(columns=['org_name'], errors='ignore')  
-                    # Drop org_name as join column
-                    filename = "painpoints_export.csv"
-
-                elif export_type == "Commercial":
-                    df = sqlite_mgr.get_all_commercials()
-                    df = df.drop(columns=['org_name'], errors='ignore')  
-                    # Drop org_name as join column
-                    filename = "commercials_export.csv"
-
-                elif export_type == "OrgRelationship":
-                    df = sqlite_mgr.get_all_org_relationships()
-                    df = df[['from_org_id', 'to_org_id', 'relationship_type']]  
-                    # Only keep relevant columns
-                    filename = "org_relationships_export.csv"
-
-                elif export_type == "OrganisationPainPoint":
-                    df = sqlite_mgr.get_all_painpoint_assignments()
-                    filename = "organisation_painpoints_export.csv"
-
-                elif export_type == "All Tables":
-                    # Export all tables as a zip file
-                    zip_buffer = io.BytesIO()
-                    with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED) as zip_file:
-                        for table in ["Organisation", "Stakeholder", "PainPoint", "Commercial", "OrgRelationship", "OrganisationPainPoint"]:
-                            if table == "Organisation":
-                                df = sqlite_mgr.get_all_organisations()
-                            elif table == "Stakeholder":
-                                df = sqlite_mgr.get_all_stakeholders()
-                                df = df.drop(columns=['org_name'], errors='ignore')
-                            elif table == "PainPoint":
-                                df = sqlite_mgr.get_all_painpoints()
-                                df = df.drop(columns=['org_name'], errors='ignore')
-                            elif table == "Commercial":
-                                df = sqlite_mgr.get_all_commercials()
-                                df = df.drop(columns=['org_name'], errors='ignore')
-                            elif table == "OrgRelationship":
-                                df = sqlite_mgr.get_all_org_relationships()
-                                df = df[['from_org_id', 'to_org_id', 'relationship_type']]
-                            elif table == "OrganisationPainPoint":
-                                df = sqlite_mgr.get_all_painpoint_assignments()
-
-                            csv_data = df.to_csv(index=False)
-                            zip_file.writestr(f"{table.lower()}_export.csv", csv_data)
-
-                    st.download_button(
-                        label="📥 Download All Tables (ZIP)",
-                        data=zip_buffer.getvalue(),
-                        file_name="stakeholder_map_export.zip",
-                        mime="application/zip"
+                if export_type != "All Tables":
+                    # Stream the table from a SQLite cursor straight to a file under EXPORT_DIR
+                    with st.spinner("Exporting..."):
+                        export_path, row_count = export_mgr.export_file(export_type, export_format)
+                    filename = export_path.name
+
+                    # Served from disk; download_button would load the whole file into memory
+                    downloads.download_link(f"📥 Download {filename}", export_path)
+
+                    st.success(f"✅ Exported {row_count} records to {export_path}")
+                    with open(export_path, "rb") as export_file:
+                        st.dataframe(tabular_io.preview(export_file, export_format))
+
+                else:
+                    # Rows stream from SQLite cursors into a ZIP spooled to disk under EXPORT_DIR
+                    with st.spinner("Building export package..."):
+                        zip_path = export_mgr.export_zip(export_format)
+                    # Moved into the download folder, which deletes it once the link expires
+                    downloads.download_link(
+                        "📥 Download All Tables (ZIP)", zip_path, file_name="stakeholder_map_export.zip", move=True
                     )
                     st.success("✅ Export package ready!")
-                    return  # Exit after handling all tables
-                
-                # Single table export
-                csv_data = df.to_csv(index=False)
-
-                st.download_button(
-                    label=f"📥 Download {filename}",
-                    data=csv_data,
-                    file_name=filename,
-                    mime="text/csv"
-                )
-
-                st.success(f"✅ Exported {len(df)} records!")
-                st.dataframe(df.head())
-            
+
             except Exception as e:
                 st.error(f"❌ Error exporting {filename}: {e}")
+
+        st.markdown("---")
+        st.write("### Delta Export")
+        st.caption(
+            f"Writes only the records inserted, updated or deleted since the last delta export to {config.EXPORT_DIR / 'delta'}. "
+            "An `_op` column marks each row as an upsert or a delete tombstone. "
+            "Schedule `python -m database.delta_export` for nightly feeds."
+        )
+
+        if delta_exporter.get_checkpoint() is None:
+            st.write("**No checkpoint yet:** the first delta export writes a full baseline.")
+        else:
+            st.write(f"**Changes since last checkpoint:** {delta_exporter.pending_changes()}")
+
+        delta_format = st.radio("Delta format", ["Parquet", "CSV"], horizontal=True, key="delta_format")
+
+        if st.button("📤 Export Changes"):
+            try:
+                result = delta_exporter.export(file_format=delta_format)
+                if result["tables"]:
+                    st.success(f"✅ Wrote {sum(result['tables'].values())} changes to {result['directory']}")
+                    st.dataframe(pd.Series(result["tables"], name="Rows"))
+                else:
+                    st.info("No changes since the last checkpoint.")
+            except Exception as e:
+                st.error(f"❌ Delta export failed: {e}")
+
+
+def render_precheck_report(report: pd.DataFrame, filename: str):
+    """Show a dry-run error report with a download of the full list"""
+    if report.empty:
+        st.success("✅ No problems found. The import can proceed.")
+        return
+
+    errors = validators.report_errors(report)
+    warnings = validators.report_warnings(report)
+
+    if errors.empty:
+        st.success("✅ No errors found. The import can proceed.")
+    else:
+        st.error(f"❌ Found {len(errors)} problems in {errors['Row'].nunique()} rows. Nothing has been written.")
+        st.dataframe(errors.drop(columns="Level", errors="ignore"), hide_index=True)
+    if not warnings.empty:
+        st.warning(f"⚠️ {warnings['Row'].nunique()} rows have values outside the configured lists; they will be imported as written.")
+        st.dataframe(warnings.drop(columns="Level"), hide_index=True)
+
+    unresolved = errors[errors["Column"].isin(NAME_COLUMNS.values())]
+    if not unresolved.empty:
+        st.write(f"**Unresolved names** ({unresolved['Value'].nunique()} distinct):")
+        st.dataframe(NameResolver.summarize(unresolved), hide_index=True)
+
+    st.download_button(
+        label="📥 Download report",
+        data=report.to_csv(index=False),
+        file_name=filename,
+        mime="text/csv"
+    )
@@ -0,0 +1,165 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import numpy as np
+
+# Target length of an edge, in vis.js canvas pixels
+EDGE_LENGTH = 120.0
+
+# Node pairs computed at once while summing repulsion; small blocks stay in CPU cache
+BLOCK_PAIRS = 250_000
+
+# Iterations for a layout from scratch, and when most nodes already have a position
+FULL_ITERATIONS = 60
+INCREMENTAL_ITERATIONS = 15
+
+# Pull towards the centre, so disconnected components stay in view
+GRAVITY = 0.1
+
+Position = Tuple[float, float]
+
+
+class LayoutMemory:
+    """Last known position of up to `limit` nodes, dropping the least recently laid out first.
+
+    Shared between sessions, so lookups and updates take a lock.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._positions: "OrderedDict[Hashable, Position]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def recall(self, node_ids: Iterable[Hashable]) -> Dict[Hashable, Position]:
+        """Known positions of the given nodes."""
+        with self._lock:
+            return {node_id: self._positions[node_id] for node_id in node_ids if node_id in self._positions}
+
+    def remember(self, positions: Dict[Hashable, Position]):
+        with self._lock:
+            for node_id, position in positions.items():
+                self._positions[node_id] = position
+                self._positions.move_to_end(node_id)
+            while len(self._positions) > self.limit:
+                self._positions.popitem(last=False)
+
+
+def _repulsion(pos: np.ndarray, k2: float) -> np.ndarray:
+    """Sum of k^2/d pushes on every node, computed block by block to bound memory."""
+    n = len(pos)
+    block = max(1, BLOCK_PAIRS // max(n, 1))
+    x, y = pos[:, 0], pos[:, 1]
+    disp = np.empty_like(pos)
+    for start in range(0, n, block):
+        stop = start + block
+        dx = x[start:stop, None] - x[None, :]
+        dy = y[start:stop, None] - y[None, :]
+        force = dx * dx
+        force += dy * dy
+        np.maximum(force, 1e-2, out=force)
+        np.divide(k2, force, out=force)
+        disp[start:stop, 0] = (dx * force).sum(axis=1)
+        disp[start:stop, 1] = (dy * force).sum(axis=1)
+    return disp
+
+
+def _initial_positions(
+    node_ids: List[Hashable],
+    src: np.ndarray,
+    dst: np.ndarray,
+    previous: Dict[Hashable, Position],
+    rng: np.random.Generator,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Start from previous positions where known; place new nodes next to placed neighbours.
+
+    Returns the positions and a mask of the nodes that had a previous position.
+    """
+    n = len(node_ids)
+    pos = np.zeros((n, 2), dtype=np.float32)
+    known = np.zeros(n, dtype=bool)
+    for i, node_id in enumerate(node_ids):
+        if node_id in previous:
+            pos[i] = previous[node_id]
+            known[i] = True
+
+    radius = EDGE_LENGTH * np.sqrt(n)
+    centre = pos[known].mean(axis=0) if known.any() else np.zeros(2)
+    missing = np.flatnonzero(~known)
+    if len(missing):
+        # Mean position of each new node's already-placed neighbours, if any
+        total = np.zeros((n, 2), dtype=np.float32)
+        count = np.zeros(n)
+        for a, b in ((src, dst), (dst, src)):
+            placed = known[b]
+            np.add.at(total, a[placed], pos[b[placed]])
+            np.add.at(count, a[placed], 1)
+        has_neighbour = count[missing] > 0
+        jitter = rng.normal(scale=EDGE_LENGTH / 2, size=(len(missing), 2))
+        scattered = centre + rng.uniform(-radius / 2, radius / 2, size=(len(missing), 2))
+        pos[missing] = np.where(
+            has_neighbour[:, None],
+            total[missing] / np.maximum(count[missing], 1)[:, None] + jitter,
+            scattered,
+        )
+    return pos, known
+
+
+def force_layout(
+    node_ids: Iterable[Hashable],
+    edges: Iterable[Tuple[Hashable, Hashable]],
+    previous: Optional[Dict[Hashable, Position]] = None,
+    iterations: Optional[int] = None,
+    seed: int = 0,
+) -> Dict[Hashable, Position]:
+    """Fruchterman-Reingold layout with NumPy; returns {node id: (x, y)} in canvas pixels.
+
+    Nodes found in `previous` start where they were and the layout runs
+    briefly at a low temperature, so small edits to the graph only move
+    nearby nodes. Repulsion is exact (all pairs, in blocks), which keeps a
+    few thousand nodes to a few seconds; callers should cache the result.
+    """
+    node_ids = list(node_ids)
+    n = len(node_ids)
+    if n == 0:
+        return {}
+
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    pairs = np.array(
+        [(index[a], index[b]) for a, b in edges if a in index and b in index and a != b],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    src, dst = pairs[:, 0], pairs[:, 1]
+
+    rng = np.random.default_rng(seed)
+    pos, known = _initial_positions(node_ids, src, dst, previous or {}, rng)
+
+    incremental = known.sum() >= n * 0.5
+    if iterations is None:
+        iterations = INCREMENTAL_ITERATIONS if incremental else FULL_ITERATIONS
+    # Temperature caps how far a node moves per step and cools linearly to zero.
+    # In an incremental run, nodes that were already placed only settle in slightly.
+    start_temperature = np.full(n, EDGE_LENGTH * np.sqrt(n) / 4)
+    if incremental:
+        start_temperature[:] = EDGE_LENGTH
+        start_temperature[known] = EDGE_LENGTH / 40
+
+    k = EDGE_LENGTH
+    for step in range(iterations):
+        disp = _repulsion(pos, k * k)
+
+        delta = pos[src] - pos[dst]
+        pull = delta * (np.linalg.norm(delta, axis=1) / k)[:, None]
+        np.add.at(disp, src, -pull)
+        np.add.at(disp, dst, pull)
+
+        centre = pos.mean(axis=0)
+        disp -= GRAVITY * (pos - centre) * np.linalg.norm(pos - centre, axis=1)[:, None] / k
+
+        length = np.maximum(np.linalg.norm(disp, axis=1), 1e-9)
+        temperature = start_temperature * (1 - step / iterations)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+
+    return {node_id: (float(x), float(y)) for node_id, (x, y) in zip(node_ids, pos)}
@@ -0,0 +1,181 @@
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+from utils import validators
+
+# Node types hanging off a single organisation, folded into that organisation's badge
+LEAF_TYPES = {"stakeholder": "stakeholders", "painpoint": "pain points", "commercial": "commercials"}
+
+LABEL_PROPAGATION_ROUNDS = 10
+
+
+def level_of_detail(
+    nodes: List[Dict],
+    edges: List[Dict],
+    budget: int,
+    expanded: Iterable[str] = (),
+) -> Tuple[List[Dict], List[Dict]]:
+    """Shrink a graph to roughly `budget` nodes for drawing.
+
+    First each organisation's stakeholders, pain points and commercials are
+    replaced by one badge node with their counts. If that is still too many,
+    communities of related organisations (found by label propagation) are
+    replaced by cluster nodes, largest first, until the budget is met.
+    Badge and cluster IDs listed in `expanded` are left open, as are the
+    communities of expanded badges. Graphs within
+    the budget are returned unchanged.
+    """
+    nodes = list({node["id"]: node for node in nodes}.values())
+    if len(nodes) <= budget:
+        return nodes, edges
+
+    expanded = set(expanded)
+    nodes, edges = _collapse_leaves(nodes, edges, expanded)
+    if len(nodes) > budget:
+        nodes, edges = _collapse_communities(nodes, edges, budget, expanded)
+    return nodes, edges
+
+
+def _count_label(n: int, plural: str) -> str:
+    return f"{n} {plural if n != 1 else plural[:-1]}"
+
+
+def _node_types(nodes: List[Dict]) -> Dict[str, str]:
+    return {node["id"]: validators.normalize_node_type(node.get("type")) for node in nodes}
+
+
+def _collapse_leaves(nodes: List[Dict], edges: List[Dict], expanded: Set[str]) -> Tuple[List[Dict], List[Dict]]:
+    types = _node_types(nodes)
+    owners = defaultdict(set)  # leaf id -> organisation ids
+    for edge in edges:
+        a, b = edge["from"], edge["to"]
+        if types.get(a) == "organisation" and types.get(b) in LEAF_TYPES:
+            owners[b].add(a)
+        elif types.get(b) == "organisation" and types.get(a) in LEAF_TYPES:
+            owners[a].add(b)
+
+    # A leaf stays visible if any organisation it belongs to has its badge expanded
+    counts = defaultdict(Counter)
+    hidden = set()
+    for leaf, orgs in owners.items():
+        closed = {org for org in orgs if f"badge:{org}" not in expanded}
+        for org in closed:
+            counts[org][types[leaf]] += 1
+        if closed == orgs:
+            hidden.add(leaf)
+
+    labels = {node["id"]: node["label"] for node in nodes}
+    kept = [node for node in nodes if node["id"] not in hidden]
+    kept_edges = [
+        edge for edge in edges
+        if edge["from"] not in hidden and edge["to"] not in hidden
+        # Links from a closed organisation to a leaf kept open by another one
+        and not (edge["to"] in owners and f"badge:{edge['from']}" not in expanded)
+        and not (edge["from"] in owners and f"badge:{edge['to']}" not in expanded)
+    ]
+    for org, counter in counts.items():
+        badge = f"badge:{org}"
+        kept.append({
+            "id": badge,
+            "label": ", ".join(_count_label(n, LEAF_TYPES[t]) for t, n in counter.items()),
+            "type": "badge",
+            "org": org,
+            "org_label": labels[org],
+            "counts": dict(counter),
+        })
+        kept_edges.append({"from": org, "to": badge, "label": "", "type": "badge"})
+    return kept, kept_edges
+
+
+def _communities(orgs: List[str], links: List[Tuple[str, str]]) -> Dict[str, str]:
+    """Label propagation over organisation links: organisation id -> community label."""
+    neighbours = defaultdict(list)
+    for a, b in links:
+        neighbours[a].append(b)
+        neighbours[b].append(a)
+
+    label = {org: org for org in orgs}
+    for _ in range(LABEL_PROPAGATION_ROUNDS):
+        changed = False
+        for org in orgs:
+            if not neighbours[org]:
+                continue
+            tally = Counter(label[n] for n in neighbours[org])
+            best = max(tally.values())
+            # Ties go to the smallest label so the result does not depend on hash order
+            new = min(candidate for candidate, n in tally.items() if n == best)
+            if new != label[org]:
+                label[org] = new
+                changed = True
+        if not changed:
+            break
+    return label
+
+
+def _collapse_communities(nodes: List[Dict], edges: List[Dict], budget: int, expanded: Set[str]) -> Tuple[List[Dict], List[Dict]]:
+    types = _node_types(nodes)
+    by_id = {node["id"]: node for node in nodes}
+    orgs = sorted(node_id for node_id, t in types.items() if t == "organisation")
+    links = [
+        (edge["from"], edge["to"]) for edge in edges
+        if types.get(edge["from"]) == "organisation" and types.get(edge["to"]) == "organisation"
+    ]
+
+    # Nodes that only exist for one organisation disappear into its cluster with it
+    attached = defaultdict(list)
+    for edge in edges:
+        a, b = edge["from"], edge["to"]
+        if types.get(a) == "organisation" and (types.get(b) in LEAF_TYPES or types.get(b) == "badge"):
+            attached[a].append(b)
+
+    members = defaultdict(list)
+    for org, community in _communities(orgs, links).items():
+        members[community].append(org)
+
+    degree = Counter(a for link in links for a in link)
+    owner = {}  # hidden node id -> cluster id
+    clusters = []
+    remaining = len(nodes)
+    for group in sorted(members.values(), key=len, reverse=True):
+        if remaining <= budget or len(group) < 2:
+            break
+        cluster = f"cluster:{group[0]}"
+        # Keep open what was expanded, including badges of organisations in this community
+        if cluster in expanded or any(f"badge:{org}" in expanded for org in group):
+            continue
+        hidden = set(group).union(*(attached[org] for org in group))
+        for node_id in hidden:
+            owner[node_id] = cluster
+        remaining -= len(hidden) - 1
+
+        counts = Counter(types[n] for n in hidden if n in types)
+        badge_counts = Counter()
+        for n in hidden:
+            badge_counts.update(by_id[n].get("counts", {}) if n in by_id else {})
+        counts.update(badge_counts)
+        hub = max(group, key=lambda org: (degree[org], org))
+        clusters.append({
+            "id": cluster,
+            "label": f"{by_id[hub]['label']} +{len(group) - 1}",
+            "type": "cluster",
+            "members": len(group),
+            "counts": {t: counts[t] for t in ("organisation", *LEAF_TYPES) if counts[t]},
+        })
+
+    kept = [node for node in nodes if node["id"] not in owner] + clusters
+
+    # Rewire edges to clusters, merging parallel ones and dropping those inside a cluster
+    merged: Dict[Tuple[str, str], Dict] = {}
+    kept_edges = []
+    for edge in edges:
+        a, b = owner.get(edge["from"], edge["from"]), owner.get(edge["to"], edge["to"])
+        if a == edge["from"] and b == edge["to"]:
+            kept_edges.append(edge)
+        elif a != b:
+            key = (a, b)
+            if key not in merged:
+                merged[key] = {"from": a, "to": b, "label": "", "type": "cluster_link", "count": 0}
+            merged[key]["count"] += 1
+    for edge in merged.values():
+        edge["label"] = _count_label(edge["count"], "relationships")
+        kept_edges.append(edge)
+    return kept, kept_edges
@@ -0,0 +1,208 @@
+import csv
+import io
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Tuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import config
+
+# Import/export formats: display name -> (file extension, mime type)
+FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "Arrow IPC": (".arrow", "application/vnd.apache.arrow.file"),
+}
+
+# File extensions accepted on upload, mapped to their format
+EXTENSIONS = {
+    "csv": "CSV",
+    "parquet": "Parquet",
+    "pq": "Parquet",
+    "arrow": "Arrow IPC",
+    "feather": "Arrow IPC",
+    "ipc": "Arrow IPC",
+}
+
+def detect_format(filename: str) -> str:
+    """Return the format name for a filename, defaulting to CSV."""
+    return EXTENSIONS.get(Path(filename).suffix.lstrip(".").lower(), "CSV")
+
+
+def _open_ipc(source: IO[bytes]):
+    """Open an Arrow IPC file (Feather v2), falling back to the streaming format."""
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source)
+
+
+def preview(source: IO[bytes], file_format: str, nrows: int = 5) -> pd.DataFrame:
+    """Read only the first rows of a file-like object and rewind it."""
+    if file_format == "Parquet":
+        batch = next(pq.ParquetFile(source).iter_batches(batch_size=nrows), None)
+        df = batch.to_pandas() if batch is not None else pd.DataFrame()
+    elif file_format == "Arrow IPC":
+        reader = _open_ipc(source)
+        batch = reader.get_batch(0) if isinstance(reader, pa.ipc.RecordBatchFileReader) else reader.read_next_batch()
+        df = batch.slice(0, nrows).to_pandas()
+    else:
+        df = pd.read_csv(source, nrows=nrows)
+    source.seek(0)
+    return df
+
+
+def read_frame(source: IO[bytes], file_format: str) -> pd.DataFrame:
+    """Read a whole file-like object into a DataFrame."""
+    if file_format == "Parquet":
+        return pq.read_table(source).to_pandas()
+    if file_format == "Arrow IPC":
+        return _open_ipc(source).read_all().to_pandas()
+    return pd.read_csv(source)
+
+
+def iter_chunks(
+    source: IO[bytes], file_format: str, chunk_size: int, skip_rows: int = 0
+) -> Iterator[Tuple[pd.DataFrame, float]]:
+    """Yield (chunk, fraction of the file consumed) without loading the whole file.
+
+    Parquet and Arrow IPC are read batch by batch with their stored types, so
+    no type inference happens; CSV is parsed with pandas' chunked reader. The
+    first `skip_rows` data rows are skipped; Parquet skips whole row groups
+    without decoding them.
+    """
+    if file_format == "Parquet":
+        parquet_file = pq.ParquetFile(source)
+        total_rows = parquet_file.metadata.num_rows
+        done = 0
+        row_groups = []
+        for i in range(parquet_file.num_row_groups):
+            group_rows = parquet_file.metadata.row_group(i).num_rows
+            if not row_groups and done + group_rows <= skip_rows:
+                done += group_rows
+            else:
+                row_groups.append(i)
+        skip = skip_rows - done
+        done = skip_rows
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, row_groups=row_groups):
+            if skip:
+                dropped = min(skip, batch.num_rows)
+                batch = batch.slice(dropped)
+                skip -= dropped
+                if not batch.num_rows:
+                    continue
+            done += batch.num_rows
+            yield batch.to_pandas(), done / total_rows if total_rows else 1.0
+
+    elif file_format == "Arrow IPC":
+        reader = _open_ipc(source)
+        if isinstance(reader, pa.ipc.RecordBatchFileReader):
+            num_batches = reader.num_record_batches
+            batches = (reader.get_batch(i) for i in range(num_batches))
+        else:
+            # The streaming format has no footer, so its length is unknown up front
+            num_batches = None
+            batches = reader
+        skip = skip_rows
+        for i, batch in enumerate(batches):
+            start = min(skip, batch.num_rows)
+            skip -= start
+            # Writers choose their own batch sizes, so re-slice to the requested chunk size
+            for offset in range(start, batch.num_rows, chunk_size):
+                piece = batch.slice(offset, chunk_size)
+                within = (offset + piece.num_rows) / batch.num_rows
+                yield piece.to_pandas(), (i + within) / num_batches if num_batches else 0.0
+
+    else:
+        source.seek(0, 2)
+        total_bytes = source.tell()
+        source.seek(0)
+        # Skipped rows are parsed and dropped chunk by chunk rather than passed as
+        # skiprows: that counts records, not lines (quoted fields may hold line
+        # breaks), and pandas would otherwise build a set of every skipped line number
+        skip = skip_rows
+        for chunk in pd.read_csv(source, chunksize=chunk_size):
+            if skip:
+                dropped = min(skip, len(chunk))
+                chunk = chunk.iloc[dropped:]
+                skip -= dropped
+                if chunk.empty:
+                    continue
+            # The parser reads ahead in blocks, so this is approximate but monotonic
+            yield chunk, min(source.tell() / total_bytes, 1.0) if total_bytes else 1.0
+
+
+def arrow_schema(table_type: str) -> pa.Schema:
+    """Arrow schema for the config.TABLES columns of a table, matching the SQLite column types."""
+    fields = []
+    for column in config.TABLES[table_type]:
+        if column.endswith("_id"):
+            fields.append(pa.field(column, pa.int64()))
+        elif column == "budget":
+            fields.append(pa.field(column, pa.float64()))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def write_chunks(chunks: Iterable[List[tuple]], sink: IO[bytes], file_format: str, schema: pa.Schema) -> int:
+    """Stream chunks of row tuples (in schema column order) to a binary sink. Returns the row count.
+
+    Only one chunk is held in memory at a time.
+    """
+    rows_written = 0
+    if file_format == "CSV":
+        text = io.TextIOWrapper(sink, encoding="utf-8", newline="")
+        writer = csv.writer(text)
+        writer.writerow(schema.names)
+        for rows in chunks:
+            writer.writerows(rows)
+            rows_written += len(rows)
+        # Flush without closing the caller's sink
+        text.flush()
+        text.detach()
+        return rows_written
+
+    if file_format == "Parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    elif file_format == "Arrow IPC":
+        writer = pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+    else:
+        raise ValueError(f"Unknown format: {file_format}")
+
+    with writer:
+        for rows in chunks:
+            columns = zip(*rows)
+            arrays = [pa.array(values, type=field.type) for values, field in zip(columns, schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            rows_written += len(rows)
+    return rows_written
+
+
+def write_table(df: pd.DataFrame, file_format: str) -> bytes:
+    """Serialize a DataFrame to bytes in the given format."""
+    if file_format == "CSV":
+        return df.to_csv(index=False).encode()
+
+    buffer = io.BytesIO()
+    if file_format == "Parquet":
+        df.to_parquet(buffer, compression="zstd", index=False)
+    elif file_format == "Arrow IPC":
+        feather.write_feather(df.reset_index(drop=True), buffer, compression="zstd")
+    else:
+        raise ValueError(f"Unknown format: {file_format}")
+    return buffer.getvalue()
+
+
+def export_filename(stem: str, file_format: str) -> str:
+    return f"{stem}{FORMATS[file_format][0]}"
+
+
+def mime_type(file_format: str) -> str:
+    return FORMATS[file_format][1]
+
+
+def upload_types() -> List[str]:
+    return list(EXTENSIONS)
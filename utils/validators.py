@@ -1,5 +1,13 @@
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional, Tuple, Union
 import re
+import pandas as pd
+import polars as pl
+import config
+
+Series = Union[pd.Series, pl.Series]
+
+# Variants of 'ndpb' accepted by normalize_org_type
+NDPB_VARIANTS = {"ndpbs": "ndpb", "n.d.p.b": "ndpb", "n d p b": "ndpb"}
 
 def normalize_str(v: Optional[str]) -> str:
 	if v is None:
@@ -10,7 +18,7 @@ def normalize_str(v: Optional[str]) -> str:
 def normalize_org_type(v: Optional[str]) -> str:
 	"""Return a canonical org_type (lowercase). Map common variants to 'ndpb'."""
 	v = normalize_str(v).lower()
-	if v in {"ndpb", "ndpbs", "n.d.p.b", "n d p b"}:
+	if v == "ndpb" or v in NDPB_VARIANTS:
 		return "ndpb"
 	return v
 
@@ -72,3 +80,139 @@ def is_positive_int(value) -> bool:
 	except Exception:
 		return False
 
+
+# ========== Vectorized (Series) counterparts ==========
+
+def normalize_str_series(s: Series) -> Series:
+	"""Vectorized normalize_str for a pandas or Polars Series."""
+	if isinstance(s, pl.Series):
+		return s.cast(pl.Utf8).str.strip_chars().fill_null("")
+	return s.astype("string").str.strip().fillna("")
+
+
+def normalize_org_type_series(s: Series) -> Series:
+	"""Vectorized normalize_org_type for a pandas or Polars Series."""
+	s = normalize_str_series(s)
+	if isinstance(s, pl.Series):
+		return s.str.to_lowercase().replace(NDPB_VARIANTS)
+	return s.str.lower().replace(NDPB_VARIANTS)
+
+
+def normalize_relationship_type_series(s: Series) -> Series:
+	"""Vectorized normalize_relationship_type for a pandas or Polars Series."""
+	s = normalize_str_series(s)
+	if isinstance(s, pl.Series):
+		return s.str.to_lowercase()
+	return s.str.lower()
+
+
+def parse_budget_series(s: Series) -> Series:
+	"""Vectorized parse_budget: strip currency symbols and separators; unparseable values become null."""
+	if isinstance(s, pl.Series):
+		if s.dtype.is_numeric():
+			return s.cast(pl.Float64)
+		return s.cast(pl.Utf8).str.replace_all(r"[^0-9.\-]", "").cast(pl.Float64, strict=False)
+	if pd.api.types.is_numeric_dtype(s):
+		return s.astype("float64")
+	cleaned = s.astype("string").str.replace(r"[^0-9.\-]", "", regex=True)
+	return pd.to_numeric(cleaned, errors="coerce").astype("float64")
+
+
+# ========== Validation engine driven by config ==========
+
+# Allowed values per column; matched case-insensitively and stored with their config spelling
+ALLOWED_VALUES = {
+	"org_type": config.ORG_TYPES,
+	"severity": config.SEVERITY_LEVELS,
+	"urgency": config.URGENCY_LEVELS,
+	"method": config.COMMERCIAL_METHODS,
+	"relationship_type": [t.lower() for t in config.RELATIONSHIP_TYPES],
+}
+
+# NOT NULL text columns
+REQUIRED_COLUMNS = {"org_name", "org_type", "name", "description", "method", "relationship_type"}
+
+REPORT_COLUMNS = ["Row", "Column", "Value", "Error"]
+
+# Report lines with this Level keep their row; lines without a Level reject it
+WARNING = "warning"
+
+
+def report_errors(report: pd.DataFrame) -> pd.DataFrame:
+	"""The lines of a report that rejected their row."""
+	if "Level" not in report.columns:
+		return report
+	return report[report["Level"].ne(WARNING).fillna(True)]
+
+
+def report_warnings(report: pd.DataFrame) -> pd.DataFrame:
+	"""The lines of a report about rows that were kept."""
+	if "Level" not in report.columns:
+		return report.iloc[0:0]
+	return report[report["Level"].eq(WARNING).fillna(False)]
+
+
+def validate_frame(table_type: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+	"""Normalize and validate the config.TABLES columns of a frame in one vectorized pass.
+
+	Returns (clean, report): the normalized rows that passed every rule, keeping
+	the original index, and one Row / Column / Value / Error line per problem.
+	IDs become nullable integers, budgets floats, and text is stripped with
+	blanks treated as missing. Values outside ALLOWED_VALUES are kept as
+	written and reported with Level WARNING, as the forms can store them too.
+	"""
+	problems: List[pd.DataFrame] = []
+	clean = pd.DataFrame(index=df.index)
+	valid = pd.Series(True, index=df.index)
+
+	def flag(mask: pd.Series, column: str, message: str, level: str = "error"):
+		mask = mask.fillna(False).astype(bool)
+		if mask.any():
+			problems.append(pd.DataFrame({
+				"Row": df.index[mask.values] + 1,
+				"Column": column,
+				"Value": df.loc[mask.values, column].astype(str).values,
+				"Error": message,
+				"Level": level,
+			}))
+		return mask
+
+	for column in config.TABLES[table_type]:
+		raw = df[column]
+
+		if column.endswith("_id"):
+			ids = pd.to_numeric(raw, errors="coerce")
+			bad = flag(ids.isna() | (ids % 1 != 0), column, "Missing or non-integer ID")
+			clean[column] = ids.where(~bad).astype("Int64")
+
+		elif column == "budget":
+			budget = parse_budget_series(raw)
+			present = raw.notna() & (raw.astype("string").str.strip() != "")
+			bad = flag(budget.isna() & present, column, "Budget is not a number")
+			clean[column] = budget
+
+		else:
+			text = raw.astype("string").str.strip()
+			text = text.mask(text == "")
+			bad = pd.Series(False, index=df.index)
+
+			if column == "org_type":
+				text = normalize_org_type_series(text).mask(text.isna())
+			elif column == "relationship_type":
+				text = normalize_relationship_type_series(text)
+
+			if column in ALLOWED_VALUES:
+				canonical = {v.lower(): v for v in ALLOWED_VALUES[column]}
+				matched = text.str.lower().map(canonical).astype("string")
+				unknown = flag(text.notna() & matched.isna(), column, f"Not one of: {', '.join(ALLOWED_VALUES[column])}; kept as written", WARNING)
+				text = matched.mask(unknown, text)
+
+			if column in REQUIRED_COLUMNS:
+				bad |= flag(raw.isna() | (raw.astype("string").str.strip() == ""), column, "Required value is missing")
+
+			clean[column] = text
+
+		valid &= ~bad
+
+	report = pd.concat(problems, ignore_index=True) if problems else pd.DataFrame(columns=REPORT_COLUMNS + ["Level"])
+	return clean[valid], report.sort_values("Row", kind="stable").reset_index(drop=True)